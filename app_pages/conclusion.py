@@ -0,0 +1,133 @@
+#### PAGE 5 : CONCLUSION
+
+import streamlit as st
+
+from lfb import images, profiling
+
+profiling.step('Conclusion/Parcours')
+st.markdown(" ")
+
+left_co, cent_co,last_co = st.columns(3)
+
+with cent_co:
+    images.show('lfb1.svg.png', width=300, lazy=False)
+
+st.header('Conclusion')
+
+st.subheader("Notre parcours : Réussites et Difficultés")
+
+st.markdown('**:red[Variable cible]**')
+
+st.markdown("En premier lieu, nous avions décidé de travailler sur deux variables cibles :\
+              \n 1. ***ResponseTime*** qui correspond au temps écoulé entre le moment où l'appel est reçu par le centre d’appel 999 et le moment où la brigade\
+               arrive sur les lieux de l’incident.\
+              \n 2. ***MobilisationTime*** qui représente le temps passé sur l’incident.\
+              \n\n Le premier obstacle que nous avons rencontré est dû au format des variables temporelles. En effet la variable ResponseTime n’existe pas,\
+               il fallait donc la calculer à l’aide de variables déjà présentes. Des erreurs détectées dans le format des dates nous ont amené à changer cette\
+               valeur cible pour :red[***AttendanceTimeSeconds***] qui représente le temps nécessaire à l’équipe d’intervention pour se préparer et se rendre sur le lieu\
+               de l’incident.")
+
+st.markdown(" ")
+
+st.markdown('**:red[Découverte et premier Data Cleaning]**')
+
+st.markdown("La première chose qui nous a interpellé est le **volume des données**, nous avions avant toute modification, deux dataframes que nous avons couplé\
+               pour obtenir un jeu de données de taille `(2220718, 58)`.\
+              \n\n Il nous a fallu en premier lieu tenter de comprendre l’intégralité de ces variables. Certaines semblaient évidentes, d’autres, malgré\
+               la présence des fichiers de Metadata présentant une courte description des variables, ont nécessité la sollicitation de **Bi Analyst et Data Analyst**\
+               du site LFB que nous avons contacté pour s’assurer de la bonne interprétation des données.\
+              \n\n Une fois cela fait, nous avons pu décider quelles variables devaient être supprimées.\
+              Cette étape fut complexe par la diversité de celles-ci et l’anticipation requise dans l’analyse de leur nécessité pour le calcul de notre variable\
+               cible.\
+              \nCependant l’évaluation de certaines a été facilitée par le fait qu’elles représentaient un doublon sous forme de code.\
+              \n\n Après cela, nous avons passé une bonne partie sur le cleaning et l’enrichissement de nos données. Nous avons agrémenté notre dataset de diverses\
+               variables temporelles ainsi que de la variable :red[***Distance***] qui permet d’établir la distance entre la caserne d’où décolle la brigade et le lieu\
+               de l’incident.")
+
+st.markdown(" ")
+
+st.markdown('**:red[DataViz]**')
+
+st.markdown("Nous avons pris plaisir à cette étape de notre projet et avons proposé un large panel de visualisations.\
+              \n\nNous avons cependant été restreint par les performances réduites et les bugs liés à la volumétrie importante de nos données\
+               et l’utilisation de certaines librairies.\
+              \n\n En effet nous avons fortement apprécié les visualisations et l’interface proposées par **Plotly express**, mais il a été difficile\
+               de les générer pour certains d’entre eux.\
+              \n\n Nous sommes fiers d’avoir pu proposer **des cartes** pour nos visualisations que nous avons créées grâce aux fichiers GeoJson que nous nous\
+               sommes procurés sur le site du London Data Store et également par le biais d’une des Data Analyst que nous avons contacté.")
+
+st.markdown(" ")
+
+st.markdown('**:red[Modélisation]**')
+
+st.markdown("Encore une fois lors de cette étape, nous avions un gros challenge concernant l’importante volumétrie de nos données.\
+              \n\n Nous avons tenté de réduire au mieux les données sans perdre d’informations précieuses à notre travail de prédiction. Nous avons pour\
+               cela mis en application diverses techniques dont la réduction de dimensions, la heatmap, les tests de corrélation ainsi\
+               que les features importances. Nous avons également réduit nos données aux dates supérieures à 2015, puisque fin 2014, 10 casernes ont fermé\
+               dans le cadre d’un plan de sauvegarde financière.\
+              \n\n Cette abondance de données nous a d’ailleurs obligé à basculer sur un modèle de :red[**classification**] pour améliorer la rapidité et la précision\
+               de notre modèle le plus performant.\
+              \n\n Malgré notre motivation et par faute de temps, nous avons décidé de nous concentrer uniquement sur la première variable cible AttendanceTimeSeconds.\
+              Nous avons utilisé plusieurs modèles et l’avons amélioré jusqu’à atteindre notre objectif. Notre meilleur modèle retenu est le Random Forest Classifier,\
+               avec notre variable cible définie en 3 classes distinctes. Via ce modèle, nous avons obtenu un :red[**f1-score de 0.68, 0.7, 0.89 ainsi qu’un R2 de 78,18**],\
+              atteignant donc notre objectif.")
+
+st.markdown(" ")
+
+st.markdown('**:red[Aller plus loin]**')
+
+st.markdown("Afin d’aller plus loin, nous aurions pu, comme nous l'avions fait pour le calcul de la distance, enrichir notre dataset en allant chercher\
+               des informations externes pouvant influer sur notre valeur cible, tel que la météo, le trafic ou encore la pandémie.\
+              \n\n Dans le prolongement de notre projet, nous aurions pu aussi utiliser la variable cible *MobilisationTime* pour la modélisation.\
+              Avec plus de temps et d'expertise et afin d’obtenir une meilleure performance, nous aurions pu tester d'autres modèles comme les réseaux de neurones,\
+              SVM…")
+
+st.markdown(" ")
+
+st.markdown('**:red[Gestion du temps]**')
+
+images.show("gantt.jpeg")
+
+profiling.step("Conclusion/Retour d'expérience")
+st.subheader("Notre retour d'expérience")
+
+st.markdown("Il nous semblait également important de partager notre retour d’expérience global sur ce projet, réalisé dans le cadre de notre formation Data Analyst chez DataScientest.\
+               \n\n Ce projet fut une belle expérience, nous avons pu mettre en pratique énormément d’outils que nous avons appris pendant les cours. Nous avons\
+               même pu nous aider du projet pour pratiquer plus en profondeur nos apprentissages.\
+              \n\n D’une part, nous avons eu une très bonne dynamique de groupe, avec une répartition des tâches équitable, dans un environnement d'entraide\
+               et de joie de partager ses connaissances.\
+              \n\n D’autre part, nous tenions à remercier l’équipe de DataScientest, organisme grâce auquel nous avons suivi notre formation de Data Analyst,\
+               de nous avoir permis d'apprendre dans les meilleures conditions.\
+              \n\n Merci également à notre mentor Mr Yazid Msaadi pour son accompagnement et ses précieuses recommandations qui nous ont été d’une grande aide.\
+               Il a su nous guider dans l’atteinte de notre objectif sur ce projet fil rouge.\
+              \n\n Merci à l’équipe d’animation des Masterclass, avec qui nous avons envie d’en apprendre encore plus et qui nous a permis d’avoir en temps\
+               et en heure les connaissances pour l’avancement de notre projet. Enfin un merci à l’équipe de support, proactive sur nos demandes.")
+
+st.markdown(" ")
+
+profiling.step('Conclusion/Bibliographie')
+st.subheader("Bibliographie")
+
+col1, col2 = st.columns(2)
+
+with col1:
+   st.markdown("**Jeux de données:**\
+                 \n - [Incident Report](https://data.london.gov.uk/dataset/london-fire-brigade-incident-records)\
+                 \n - [Mobilisation](https://data.london.gov.uk/dataset/london-fire-brigade-mobilisation-records)\
+                 \n\n **Compréhension des variables et enjeux :**\
+                 \n - [Fire statistics](https://www.gov.uk/government/publications/fire-statistics-guidance/fire-statistics-definitions#response-times) \
+                 \n - [Fires in Greater London](https://data.london.gov.uk/dataset/lfb-fires-in-london-1966-2019---fire-facts)\
+                 \n - [Incident response time](https://data.london.gov.uk/dataset/incident-response-times-fire-facts)\
+                 \n - [Fermeture des casernes en 2014](https://www.london-fire.gov.uk/news/2014-news/brigade-will-remain-world-class-and-londoners-will-still-be-safe-says-authority-chief-ahead-of-station-closures/#:~:text=The%20following%2010%20fire%20stations,%2C%20Southwark%2C%20Westminster%20and%20Woolwich.)\
+                 \n\n **Carte :**\
+                 \n - [Statistical GIS Boundary Files for London](https://data.london.gov.uk/dataset/statistical-gis-boundary-files-london?resource=9ba8c833-6370-4b11-abdc-314aa020d5e0) : [Borough of London GeoJSON file](https://skgrange.github.io/www/data/london_boroughs.json)")
+
+with col2:
+   st.markdown("**Vérification d’outlier :**\
+                 \n - [Incendie de la tour Grenfell](https://fr.wikipedia.org/wiki/Incendie_de_la_tour_Grenfell) \
+                 \n - [Incendie du 12 Août 2012](https://www.bbc.com/news/uk-england-london-19242951)\
+                 \n\n **Latitude et longitudes des casernes:**\
+                 \n - [Majorité des casernes](https://www.google.com/maps/d/viewer?mid=1f3Kgp7Qx5v0w-sXKomdR8DzD9u4&ll=51.5069695%2C-0.2769568999999672&z=11) \
+                 \n - [Caserne Dartford](https://nicelocal.co.uk/south-east/public_services/dartford_fire_station/)\
+                 \n - [Caserne Esher](http://www.firestations.org.uk/Station_Details.php?stn=Esher%20fire%20station&lat=51.37666661&lon=-0.346055506)\
+                 \n - [Caserne  Hertfordshire](https://uk.locator.biz/en/p/rickmansworth/rectory-road-/hertfordshire-fire-%26-rescue-service-fire-station/p224814/)")
@@ -0,0 +1,157 @@
+#### PAGE 3 : DATAVIZ
+
+import streamlit as st
+
+from lfb import charts, cubes, figures, geo, images, profiling, spatial, thresholds
+
+profiling.step('DataViz/Filtres')
+st.header("DataVizualisation")
+st.markdown(" ")
+
+## Filtres : graphiques recalculés depuis les cubes d'agrégats s'ils ont été construits
+filters = None
+if cubes.available():
+  with st.expander(label = "Filtres"):
+    cells = cubes.load('incidents')
+    first, last = int(cells['CalYear'].min()), int(cells['CalYear'].max())
+    years = st.slider('Années', first, last, (first, last))
+    boroughs = st.multiselect('Quartiers', sorted(cells['BoroughName'].unique()))
+    groups = st.multiselect("Types d'incident", sorted(cells['IncidentGroup'].unique()))
+  filters = dict(years=years, boroughs=boroughs, groups=groups)
+profiling.step('DataViz/Variable cible')
+st.subheader("La variable cible : AttendanceTimeSeconds")
+
+## DataViz : distribution variable cible
+st.markdown('**:red[Distribution de AttendanceTimeSeconds]**')
+st.markdown("Nous constatons visuellement que la distribution de notre variable cible suit une loi normale. La médiane est à 325 secondes,\
+               soit **5 minutes et 25 secondes**. Il s'agit donc ici du temps médian pour une équipe de sapeurs-pompiers de se préparer et ce rendre\
+              sur les lieux de l'incident. Le maximum est à 1200 secondes, soit 20 min, et il s'agit du seuil maximum utilisé par la LFB elle-même\
+              dans ses différents analyses et rapports.")
+images.show('attendancetime_distribution.jpeg')
+
+profiling.step('DataViz/Seuils')
+## Percentiles et respect des seuils de 6, 8 et 10 minutes (lfb.thresholds)
+if thresholds.available():
+  st.markdown(" ")
+  st.markdown('**:red[Respect des seuils de temps de réponse]**')
+  st.markdown("Au-delà de la médiane, nous mesurons les percentiles du temps de réponse (p50, p90, p95) et la part des mobilisations\
+                arrivées sur les lieux en **moins de 6, 8 et 10 minutes**, par année, heure, quartier ou secteur de caserne.")
+  if figures.lazy("thresholds", ":gray[Afficher l'analyse]"):
+    thresholds.show(filters)
+
+profiling.step('DataViz/Cartes')
+## DataViz Attendance Time selon carte de Londres
+st.markdown(" ")
+st.markdown('**:red[Cartes de Londres]**')
+
+if figures.lazy("maps", ":gray[Afficher les cartes]"):
+  display = st.radio(':gray[Que souhaitez-vous montrer ?]', (':gray[Temps de Réponse par Quartier]', ':gray[Temps de Réponse par Secteur Caserne]'))
+  detail = st.select_slider(':gray[Niveau de détail]', options=list(geo.DETAIL_LEVELS), value='Moyen')
+  if display == ':gray[Temps de Réponse par Quartier]':
+    ## Map par Quartier
+    values = charts.map_values(filters, 'BoroughName')
+    geo.show("map2", values, tolerance=geo.DETAIL_LEVELS[detail])
+  elif display == ':gray[Temps de Réponse par Secteur Caserne]':
+    ## Map par Station Ground
+    values = charts.map_values(filters, 'IncidentStationGround')
+    geo.show("map1", values, tolerance=geo.DETAIL_LEVELS[detail])
+
+profiling.step('DataViz/Temps de réponse')
+## DataViz Attendance Time selon heure de la journée
+st.markdown(" ")
+st.markdown("**:red[Les Temps de Réponse selon l'Heure de la Journée]**")
+st.markdown("Le graphique ci-dessous nous permet de visualiser le **Temps de Préparation** (TurnoutTime), le **Temps de Trajet** (TravelTime)\
+              et le **Temps de Réponse** total (AttendanceTime) des brigades selon l'heure de la journée.")
+if figures.lazy("plot1", opened=True):
+  charts.show("plot1", filters)
+
+with st.expander(label = "Lecture du graphique"):
+  st.write("**Constat temps de trajet :** Assez logiquement, nous observons que le temps de trajet pour se rendre sur le lieu de l'incident\
+              est plus important en journée, au moment où le trafic routier est plus dense. Le temps de trajet est plus rapide entre 21h le soir et 9h le matin.\
+            \n\n **Constat temps de trajet temps de préparation (Turnout) :**  Il est intéressant de voir qu'il existe une différence du temps de préparation\
+             des équipes entre minuit et 7h du matin. Est-ce dû au fait qu'il y a moins de personnel la nuit ?\
+             \n\n**Constat temps de réponse total :** Le temps de réponse total est la somme des deux temps précédents. Les temps forts / faibles de chacune\
+              des deux variables précédentes font que le temps total s'équilibre sur la journée, à l'exception du créneau 7h - 10h et  20h et Minuit (temps de trajet ET temps de préparation rapides).")
+
+## DataViz Temps de trajet selon le retard
+st.markdown(" ")
+st.markdown("**:red[Temps de Trajet moyen selon la raison du retard]**")
+st.markdown("Le graphique ci-dessous nous permet de visualiser le **Temps de Trajet moyen** (en secondes toujours) selon la raison du retard. Lorsqu'il n'y a pas eu de retard,\
+              cela est représenté par la valeur '*No delay*'.")
+if figures.lazy("plot5"):
+  charts.show("plot5", filters)
+
+with st.expander(label = "Lecture du graphique"):
+  st.write("**Constat :** Sans surprise, lorsqu'il n'y a pas de retard le temps de trajet est exemplaire. Par ailleurs, le motif d' *'Adresse incomplète'*\
+            est celui qui fait le plus perdre de temps aux equipes, suivi d'une autre cause moins explicite qui indique que l'équipe est arrivée mais\
+            qu'elle a été retenue pour une autre raison ou encore que l'équipe était déjà en intervention à l'exterieur au moment de l'appel par le centre de contrôle.")
+
+## DataViz Temps de réponse et Distance
+st.markdown(" ")
+st.markdown("**:red[Temps de Trajet moyen et Distance moyenne parcourue par Quartier]**")
+st.markdown("Le graphique ci-dessous affiche par quartier de Londres le Temps de Réponse moyen ainsi que la Distance moyenne parcourue")
+
+if figures.lazy("plot6"):
+  charts.show("plot6", filters)
+
+with st.expander(label = "Lecture du graphique"):
+  st.write("**Constat :** Alors que nous pensions plus évidente la corrélation entre le Temps de Réponse et la Distance, nous constatons ici, en regardant ces deux métriques\
+             par Quartier de Londres, qu'il n'existe pas de façon évidente une relation entre ces deux variables.")
+
+
+st.markdown(" ")
+profiling.step('DataViz/Volumes')
+st.subheader("Le volume d'Incidents et de Mobilisations")
+
+## DataViz Nombre d'incidents par année
+st.markdown("**:red[Volume d'incidents par Année]**")
+st.markdown("Le graphique ci-dessous nous permet de visualiser le **Volume d'incidents** selon l'année, avec une disctinction faite selon le **Type d'incident**.")
+if figures.lazy("plot7"):
+  charts.show("plot7", filters)
+
+with st.expander(label = "Lecture du graphique"):
+  st.write("**Constat :** Nous constatons une grande proportion de fausse alarme dans laquelle nous avons une majorité AFA- Automatic Fire Alarm (alarme déclenchée automatiquement\
+            par les detecteurs de fumée). Concernant les feux il y a majoritairement des feux de grande ampleur.\
+             \n\n Au cours des années le volume d'incidents varie sensiblement, cependant nous constatons un accroissement constant depuis 2015.\
+             \n\n L'année 2023 n'étant pas finie elle n'est pas encore éligible à une bonne lecture, nos données s'arretent à Juillet 2023 soit 60% de l'année , si la tendance moyenne\
+              d'évolution du volume d'incident du mois reste la même nous pourrions nous attendre à avoir un volume qui vient se rapprocher des résultats de l'année 2022.") 
+
+## DataViz Nombre d'incident selon heure de la journée
+st.markdown(" ")
+st.markdown("**:red[Nombre d'Incidents selon Heure de la Journée]**")
+st.markdown("Le graphique ci-dessous nous permet de visualiser le **Volume d'incidents** selon l'heure de la journée, avec une disctinction faite selon le **Type d'incident**.\
+              Il est également possible d'afficher l'année de son choix.")
+if figures.lazy("plot2"):
+  charts.show("plot2", filters)
+
+with st.expander(label = "Lecture du graphique"):
+  st.write("**Constat :** Il est nettement visible - et c'est assez logique - qu'il existe une différence du volume d’incidents selon l’heure de la journée\
+            et cela quelque soit l'année. Le graphique nous montre également une surreprésentation des incidents de type “False Alarm”.")
+
+## DataViz Nombre de mobilisation par quartier
+st.markdown(" ")
+st.markdown("**:red[Répartition des Mobilisations par Quartier]**")
+st.markdown("Le graphique ci-dessous nous permet de visualiser la **quantité de mobilisations** selon les quartiers de Londres, **depuis 2009**,\
+              en mettant également en avant le type d'incident. Les quartiers sont triés de façon descendante selon la moyenne du Temps de Réponse ")
+if figures.lazy("plot3"):
+  charts.show("plot3", filters)
+
+with st.expander(label = "Lecture du graphique"):
+  st.write("**Constat :** Nous observons que certains des quartiers qui ont un bon temps de réponse ont aussi une grosse proportion de fausses alarmes. Aussi,\
+             la quantité d'incidents ne semble pas influencer la performance de rapidité du temps de réponse. Le type d'incident ne doit donc que partiellement\
+            influencer la disparité des performances par quartier.")
+
+profiling.step('DataViz/Attribution des casernes')
+## Attribution des casernes : caserne mobilisée vs caserne la plus proche (lfb.spatial)
+if spatial.available():
+  st.markdown(" ")
+  st.markdown("**:red[Attribution des casernes]**")
+  grounds = spatial.load()
+  overview = spatial.summary(grounds)
+  count = f"{overview['mobilisations']:,}".replace(',', ' ')
+  st.markdown(f"Pour chaque mobilisation, nous comparons la caserne d'où part la brigade à la caserne la plus proche du lieu de l'incident.\
+                Sur {count} mobilisations, **{overview['nearest']:.0%}** partent de la caserne la plus proche.")
+  if figures.lazy("spatial", ":gray[Afficher l'analyse]"):
+    shares = grounds.set_index('IncidentStationGround')['Part_Caserne_Plus_Proche'] * 100
+    geo.show("map1", shares, label='Caserne la plus proche (%)', hover='%{z:.0f} %')
+    st.dataframe(grounds.sort_values('Part_Caserne_Plus_Proche'), hide_index=True)
@@ -0,0 +1,87 @@
+#### PAGE 2 : ENRICHISSEMENTS ET DATA CLEANING
+
+import streamlit as st
+
+from lfb import explorer, profiling, registry
+
+profiling.step('Enrichissements/Nos Enrichissements')
+st.header("Enrichissements & Data Cleaning")
+st.markdown(" ")
+
+st.subheader('Nos Enrichissements :fire:')
+st.markdown('**:red[La variable Distance]**')
+st.markdown("Nous avons souhaité ajouter à notre dataset la variable ***:red[Distance]***. Cette dernière représente la distance entre la caserne d'où a été mobilisé\
+              le camion et le lieu de l'incident, en mètres. Voici comment nous avons procédé : \n\n - **Collecte de données** : pour chaque caserne, nous avons manuellement\
+              collecté leurs coordonnées géographiques, soit les latitudes et longitudes.\
+              \n - **Conversion de variables** : les données de latitudes et longitudes des lieux d'incidents étant incomplètes (+50% de Nan), nous avons convertis\
+               les données *easting_rounded* et *northing_rounded* en latitude et longitude. Nous perdons légèrement en précision sur la localisation exacte mais de façon\
+              tout à fait acceptable. \
+              \n - **Calcul de la distance** : à partir des coordonnées géographiques des casernes et des lieux d'incidents, nous avons pû calculer une nouvelle variable : la\
+               :red[***Distance*** *(en mètre)*] parcourue pour chaque mobilisation.\
+              \n - **Vérification** : pour se rassurer sur la pertinence du calcul effectué, nous avons testé plusieurs distances sur Google Maps.")
+
+case = st.checkbox(":gray[Afficher le code : Calcul de la Distance ]")
+code = '''# Fonction pour calculer la distance en mètres entre deux points géographiques (haversine formula)
+def haversine(lat1, lon1, lat2, lon2):
+    # Rayon de la Terre en mètres
+    radius = 6371000
+
+    # Conversion des degrés en radians
+    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
+
+    # Différences de latitudes et de longitudes
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    # Formule de la haversine
+    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+
+    # Distance en mètres
+    distance = radius * c
+    return distance
+
+# Appliquer la fonction haversine sur les colonnes entières (calcul vectorisé NumPy) et ajouter une colonne "Distance" au DataFrame
+df["Distance"] = haversine(df["Latitude"], df["Longitude"], df["Station_Latitude"], df["Station_Longitude"])
+
+# Version utilisée sur le jeu complet : conversion Easting/Northing, coordonnées des casernes et distance par blocs
+from lfb.enrichment import StationLookup, add_distance
+df = add_distance(df, StationLookup(casernes))'''
+if case:
+  st.code(code, language='python') 
+
+st.markdown(" ")
+st.markdown('**:red[La variable DateOfCall]**')
+st.markdown("Afin de rendre l'analyse plus facile et d'exploiter d'autres axes nous utilisons la variable *'DateOfCall'* pour créer *'MonthOfCall'* et *'DayOfCall'*.")
+st.markdown(" ")
+
+profiling.step('Enrichissements/DataCleaning')
+st.subheader("DataCleaning :male-firefighter:")
+
+st.markdown('**:red[Gestion des doublons]**')
+st.markdown("Nous n'avions aucun doublon dans notre jeu de données.")
+
+st.markdown('**:red[Gestion des outliers]**')
+st.markdown("Nos outliers étaient majoritairement des valeurs extrêmes réalistes. Pour les quelques valeurs aberrantes (quelques lignes), nous\
+              avons fait le choix de les supprimer.")
+
+st.markdown('**:red[Gestion des valeurs manquantes]**')
+st.markdown("Concernant les Nans, nous décidons de supprimer toutes les lignes pour lesquels le pourcentage de Nan dans la colonne est inférieur à 2%.\
+               Ensuite, pour le reste des valeurs manquantes et afin d’éviter toute fuite de données durant la modélisation nous ne modifierons que les Nans\
+              qui ne nécessitent pas une opération de calcul statistique.\
+              \n - *DelayCode_Description (75% de Nans)* : il s'agit de la raison pour laquelle la brigade est arrivée en retard sur le lieu de l’incident. Les Nans\
+               correspondent aux mobilisations où il n'y a pas eu de retard (onfirmé par le BI Analyst que nous avons contacté). Nous remplaçons donc remplacés par\
+                la veleur 'No Delay'.\
+               \n - *SpecialServiceType (78% de Nans)* : cette colonne ne contient des informations que si le type de l’intervention est un 'SpecialService'. Nous\
+               remplaçon les 78% de Nan par la valeur 'Not a Special Service'.\
+              \n\n Suite à la sélection finale des variables que nous conserverons avant d'entâmer la partie modélisation, notre jeu de données ne présente plus aucun Nan.")
+
+st.markdown('**:red[Variables Conservées dans notre DataFrame Final]**')
+st.markdown("Voici la liste des variables conservées (**25 au total**), avant de démarrer nos premières modélisations :")
+
+table = registry.table("table_variables.csv")
+st.dataframe(table)
+
+## Afficher df.head() avant modélisation
+st.markdown('**Aperçu du DataFrame les DataViz**')
+explorer.show('modelisation')
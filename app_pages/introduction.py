@@ -0,0 +1,64 @@
+#### PAGE 1 : INTRODUCTION
+
+import streamlit as st
+
+from lfb import explorer, images, profiling, registry
+
+profiling.step('Introduction/Le Sujet')
+images.show('lfb2.jpeg', lazy=False)
+st.write(':grey[*Crédit Photo : London Fire Brigade*]')
+st.header("Introduction")
+st.subheader('Le Sujet')
+st.markdown("La **:red[London Fire Brigade (LFB)]** est le service d'incendie et de secours le plus actif du pays.\
+           Fondée en 1886, elle n'a, depuis lors, cessé de s’améliorer et jouit aujourd’hui d’une réputation reconnue\
+            en matière de lutte contre les incendies et de secours d'urgence, faisant d’elle l'une des institutions les\
+            plus emblématiques et respectées du pays. \n\n Sur l’année 2014, ils seront notifiés comme étant les sapeurs-pompiers les plus occupés\
+            dans le monde en comptabilisant un total de 171 067 appels d’urgence et en traitant 20934 feux ! \
+           \nC’est d’ailleurs l’une des plus grandes organisations de lutte contre les incendies et de secours au monde, agissant dans la protection des personnes\
+            et biens contre les incendies sur un périmètre de 1587 kilomètres carrés autour du Grand Londres.\
+           \n\n Dans cette étude, nous nous plongeons dans l'analyse des données liées aux performances passées de la London Fire Brigade, en mettant l'accent\
+            sur leur **:red[efficacité de temps de réponse].** \n\nNous avons dans un premier temps prendre connaissance de notre jeu de données\
+            qui provient du site officiel et gouvernemental de la London Fire Brigade. Nous avons étudié puis nettoyé ces données afin de les rendre\
+            les plus lisibles et utiles à notre étude.\
+           \n\n Nous avons utilisé ensuite des techniques d'analyse de données et des modèles de prédiction pour mieux comprendre les tendances historiques\
+            et les facteurs qui influencent ces mesures cruciales.")
+
+
+profiling.step('Introduction/Les Données')
+st.subheader('Les Données')
+st.markdown('**:red[Source des Jeux de Données]**')
+st.markdown("Nos jeux données sont disponibles sur le site officiel de la ville de Londres - https://data.london.gov.uk, ce qui nous permet d'avoir une entière confiance\
+               en leur provenance et leur intégrité. \n\nDurant la phase exploratoire de notre projet, nous avons également été en contact avec des Business\
+               Intelligence Analysts de la London Fire Brigade, qui ont répondu rapidement à nos questions, et nous les en remercions.")
+st.markdown('**:red[Description des Données]**')
+st.markdown("Nous avions deux principaux jeux de données disponibles :\
+              \n - **Incident Records** : les détails de chaque incident sur lequel la LFB est intervenue depuis le 1er janvier 2009. Des informations sont\
+               fournies sur la date et le lieu de l'incident ainsi que sur le type d'incident. \
+              \n - **Mobilisation Records** : les détails de chaque véhicule d'incendie envoyé sur les lieux d'un incident depuis janvier 2009.\
+              Des informations sont fournies sur l'engin mobilisé, le lieu d'où il a été déployé et les heures d'arrivée sur les lieux de l'incident.")
+
+col1, col2 = st.columns(2)
+
+with col1:
+  st.write("***Incident Records***")
+  metadata = registry.table("Metadata.csv")
+  st.dataframe(metadata)
+with col2:
+  st.write("***Mobilisation Records***")
+  metadata_mobi = registry.table("Mobilisations-Metadata.csv")
+  st.dataframe(metadata_mobi)
+
+st.markdown("Nous disposons de 3 colonnes communes aux 2 jeux de données (*IncidentNumber*, *Calyear*, et *HourOfCall*) à partir desquelles\
+               nous allons **fusionner nos tables**.")
+
+st.markdown('**:red[DataFrame Consolidé]**')
+st.markdown("Voici un aperçu de notre DataFrame consolidé, avant toute modification :")
+
+## Explorer le DataFrame après fusion (filtres, tri et pagination côté serveur)
+explorer.show('consolidated')
+
+st.write("La taille de notre dataframe est : `(2220718, 58)`")
+
+st.markdown("Pour la suite du projet et notamment la partie modélisation, c'est la variable ***:red[AttendanceTimeSeconds]*** que nous choisissons comme\
+              notre **variable cible**. Il s'agit du temps de réponse pour un camion mobilisé, comprenant le temps de préparation de la brigade\
+               une fois cette dernière informée ainsi que le temps de trajet pour ce rendre sur le lieu de l'incident.")
@@ -0,0 +1,285 @@
+#### PAGE 4 : MODELISATION
+
+import pandas as pd
+import streamlit as st
+
+from lfb import figures, images, importances, multitarget, pca, predict, profiling, registry, stats, training, tuning
+
+profiling.step('Modélisation/Préparation')
+st.header("Modelisation")
+
+#df = assets.read_csv("df_final2.csv", low_memory = False, index_col = 0)
+
+st.write("En premier lieu nous devons nettoyer notre jeu de données et supprimer les colonnes que nous avions gardé pour la DataVisualisation.\
+  \nNous supprimons les colonnes d'identification (ID), la colonne DateOfCall qui répètent les informations de Day0fCall, MonthOfCall et CalYear ainsi que les colonnes TurnoutTimeSeconds et TravelTimeSeconds afin d’éviter une fuite donnée qui donneraient à tort une surperformance à notre modèle de prédiction, car elles permettent de calculer notre variable cible.")
+
+st.write("Ensuite nous réduisons notre jeu de données en ne gardant que les **informations postérieures à 2015** car une dizaine de caserne ont fermé fin 2014 dans le cadre d’un plan de secours de sauvegarde financière. \
+  \nCe choix a été fait afin de ne pas fausser les estimations sur ces casernes qui seraient sous représentées et afin également de supprimer les Nans présents dans la colonne Distance pour ces casernes.")
+
+st.write("Pour continuer ce nettoyage nous avons modifié le type de certaines variable numérique en catégorielle car ce sont des indicateurs temporels et qu’il ne faut pas que le modèle de prédiction cherche à les quantifier ou les ordonner.")
+
+
+profiling.step('Modélisation/Réduction de dimensions')
+# REDUCTION DE DIMENSIONS
+st.subheader("Reduction de dimensions")
+
+st.write("Nous avons donc maintenant un jeu de données de taille `(1295782, 20)`. Nous avons donc décidé de tenter une réduction de dimensions, après avoir encodé nos variables catégorielles et standardiser nos données, nous nous retrouvons avec 351 colonnes et une explication de la variance comme suit : ")
+
+if pca.available():
+  figures.plot(pca.variance_figure(pca.load()))
+else:
+  images.show("pca_variance.png")
+with st.expander(label = "Lecture du graphique"):
+  st.write("Nous  constatons une chute à environ 40 nombres de facteurs, voyons voir ce que cela représente en terme de pourcentage.")
+
+if pca.available():
+  figures.plot(pca.ratio_figure(pca.load()))
+else:
+  images.show("pca_ratio.png")
+with st.expander(label = "Lecture du graphique"):
+  st.write("Cela ne représente que 30% de notre jeu de données, c'est peu. Par curiosité, nous visualisons avec deux axes ce que cela représente.")
+
+if pca.available():
+  figures.plot(pca.circle_figure(pca.load()), height=600)
+else:
+  images.show("cercle.png")
+with st.expander(label = "Lecture du graphique"):
+  st.write("Comme nous nous y attendions, cela n'est pas très parlant, plusieurs groupes de variables semblent être bien corrélées entre elles mais il n'y a aucun intérêt à réduire ici les dimensions sur deux axes puisque les corrélations avec les axes sont très faibles, la plupart d’entre elles ne dépassent même pas les 0.2, -0.2. \n\n Nous ne pouvons donc pas nous aider des réductions de dimensions pour réduire notre jeu de données.")
+
+profiling.step('Modélisation/Corrélations')
+# CORRELATIONS
+st.subheader("Corrélations")
+
+st.write("Afin d’optimiser notre modèle de prédictions nous décidons d’étudier les corrélations entre les variables explicatives et la variable cible.")
+
+st.markdown("- ##### Variables Numériques")
+
+# Heatmap
+images.show("heatmap.png")
+with st.expander(label = "Lecture du graphique"):
+  st.write("A l'aide de cette heatmap, nous décidons de supprimer les colonnes CallCount et MobilisationTime car ce sont celles qui sont le moins corrélées à notre variable cible AttendanceTimeSeconds.")
+
+
+st.markdown("- ##### Variables Catégorielles")
+# Test Anova
+if stats.available():
+  ## Tests recalculés depuis les accumulateurs (lfb.stats), pour le sous-ensemble choisi
+  acc = stats.load()
+  with st.expander(label = "Filtres des tests"):
+    first, last = int(acc['CalYear'].min()), int(acc['CalYear'].max())
+    years = st.slider(':gray[Années]', first, last, (first, last), key='stats_years')
+    boroughs = st.multiselect(':gray[Quartiers]', sorted(acc['BoroughName'].unique()), key='stats_boroughs')
+  anova, khi2 = stats.tests(years, boroughs)
+  st.dataframe(anova, hide_index=True)
+  st.write("Test du khi-deux entre chaque variable et la classe de temps de réponse (3 classes) :")
+  st.dataframe(khi2, hide_index=True)
+else:
+  anova = registry.table("anova.csv")
+  st.dataframe(anova)
+
+with st.expander(label = "Lecture du tableau"):
+  st.write("Le résultat est sans appel, toutes nos variables explicatives sont corrélées à notre variable cible. Nous décidons donc de toutes les garder.")
+
+
+
+profiling.step('Modélisation/Modèles')
+# MODELISATION
+st.subheader("Modélisation")  
+
+st.write("Notre objectif est d’obtenir un score de test :red[**supérieur à 70%.**]\
+  \nNotre variable cible est une **variable continue**, ce qui signifie que nous avons à faire à une méthode de **régression**. Après encodage de notre jeu de données\
+   nous avons un data frame de taille `(1295782 , 363)`.\
+  \n\n Notre tâche sera d’estimer en fonction des informations fournies, le temps d’intervention potentiel.\
+  \n \nNous allons essayer les 3 algorithmes suivants :") 
+st.markdown("- Linear Regression \
+  \n- Decision Tree Regressor \
+  \n- Random Forest Regressor")
+
+st.write("Pour l’évaluation de la performance de nos prédictions nous disposons du MSE, RMSE, MAE et score R2.")
+
+#####  RESULTAT DES 3 MODELES REGRESSION##### 
+
+tab1, tab2, tab3 = st.tabs(["Linear Regression", "Decision Tree Regressor", "Random Forest Regressor"])
+
+with tab1:
+  images.show("linear_reg.png")
+
+with tab2:
+  images.show("dtr.png")
+
+with tab3:
+  images.show("rf.png")
+
+st.write("Au vu des résultats du score r2, la métrique la plus lisible, nous avons pu déterminer que le :red[**Random Forest**] est l’algorithme le plus performant.\
+  \nCependant, nous avons un grand dataframe et ce modèle est très énergivore (Plus d’une heure d'execution).\
+  \nNous décidons donc de convertir nos valeurs dans notre variable cible en différentes classes afin de simplifier notre prédictions en une :red[**classification.**]")
+
+st.write("Pour déterminer la séparation de ces classes, nous observons la distribution de notre variable cible.")
+
+figures.show("plot6_bis", height=400)
+
+st.write("Nous décidons de séparer notre variables en 5 classes avec , 1 classe par quartile puis 1 classe pour les valeurs extrêmes.")
+
+figures.show("plot7_bis", height=450)
+
+
+st.write("Nous allons relancer 3 nouveaux modèles , de classification cette fois ci :") 
+st.markdown("- Logistic Regression \
+  \n- Decision Tree Classifier \
+  \n- Random Forest Classifier")
+
+st.write("Cette fois-ci, étant donné qu’il s’agit d’un modèle de classification, nous utiliserons le R2 score, le rapport de classification ainsi qu’un tableau de confusion pour évaluer la performance des différents modèles. L’ensemble de ces métriques nous apporte des informations importantes sur notre résultat.")
+
+
+#####  RESULTAT DES 3 MODELES CLASSIFICATION (5 CLASSES) ##### 
+tab1, tab2, tab3 = st.tabs(["Logistic Regression", "Decision Tree Classifier", "Random Forest Classifier"])
+
+with tab1:
+  images.show("lr5.png")
+
+with tab2:
+  images.show("dt5.png")
+
+with tab3:
+  images.show("rf5.png")
+
+
+st.write(":red[**Random Forest**] est encore une fois le modèle le plus performant et cette fois-ci l'exécution est nettement plus rapide(moins de 10min), nous allons approfondir nos recherches sur ce modèle.\
+  \n\nTout d'abord nous allons modifier la classification car beaucoup de valeurs écartées se retrouvent dans la même classe,nous allons donc les répartir par temps similaire plutôt que par part égales de valeurs. En effet la classe 5 a un très mauvais recall, cela se comprend par le fait qu’il s’agit de valeurs extrêmes, elles sont moins bien représentées pour commencer mais aussi elles sont moins logiques pour le modèle de prédictions donc plus difficile encore à prédire.\
+  \n\nEnsuite nous étudierons les features importantes afin de visualiser si certaines colonnes peuvent être supprimées.\
+  \n\nPour finir nous nous pencherons sur les hyperparamètres.")
+
+profiling.step('Modélisation/Classes')
+# ETAPE 1: LES CLASSES
+st.markdown("- ##### Etape 1: Retravailler les classes")
+
+st.write("Nous décidons de **réduire nos classes**, afin de déterminer la séparation de ces classes, nous observons les zones où se regroupent les temps les plus similaires. Pour cela nous ferons deux test:\
+  \n\n Le premier test avec **4 classes**. \
+  \nPour ce qui est de la classe 4 nous décidons d’y inclure les valeurs les plus fortes plus les valeurs extrêmes ce qui semble être le plus logique pour la compréhension de ces valeurs extrêmes.\
+  \nNous avons donc :\
+  \n- Classe 1(Temps rapide) : De 0 à 2:48 (2 min et 48 sec)\
+  \n- Classe 2(Temps moyen): De 2:48 à 5:48\
+  \n- Classe 3(Temps long): De 5:48 à 10:24\
+  \n- Classe 4(Temps très long) : De 10:24 à 20min.")
+
+figures.show("plot8", height=450)
+
+st.write("Le deuxième test avec **3 classes**. \
+  \nNous avons donc :\
+  \n- Classe 1(Temps rapide) : De 0 à 4:04 (2 min et 48 sec)\
+  \n- Classe 2(Temps moyen): De 04:04 à 10:24\
+  \n- Classe 3(Temps long): De 10:24 à 20min")
+
+figures.show("plot9", height=450)
+
+st.write(" Observons les résultats")
+
+
+
+##### RESULTAT DES 2 MODELES (4 classes et 3 classes) ##### 
+
+option = st.selectbox(
+  'Choissisez le nombre de classes pour voir le résultat',
+  ('4 classes', '3 classes'))
+
+if option == "4 classes":
+  images.show("rf_4.png")
+
+if option == "3 classes":
+  images.show("rf_3.png")
+
+reports = training.load_reports(int(option[0]))
+if reports:
+  st.write(":gray[Ré-entraînement (lfb.training) : métriques, temps d'entraînement et pic mémoire]")
+  st.dataframe(training.summary(reports), hide_index=True)
+
+
+with st.expander(label = "Lecture des résultats"):
+  st.write("Les classes sont toutes bien prédites et nous avons un très bon score ainsi que de bons résultats de precision, recall et donc de F1\
+    \nNous allons maintenant tenter d'affiner la performance grâce aux :red[**hyperparamètres**].")
+
+
+profiling.step('Modélisation/Hyperparamètres')
+# ETAPE 2 : HYPERPARAMETRES
+st.markdown("- ##### Etape 2 : Hyperparamètres")
+
+st.markdown("Afin de connaître rapidement quelles seraient les meilleures hyperparamètres, nous allons utiliser la validation croisée (cross-validation) pour évaluer différentes combinaisons d'hyper paramètres et choisir celle qui donne les meilleures performances.\
+  \nPour cela, nous nous servirons de **SearchGridCV** dont voici les résultats: ")
+
+if tuning.available():
+  st.write(":gray[Recherche par divisions successives (lfb.tuning) : chaque tour ne garde que le meilleur tiers des configurations, évaluées sur trois fois plus de lignes.]")
+  st.dataframe(tuning.results(), hide_index=True)
+  st.write("Nous garderons donc la configuration suivante")
+  st.dataframe(pd.DataFrame([tuning.best_params()]).astype(str), hide_index=True)
+else:
+  images.show("SearchGridCV.png")
+  st.write("Résultat:")
+  images.show("Search_results.png")
+
+  st.write("Nous garderons donc la configuration suivante")
+  images.show("best_hyperparametre.png")
+
+st.write("Voici le résultat final")
+
+##### DERNIER RESULTAT  #####
+
+images.show("rf3h.png")
+
+st.success("Nous avons atteint notre objectif !\
+  \n\n Nous avons légèrement amélioré notre prédiction, le résultat est atteint et nous en sommes très satisfait.",icon ="🎉")
+
+if predict.available():
+  st.write("**:red[Testez le modèle]** : renseignez une mobilisation pour prédire sa classe de temps de réponse.")
+  predict.form()
+
+profiling.step('Modélisation/Multi-cibles')
+## Entraînement parallèle de plusieurs cibles, dont MobilisationTime (lfb.multitarget)
+if multitarget.available():
+  st.markdown("- ##### Plusieurs variables cibles : AttendanceTimeSeconds et MobilisationTime")
+  run, reports = multitarget.load()
+  st.write(f":gray[{len(run['targets'])} modèles entraînés en parallèle ({run['workers']} processus x {run['n_jobs']} threads,\
+    {run['cores']} cœurs) sur une matrice commune de {run['rows']} lignes et {run['features']} variables : {run['wall_seconds']:.0f} s au total\
+    pour {run['cpu_seconds']:.0f} s de calcul cumulé.]")
+  st.dataframe(multitarget.summary(reports), hide_index=True)
+
+profiling.step('Modélisation/Features Importances')
+# FEATURES IMPORTANCES
+st.markdown("- ##### Features Importances")
+st.write("Nous allons étudier les feature importances pour déceler quelles sont les variables ayant le plus de poids et quelles conclusions pouvons nous tirer de notre travail de modélisation")
+
+images.show("features.png")
+
+with st.expander(label = "Lecture des résultats"):
+ st.write("Etant donné que nos variables catégorielles ont été encodé, nous avons un affichage de ces variables par valeurs.")
+
+st.write("Nous automatisons un calcul qui nous donnera la feature importance par variable complète.") 
+
+case = st.checkbox(":gray[Afficher le code : Calcul des Feature Importances par variable]")
+code = '''from lfb import importances
+
+# Variable d'origine de chaque colonne one-hot, calculée une seule fois (tableau d'entiers)
+group, variables = importances.groups(model)
+
+# Somme des importances par variable en une opération vectorisée
+variable_importances = importances.grouped(model[-1].feature_importances_, group, variables)
+
+# Importance par permutation, variable par variable, sur un échantillon stratifié du jeu de test
+permutation = importances.permutation(model, X_test, y_test, sample=20000, repeats=5)'''
+
+if case:
+  st.code(code, language='python')
+
+if importances.available():
+  table = importances.load()
+  figures.plot(importances.figure(table), height=None)
+  figures.plot(importances.figure(table, top=importances.TOP), height=None)
+  figures.plot(importances.figure(table, 'permutation'), height=None)
+else:
+  images.show("full_features.png")
+  images.show("top_features.png")
+
+st.write("**:red[Notre avis métier]**")
+
+st.write("  La variable ayant le plus grand impact est DelayCode, nous avions pu constater grâce aux datavisualisation que le motif de retard qui impactait le plus notre variable cible est le fait d’avoir une adresse incomplète. Une recommandation que nous pourrions faire est de lancer une campagne pédagogique auprès de l’équipe du centre d’appel pour mieux capturer et communiquer l'information de l'adresse.\
+  \n\nLa seconde variable est Distance, de là on peut se demander si l’attribution des casernes par rapport au lieu des incidents est optimale et dans le cas contraire retravailler la répartition.\
+  \n\nPour finir, nous avons la variable HourOfCall et nous savons que les heures de grand trafic ou les heures où le volume d’incident sont les plus importants sont celles qui font augmenter le temps de réponse mais à notre niveau nous ne pouvons pas proposer de solution si ce n’est une augmentation des effectifs, ce qui doit assurément être une problématique déjà connue de la LFB.")
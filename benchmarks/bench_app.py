@@ -0,0 +1,124 @@
+"""Rendu des pages de l'application (pompiers.py), piloté sans navigateur par AppTest.
+
+Pour chaque page, dans un processus séparé (pic mémoire indépendant) :
+
+- latence du premier affichage, la session arrivant directement sur la page (caches vides,
+  modules de la page importés), puis médiane des réaffichages ;
+- octets envoyés au navigateur : messages protobuf (ForwardMsg) + fichiers média (st.image),
+  et images statiques (lfb.images) que télécharge un navigateur lisant l'AVIF, pour une
+  colonne de 704 px en densité 1 (toutes les images de la page, onglets compris) ;
+- pic de mémoire résidente, et mémoire après import de Streamlit pour référence.
+
+    python benchmarks/bench_app.py [--reruns 5] [--out bench_app.json]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import common
+
+APP = os.path.join(common.ROOT, 'pompiers.py')
+PAGES = ['app_pages/introduction.py', 'app_pages/enrichissements.py', 'app_pages/dataviz.py',
+         'app_pages/modelisation.py', 'app_pages/conclusion.py']
+
+
+def _instrument():
+    # Compte les octets de chaque exécution : messages du script et fichiers média enregistrés
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.testing.v1 import local_script_runner
+
+    sent = {'proto': 0, 'media': 0}
+    parse = local_script_runner.parse_tree_from_messages
+
+    def parse_and_count(messages):
+        sent['proto'] += sum(m.ByteSize() for m in messages)
+        return parse(messages)
+
+    store = MemoryMediaFileStorage.load_and_get_id
+
+    def store_and_count(self, path_or_data, *args, **kwargs):
+        if isinstance(path_or_data, (bytes, bytearray)):
+            sent['media'] += len(path_or_data)
+        return store(self, path_or_data, *args, **kwargs)
+
+    local_script_runner.parse_tree_from_messages = parse_and_count
+    MemoryMediaFileStorage.load_and_get_id = store_and_count
+    return sent
+
+
+def _static_bytes(at):
+    # Fichiers distincts choisis dans les srcset (première source = format préféré), plus les <img>
+    chosen = set()
+    for markdown in at.get('markdown'):
+        html = markdown.value
+        for picture in re.findall(r'<picture>.*?</picture>', html, re.S):
+            srcset = re.search(r'srcset="([^"]+)"', picture).group(1)
+            sizes = re.search(r'sizes="([^"]+)"', picture).group(1)
+            slot = int(sizes[:-2]) if re.fullmatch(r'\d+px', sizes) else 704
+            candidates = sorted((int(w[:-1]), url) for url, w in (c.split() for c in srcset.split(', ')))
+            chosen.add(next((url for w, url in candidates if w >= slot), candidates[-1][1]))
+        html = re.sub(r'<picture>.*?</picture>', '', html, flags=re.S)
+        chosen.update(re.findall(r'<img src="(app/static/[^"]+)"', html))
+    return sum(os.path.getsize(os.path.join(common.ROOT, url[len('app/'):])) for url in chosen)
+
+
+def _timed_run(at, sent):
+    sent['proto'] = sent['media'] = 0
+    start = time.perf_counter()
+    at.run()
+    return time.perf_counter() - start, dict(sent)
+
+
+def child(page, reruns):
+    from streamlit.testing.v1 import AppTest
+
+    sent = _instrument()
+    baseline = common.rss()
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.switch_page(page)
+    cold, cold_bytes = _timed_run(at, sent)
+    warm, warm_bytes = [], None
+    for _ in range(reruns):
+        seconds, warm_bytes = _timed_run(at, sent)
+        warm.append(seconds)
+    print(json.dumps({
+        'page': page, 'cold_s': round(cold, 4), 'warm_s': round(statistics.median(warm), 4) if warm else None,
+        'proto_bytes': cold_bytes['proto'], 'media_bytes': cold_bytes['media'], 'static_bytes': _static_bytes(at),
+        'warm_proto_bytes': warm_bytes['proto'] if warm_bytes else None,
+        'peak_rss_bytes': common.peak_rss(), 'baseline_rss_bytes': baseline,
+        'exceptions': [e.value for e in at.exception],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reruns', type=int, default=5)
+    parser.add_argument('--pages', nargs='*', default=PAGES)
+    parser.add_argument('--out', help='fichier JSON de résultats (en plus de l\'historique)')
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child[0], int(args.child[1]))
+
+    results = []
+    for page in args.pages:
+        out = subprocess.run([sys.executable, __file__, '--child', page, str(args.reruns)],
+                             check=True, capture_output=True, text=True, cwd=common.ROOT).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+        print(results[-1])
+    report = {'reruns': args.reruns, 'results': results}
+    previous = common.record('app', report)
+    common.compare(results, previous, 'page', ['cold_s', 'warm_s', 'proto_bytes', 'media_bytes', 'static_bytes',
+                                               'peak_rss_bytes'])
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Fusion Incidents x Mobilisations : pd.merge naïf contre fusion en flux (lfb.ingestion).
+
+Chaque méthode est exécutée dans un processus séparé afin de mesurer son pic de mémoire
+(RSS) indépendamment ; les fichiers sources sont synthétiques, au format des fichiers LFB.
+
+    python benchmarks/bench_ingestion.py --incidents 500000 --out bench_ingestion.json
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import common
+
+sys.path.insert(0, common.ROOT)
+
+
+def generate(directory, incidents, mobilisations_per_incident=1.3, seed=0):
+    rng = np.random.default_rng(seed)
+    n = incidents
+    ids = pd.Series(np.arange(n)).astype(str) + '091'
+    years = rng.integers(2009, 2024, n)
+    hours = rng.integers(0, 24, n)
+    inc = pd.DataFrame({
+        'IncidentNumber': ids, 'CalYear': years, 'HourOfCall': hours,
+        'DateOfCall': '01 Jan 2015', 'TimeOfCall': '00:02:15',
+        'IncidentGroup': rng.choice(['False Alarm', 'Fire', 'Special Service'], n),
+        'StopCodeDescription': rng.choice(['AFA', 'Primary Fire', 'Special Service'], n),
+        'PropertyCategory': rng.choice(['Dwelling', 'Outdoor', 'Road Vehicle'], n),
+        'PropertyType': rng.choice(['House - single occupancy', 'Car', 'Purpose Built Flats'], n),
+        'AddressQualifier': rng.choice(['Correct incident location', 'In street outside gazetteer location'], n),
+        'Postcode_district': rng.choice(['CR0', 'SW11', 'N9'], n),
+        'IncGeo_BoroughName': rng.choice(['CROYDON', 'WANDSWORTH', 'ENFIELD'], n),
+        'IncGeo_WardName': rng.choice(['South Croydon', 'Battersea', 'Edmonton'], n),
+        'Easting_rounded': rng.integers(505000, 555000, n), 'Northing_rounded': rng.integers(160000, 200000, n),
+        'IncidentStationGround': rng.choice(['Addington', 'Battersea', 'Edmonton'], n),
+        'NumPumpsAttending': rng.integers(1, 4, n).astype(float), 'PumpHoursRoundUp': rng.integers(1, 5, n),
+    })
+    m = int(n * mobilisations_per_incident)
+    pick = rng.integers(0, n, m)
+    mob = pd.DataFrame({
+        'IncidentNumber': ids.to_numpy()[pick], 'CalYear': years[pick], 'HourOfCall': hours[pick],
+        'ResourceMobilisationId': np.arange(m), 'Resource_Code': rng.choice(['H262', 'A351'], m),
+        'DateAndTimeMobilised': '01/01/2015 00:02:36', 'DateAndTimeArrived': '01/01/2015 00:07:18',
+        'TurnoutTimeSeconds': rng.integers(30, 200, m).astype(float),
+        'TravelTimeSeconds': rng.integers(30, 900, m).astype(float),
+        'AttendanceTimeSeconds': rng.integers(60, 1200, m),
+        'DeployedFromStation_Code': rng.choice(['H26', 'A35', 'E39'], m),
+        'DeployedFromStation_Name': rng.choice(['Addington', 'Enfield', 'Bromley'], m),
+        'PumpOrder': rng.integers(1, 4, m),
+        'DelayCode_Description': rng.choice(['Not held up', 'Traffic, roadworks, etc', ''], m),
+    })
+    paths = os.path.join(directory, 'incidents.csv'), os.path.join(directory, 'mobilisations.csv')
+    inc.to_csv(paths[0], index=False)
+    mob.to_csv(paths[1], index=False)
+    return paths
+
+
+def run_naive(incidents, mobilisations, target):
+    df = pd.read_csv(incidents, dtype={'IncidentNumber': str}, low_memory=False).merge(
+        pd.read_csv(mobilisations, dtype={'IncidentNumber': str}, low_memory=False),
+        on=['IncidentNumber', 'CalYear', 'HourOfCall'])
+    df.to_parquet(target, partition_cols=['CalYear'])
+    return len(df)
+
+
+def run_streaming(incidents, mobilisations, target):
+    from lfb import ingestion
+    return ingestion.merge(incidents, mobilisations, target)
+
+
+METHODS = {'naive': run_naive, 'streaming': run_streaming}
+
+
+def child(method, incidents, mobilisations, target):
+    start = time.perf_counter()
+    rows = METHODS[method](incidents, mobilisations, target)
+    wall = time.perf_counter() - start
+    print(json.dumps({'method': method, 'rows': rows, 'wall_s': round(wall, 3), 'peak_rss_bytes': common.peak_rss()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--incidents', type=int, default=200_000)
+    parser.add_argument('--out', help='fichier JSON de résultats')
+    parser.add_argument('--child', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(*args.child)
+
+    workdir = tempfile.mkdtemp(prefix='lfb-bench-')
+    try:
+        incidents, mobilisations = generate(workdir, args.incidents)
+        results = []
+        for method in METHODS:
+            target = os.path.join(workdir, method)
+            out = subprocess.run([sys.executable, __file__, '--child', method, incidents, mobilisations, target],
+                                 check=True, capture_output=True, text=True).stdout
+            results.append(json.loads(out.strip().splitlines()[-1]))
+            print(results[-1])
+        report = {'benchmark': 'ingestion', 'incidents': args.incidents,
+                  'source_bytes': os.path.getsize(incidents) + os.path.getsize(mobilisations), 'results': results}
+        previous = common.record('ingestion', report)
+        common.compare(results, previous, 'method', ['wall_s', 'peak_rss_bytes'])
+        if args.out:
+            with open(args.out, 'w') as f:
+                json.dump(report, f, indent=2)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Micro-benchmarks des étapes de données : lecture CSV/Parquet, enrichissement, agrégation, inférence.
+
+Chaque étape est répétée et le meilleur temps est retenu (ainsi que la médiane) ; les données
+sont synthétiques, au format du jeu de modélisation.
+
+    python benchmarks/bench_stages.py [--rows 500000 --repeat 3] [--out bench_stages.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import common
+
+sys.path.insert(0, common.ROOT)
+
+
+def measure(name, function, repeat, rows):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    result = {'stage': name, 'rows': rows, 'best_s': round(min(times), 4),
+              'median_s': round(statistics.median(times), 4), 'rows_per_s': round(rows / min(times))}
+    print(result)
+    return result
+
+
+def stages(rows, repeat, workdir):
+    import pandas as pd
+
+    from lfb import cubes, enrichment, frame, training
+
+    df = common.synthetic_frame(rows)
+    csv_path = os.path.join(workdir, 'frame.csv')
+    parquet_path = os.path.join(workdir, 'frame.parquet')
+    df.to_csv(csv_path, index=False)
+    frame.save(frame.optimize(df.copy()), parquet_path)
+    stations = enrichment.StationLookup(common.STATIONS)
+
+    results = [
+        measure('read_csv_pandas', lambda: pd.read_csv(csv_path, low_memory=False), repeat, rows),
+        measure('read_csv_categorical', lambda: frame.read_csv(csv_path), repeat, rows),
+        measure('read_parquet', lambda: frame.load(parquet_path), repeat, rows),
+        measure('enrichment_distance', lambda: enrichment.add_distance(df.copy(), stations), repeat, rows),
+    ]
+    enriched = enrichment.add_distance(df.copy(), stations)
+    results.append(measure('cubes_build', lambda: cubes.build(enriched), repeat, rows))
+    cube = cubes.aggregate(enriched, cubes.CUBES['incidents'])
+    results.append(measure('cubes_rollup', lambda: cubes.rollup(cube, ['HourOfCall', 'IncidentGroup']),
+                           repeat, len(cube)))
+
+    # Inférence : petit Random Forest (encodage creux) entraîné sur une partie des lignes
+    modelling = frame.optimize(enriched.drop(columns=['DeployedFromStation_Code', 'Easting_rounded',
+                                                      'Northing_rounded']))
+    X, y = training.prepare(modelling, 3)
+    model = training.make_model(X, 'sparse', n_estimators=20, max_depth=12, n_jobs=1)
+    model.fit(X.iloc[:50_000], y.iloc[:50_000])
+    one = X.iloc[[0]]
+    results.append(measure('predict_one', lambda: model.predict(one), max(repeat, 20), 1))
+    results.append(measure('predict_batch', lambda: model.predict(X), repeat, len(X)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--out', help='fichier JSON de résultats (en plus de l\'historique)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='lfb-bench-')
+    try:
+        results = stages(args.rows, args.repeat, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    report = {'rows': args.rows, 'repeat': args.repeat, 'peak_rss_bytes': common.peak_rss(), 'results': results}
+    previous = common.record('stages', report)
+    common.compare(results, previous, 'stage', ['best_s'])
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Outils partagés des benchmarks : mesure mémoire, données synthétiques, historique JSON.
+
+Chaque exécution est ajoutée à `benchmarks/results/<benchmark>.jsonl` (une ligne par exécution,
+avec le commit git) : la comparaison avec l'exécution précédente fait apparaître les régressions.
+"""
+import json
+import os
+import platform
+import resource
+import subprocess
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+
+def peak_rss():
+    # VmHWM est remis à zéro par exec, contrairement à ru_maxrss qui hérite du pic du processus parent
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True)
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return out.stdout.strip() + ('-dirty' if dirty else '')
+    except OSError:
+        return None
+
+
+def record(name, report):
+    # Ajoute l'exécution à l'historique et renvoie l'exécution précédente (ou None)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, name + '.jsonl')
+    previous = None
+    if os.path.exists(path):
+        with open(path) as f:
+            lines = [line for line in f if line.strip()]
+        if lines:
+            previous = json.loads(lines[-1])
+    entry = {'benchmark': name, 'commit': commit(), 'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+             'host': platform.node(), 'python': platform.python_version(), **report}
+    with open(path, 'a') as f:
+        f.write(json.dumps(entry) + '\n')
+    return previous
+
+
+def compare(results, previous, key, metrics):
+    # Variation relative de chaque mesure par rapport à l'exécution précédente
+    if not previous:
+        return
+    before = {r[key]: r for r in previous.get('results', [])}
+    for result in results:
+        old = before.get(result[key])
+        if not old:
+            continue
+        changes = []
+        for metric in metrics:
+            if result.get(metric) and old.get(metric):
+                changes.append(f'{metric} {100 * (result[metric] / old[metric] - 1):+.0f}%')
+        print(f"  {result[key]} vs {previous.get('commit')}: {', '.join(changes)}")
+
+
+def synthetic_frame(n, seed=0):
+    # Mobilisations fusionnées au format du jeu de modélisation (colonnes et ordres de grandeur LFB)
+    rng = np.random.default_rng(seed)
+    boroughs = ['CROYDON', 'WANDSWORTH', 'ENFIELD', 'CAMDEN', 'BARNET', 'LAMBETH', 'HACKNEY', 'BROMLEY']
+    grounds = ['Addington', 'Battersea', 'Edmonton', 'Holloway', 'Kentish Town', 'Enfield', 'Bromley', 'Clapham']
+    groups = rng.choice(['False Alarm', 'Fire', 'Special Service'], n, p=[0.48, 0.18, 0.34])
+    turnout = rng.integers(30, 200, n)
+    travel = rng.integers(30, 900, n)
+    return pd.DataFrame({
+        'IncidentNumber': pd.Series(rng.integers(0, n // 2 + 1, n)).astype(str) + '091',
+        'ResourceMobilisationId': np.arange(n),
+        'CalYear': rng.integers(2015, 2024, n), 'HourOfCall': rng.integers(0, 24, n),
+        'MonthOfCall': rng.choice(['January', 'February', 'March', 'April'], n),
+        'DayOfCall': rng.choice(['Monday', 'Tuesday', 'Friday', 'Sunday'], n),
+        'IncidentGroup': groups,
+        'StopCodeDescription': np.where(groups == 'Fire', 'Primary Fire', np.where(groups == 'False Alarm', 'AFA', 'Special Service')),
+        'SpecialServiceType': np.where(groups == 'Special Service', 'Flooding', 'Not a Special Service'),
+        'PropertyCategory': rng.choice(['Dwelling', 'Outdoor', 'Road Vehicle', 'Non Residential'], n),
+        'AddressQualifier': rng.choice(['Correct incident location', 'In street outside gazetteer location'], n),
+        'BoroughName': rng.choice(boroughs, n), 'IncidentStationGround': rng.choice(grounds, n),
+        'DeployedFromStation_Code': rng.choice(['H26', 'A35', 'E39'], n),
+        'DeployedFromStation_Name': rng.choice(grounds, n),
+        'DelayCode_Description': rng.choice(['No delay', 'Traffic, roadworks, etc', 'Address incomplete/wrong'], n,
+                                            p=[0.75, 0.15, 0.10]),
+        'Easting_rounded': rng.integers(505000, 555000, n) // 50 * 50,
+        'Northing_rounded': rng.integers(160000, 200000, n) // 50 * 50,
+        'NumStationsWithPumpsAttending': rng.integers(1, 3, n).astype(float),
+        'NumPumpsAttending': rng.integers(1, 4, n), 'PumpOrder': rng.integers(1, 4, n),
+        'TurnoutTimeSeconds': turnout, 'TravelTimeSeconds': travel,
+        'AttendanceTimeSeconds': np.minimum(turnout + travel, 1200),
+    })
+
+
+STATIONS = pd.DataFrame({'DeployedFromStation_Code': ['H26', 'A35', 'E39'],
+                         'Station_Latitude': [51.3508, 51.4655, 51.6216],
+                         'Station_Longitude': [-0.0255, -0.1731, -0.0623]})
@@ -0,0 +1,117 @@
+"""Chargement des fichiers statiques de l'application (CSS, images, exports HTML, CSV).
+
+Chaque fichier n'est lu qu'une seule fois par processus : la clé de cache est le couple
+(chemin, version), un fichier régénéré est donc relu automatiquement et l'ancienne version
+finit par être évincée (nombre d'entrées borné). La version est l'empreinte du contenu pour
+un fichier servi depuis le paquet (lfb.bundle), sa date de modification sinon.
+"""
+import base64
+import io
+import os
+
+import streamlit as st
+
+from lfb import profiling
+
+# Dossier racine de l'application : les chemins relatifs sont résolus depuis ici
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Nombre maximum de fichiers gardés en mémoire par cache (éviction LRU au-delà)
+MAX_ENTRIES = 32
+
+
+def resolve(path):
+    return path if os.path.isabs(path) else os.path.join(ROOT, path)
+
+
+def _bundled(full):
+    # Empreinte du fichier s'il est servi depuis le paquet, None sinon
+    from lfb import bundle
+
+    return bundle.digest(full)
+
+
+def stamp(path):
+    # (chemin absolu, version) : clé des caches de lecture
+    full = resolve(path)
+    return full, _bundled(full) or os.stat(full).st_mtime_ns
+
+
+def exists(path):
+    full = resolve(path)
+    return _bundled(full) is not None or os.path.exists(full)
+
+
+def load(path):
+    # Contenu du fichier : depuis le paquet projeté en mémoire, ou lu sur le disque
+    from lfb import bundle
+
+    full = resolve(path)
+    if _bundled(full) is not None:
+        data = bundle.read(full)
+    else:
+        with open(full, 'rb') as f:
+            data = f.read()
+    profiling.count_read(len(data))
+    return data
+
+
+def open_file(path):
+    # Fichier binaire en lecture, pour les bibliothèques qui lisent un objet fichier (pandas, numpy, pyarrow)
+    return io.BytesIO(load(path))
+
+
+@st.cache_resource(max_entries=MAX_ENTRIES, show_spinner=False)
+def _read_bytes(path, mtime):
+    return load(path)
+
+
+@st.cache_resource(max_entries=MAX_ENTRIES, show_spinner=False)
+def _read_text(path, mtime):
+    return load(path).decode('utf-8')
+
+
+@st.cache_resource(max_entries=MAX_ENTRIES, show_spinner=False)
+def _data_uri(path, mtime, mime):
+    return 'data:{};base64,{}'.format(mime, base64.b64encode(_read_bytes(path, mtime)).decode())
+
+
+@st.cache_data(max_entries=MAX_ENTRIES, show_spinner=False)
+def _read_csv(path, mtime, **kwargs):
+    # pandas n'est importé qu'au premier tableau lu (les pages texte/images s'en passent)
+    import pandas as pd
+
+    return pd.read_csv(open_file(path), **kwargs)
+
+
+@st.cache_data(max_entries=MAX_ENTRIES, show_spinner=False)
+def _read_parquet(path, mtime, **kwargs):
+    import pandas as pd
+
+    # Dataset partitionné (dossier) : lu sur le disque par pandas
+    if os.path.isdir(path):
+        profiling.count_read(sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files))
+        return pd.read_parquet(path, **kwargs)
+    return pd.read_parquet(open_file(path), **kwargs)
+
+
+def read_bytes(path):
+    return _read_bytes(*stamp(path))
+
+
+def read_text(path):
+    return _read_text(*stamp(path))
+
+
+def data_uri(path, mime='image/png'):
+    # Image encodée en base64, prête à être insérée dans une balise <img>
+    return _data_uri(*stamp(path), mime)
+
+
+def read_csv(path, **kwargs):
+    # st.cache_data renvoie une copie : la page peut modifier le DataFrame sans risque
+    return _read_csv(*stamp(path), **kwargs)
+
+
+def read_parquet(path, **kwargs):
+    return _read_parquet(*stamp(path), **kwargs)
@@ -0,0 +1,223 @@
+"""Paquet unique des fichiers lus par les pages : contenu adressé par empreinte, compressé, projeté en mémoire.
+
+Sans paquet, l'application lit une trentaine de fichiers isolés (CSS, images, figures JSON,
+géométries, CSV), chacun à froid à sa première utilisation. `python -m lfb.bundle` :
+
+1. relève dans le script principal et les pages (app_pages/) les fichiers référencés par les
+   appels `images.show("...")`, `figures.show("...")`, `assets.read_csv("...")`, etc. (REFERENCES)
+   et vérifie qu'ils existent tous : une référence cassée fait échouer la construction, avec
+   le fichier et la ligne de l'appel ;
+2. écrit bundle/assets.bundle : les contenus, rangés par empreinte SHA-256 (un fichier
+   présent sous plusieurs noms n'est stocké qu'une fois), compressés en zlib quand c'est utile
+   (textes ; les images le sont déjà), suivis de l'index (chemin -> empreinte, position, taille).
+
+Au démarrage, l'application projette le paquet en mémoire (mmap) et demande au système de le
+lire en une fois (madvise WILLNEED, lecture séquentielle) : les fichiers sont ensuite servis
+depuis la mémoire. Les chemins de l'index sont relatifs à la racine de l'application, le
+répertoire de lancement de Streamlit est sans effet.
+
+L'index garde la taille et la date de modification de chaque fichier à la construction : un
+fichier modifié depuis (image régénérée, manifeste mis à jour) est lu sur le disque jusqu'à la
+reconstruction du paquet, un fichier absent du disque est servi depuis le paquet. LFB_BUNDLE
+désigne un autre paquet, ou le désactive si vide. Les variantes d'images de static/ restent
+des fichiers, servis directement par Streamlit.
+
+    python -m lfb.bundle [--allow-missing]
+"""
+import argparse
+import ast
+import glob
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+import streamlit as st
+
+from lfb import assets
+
+BUNDLE = os.environ.get('LFB_BUNDLE', os.path.join(assets.ROOT, 'bundle', 'assets.bundle'))
+
+MAGIC = b'LFBBNDL1'
+# En-tête : signature, position et taille de l'index (fin de fichier)
+HEADER = struct.Struct('<8sQQ')
+
+# Scripts analysés pour relever les fichiers utilisés
+SCRIPTS = ['pompiers.py', 'app_pages/*.py']
+
+# Extensions compressées (les formats d'image et .npz le sont déjà)
+COMPRESSED = {'.css', '.csv', '.json', '.html', '.svg', '.txt'}
+
+# Fichiers lus hors des appels relevés
+ALWAYS = ['style.css', 'static/images/manifest.json']
+
+
+def _figure(name):
+    from lfb import figures
+    return [figures.path(name)]
+
+
+def _map(name):
+    from lfb import geo
+    return [geo.path(name), geo.values_path(name)]
+
+
+def _source(name):
+    # Extrait livré avec l'application (le jeu complet, s'il existe, reste un dataset sur disque)
+    from lfb import explorer
+    return [explorer.SOURCES[name][-1]]
+
+
+# Appels relevés : (module, fonction) -> fichiers correspondant au premier argument
+REFERENCES = {
+    ('assets', 'read_bytes'): lambda name: [name],
+    ('assets', 'read_text'): lambda name: [name],
+    ('assets', 'read_csv'): lambda name: [name],
+    ('assets', 'data_uri'): lambda name: [name],
+    ('registry', 'table'): lambda name: [name],
+    ('images', 'show'): lambda name: [name],
+    ('images', 'src'): lambda name: [name],
+    ('figures', 'show'): _figure,
+    ('charts', 'show'): _figure,
+    ('geo', 'show'): _map,
+    ('explorer', 'show'): _source,
+}
+
+
+def references(scripts=SCRIPTS):
+    # [(chemin relatif, script, ligne)] des fichiers référencés par un littéral
+    found = []
+    for pattern in scripts:
+        for script in sorted(glob.glob(assets.resolve(pattern))):
+            with open(script, encoding='utf-8') as f:
+                tree = ast.parse(f.read(), script)
+            for node in ast.walk(tree):
+                if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                        and isinstance(node.func.value, ast.Name) and node.args
+                        and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str)):
+                    continue
+                paths = REFERENCES.get((node.func.value.id, node.func.attr))
+                if paths is None:
+                    continue
+                for path in paths(node.args[0].value):
+                    found.append((path, os.path.relpath(script, assets.ROOT), node.lineno))
+    return found
+
+
+def missing(found):
+    return [(path, script, line) for path, script, line in found if not os.path.exists(assets.resolve(path))]
+
+
+def build(paths, target=BUNDLE):
+    # Écrit le paquet (fichier temporaire puis renommage) ; renvoie l'index (chemin -> [empreinte, taille, date])
+    entries, blobs = {}, {}
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target + '.tmp', 'wb') as out:
+        out.write(HEADER.pack(MAGIC, 0, 0))
+        for path in sorted(set(paths)):
+            full = assets.resolve(path)
+            with open(full, 'rb') as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            if digest not in blobs:
+                stored, codec = data, 'raw'
+                if os.path.splitext(path)[1].lower() in COMPRESSED:
+                    packed = zlib.compress(data, 9)
+                    if len(packed) < 0.9 * len(data):
+                        stored, codec = packed, 'zlib'
+                blobs[digest] = {'offset': out.tell(), 'length': len(stored), 'size': len(data), 'codec': codec}
+                out.write(stored)
+            entries[path.replace(os.sep, '/')] = [digest, len(data), os.stat(full).st_mtime_ns]
+        index = json.dumps({'files': entries, 'blobs': blobs}, separators=(',', ':')).encode()
+        position = out.tell()
+        out.write(index)
+        out.seek(0)
+        out.write(HEADER.pack(MAGIC, position, len(index)))
+    os.replace(target + '.tmp', target)
+    return entries, blobs
+
+
+class Bundle:
+    # Paquet projeté en mémoire et son index
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(self.map, 'madvise'):
+            # Lecture anticipée de tout le paquet, d'un seul tenant
+            self.map.madvise(mmap.MADV_SEQUENTIAL)
+            self.map.madvise(mmap.MADV_WILLNEED)
+        magic, position, length = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} n'est pas un paquet lfb.bundle")
+        index = json.loads(self.map[position:position + length])
+        self.files, self.blobs = index['files'], index['blobs']
+
+    def entry(self, path):
+        # [empreinte, taille, date de modification] du fichier à la construction, ou None
+        return self.files.get(path)
+
+    def read(self, path):
+        blob = self.blobs[self.files[path][0]]
+        data = self.map[blob['offset']:blob['offset'] + blob['length']]
+        return zlib.decompress(data) if blob['codec'] == 'zlib' else data
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _open(path, mtime):
+    return Bundle(path)
+
+
+def current():
+    # Paquet en service, ou None (pas de paquet construit, ou LFB_BUNDLE vide)
+    if not BUNDLE or not os.path.exists(BUNDLE):
+        return None
+    return _open(BUNDLE, os.stat(BUNDLE).st_mtime_ns)
+
+
+def key(full):
+    # Chemin de l'index d'un fichier (relatif à la racine), None s'il est hors de l'application
+    relative = os.path.relpath(full, assets.ROOT)
+    return None if relative.startswith('..') else relative.replace(os.sep, '/')
+
+
+def digest(full):
+    # Empreinte du fichier dans le paquet, ou None s'il n'y figure pas ou a été modifié depuis
+    bundle = current()
+    relative = key(full)
+    entry = None if bundle is None or relative is None else bundle.entry(relative)
+    if entry is None:
+        return None
+    try:
+        stat = os.stat(full)
+    except FileNotFoundError:
+        return entry[0]
+    return entry[0] if (stat.st_size, stat.st_mtime_ns) == (entry[1], entry[2]) else None
+
+
+def read(full):
+    return current().read(key(full))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Construction du paquet des fichiers de l\'application')
+    parser.add_argument('--allow-missing', action='store_true',
+                        help='construire malgré des références à des fichiers absents')
+    parser.add_argument('--output', default=BUNDLE)
+    args = parser.parse_args()
+    found = references()
+    absent = missing(found)
+    for path, script, line in absent:
+        print(f'{script}:{line}: fichier introuvable : {path}', file=sys.stderr)
+    if absent and not args.allow_missing:
+        sys.exit(1)
+    absent_paths = {path for path, _, _ in absent}
+    paths = [path for path, _, _ in found if path not in absent_paths]
+    paths += [path for path in ALWAYS if os.path.exists(assets.resolve(path))]
+    entries, blobs = build(paths, args.output)
+    raw = sum(size for _, size, _ in entries.values())
+    print(f'{len(entries)} fichiers ({len(blobs)} contenus distincts), {raw} o -> {os.path.getsize(args.output)} o '
+          f'({args.output})')
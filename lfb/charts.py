@@ -0,0 +1,121 @@
+"""Graphiques de la page DataVizualisation recalculés à partir des cubes d'agrégats.
+
+Les figures reprennent la mise en forme des exports d'origine (plot1 à plot7) ; `filters`
+est le dictionnaire {years, boroughs, groups} transmis à cubes.query.
+"""
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from lfb import cubes, figures, profiling
+
+GROUP_COLORS = {'False Alarm': '#F7DC6F', 'Fire': '#DC7633', 'Special Service': '#B03A2E'}
+
+STOP_CODE_COLORS = {
+    'AFA': '#F7DC6F', 'False alarm - Good intent': '#fcf4d3', 'False alarm - Malicious': '#dec663',
+    'Primary Fire': '#DC7633', 'Secondary Fire': '#e69f70', 'Chimney Fire': '#b05e28',
+    'Late Call': '#84461e', 'Special Service': '#B03A2E', 'Use of Special Operations Room': '#d79c96',
+}
+
+
+def plot1(filters):
+    # Temps de réponse moyens selon l'heure de la journée
+    hours = cubes.rollup(cubes.query('incidents', **filters), 'HourOfCall')
+    fig = make_subplots(specs=[[{'secondary_y': True}]])
+    for measure, color, secondary in [('TravelTimeSeconds', '#F7DC6F', False),
+                                      ('AttendanceTimeSeconds', '#d52b1e', False),
+                                      ('TurnoutTimeSeconds', '#d7c797', True)]:
+        fig.add_trace(go.Scatter(x=hours['HourOfCall'], y=hours[measure + '_mean'], name=measure,
+                                 mode='lines+markers', line_color=color), secondary_y=secondary)
+    fig.update_layout(title="Les temps de réponse moyen selon l'heure de la journée")
+    fig.update_xaxes(title='Heure de la journée')
+    fig.update_yaxes(title='<b>TravelTime & AttendanceTime</b> en secondes', secondary_y=False)
+    fig.update_yaxes(title='<b>TurnoutTime</b> en secondes', secondary_y=True)
+    return fig
+
+
+def plot2(filters):
+    # Volume d'incidents selon l'heure de la journée et le type d'incident
+    hours = cubes.rollup(cubes.query('incidents', **filters), ['HourOfCall', 'IncidentGroup'])
+    fig = go.Figure([go.Bar(x=g['HourOfCall'], y=g['incidents'], name=group,
+                            marker_color=GROUP_COLORS.get(group))
+                     for group, g in hours.groupby('IncidentGroup')])
+    fig.update_layout(barmode='relative', legend_title='IncidentGroup',
+                      title="Répartition du volume d'incidents selon l'heure de la journée",
+                      xaxis_title='Heure de la journée', yaxis_title="Volume d'incidents")
+    return fig
+
+
+def plot3(filters):
+    # Mobilisations par quartier, triées par temps de réponse moyen croissant
+    cells = cubes.query('incidents', **filters)
+    order = cubes.rollup(cells, 'BoroughName').sort_values('AttendanceTimeSeconds_mean')['BoroughName']
+    boroughs = cubes.rollup(cells, ['BoroughName', 'IncidentGroup'])
+    fig = go.Figure([go.Bar(x=g['BoroughName'], y=g['n'], name=group, marker_color=GROUP_COLORS.get(group))
+                     for group, g in boroughs.groupby('IncidentGroup')])
+    fig.update_layout(barmode='relative', legend_title='IncidentGroup',
+                      title='Volume de mobilisations par quartier - trié par moyenne ascendante du temps de réponse',
+                      xaxis=dict(title='BoroughName', categoryorder='array', categoryarray=list(order)),
+                      yaxis_title='Quantité')
+    return fig
+
+
+def plot5(filters):
+    # Temps de trajet moyen selon la raison du retard
+    delays = cubes.rollup(cubes.query('delays', **filters), 'DelayCode_Description')
+    worst = set(delays.nlargest(3, 'TravelTimeSeconds_mean')['DelayCode_Description'])
+    colors = ['#B0BD83' if d == 'No delay' else '#d9534f' if d in worst else '#F7DC6F'
+              for d in delays['DelayCode_Description']]
+    fig = go.Figure(go.Bar(x=delays['DelayCode_Description'], y=delays['TravelTimeSeconds_mean'],
+                           marker_color=colors))
+    fig.update_layout(title='Temps de trajet moyen selon la raison du retard', showlegend=False,
+                      xaxis_title='Raison du retard', yaxis_title='Moyenne TravelTimeSeconds')
+    return fig
+
+
+def plot6(filters):
+    # Temps de réponse moyen et distance moyenne par quartier
+    boroughs = cubes.rollup(cubes.query('incidents', **filters), 'BoroughName')
+    fig = make_subplots(specs=[[{'secondary_y': True}]])
+    fig.add_trace(go.Bar(x=boroughs['BoroughName'], y=boroughs['AttendanceTimeSeconds_mean'],
+                         name='AttendanceTimeSeconds (s)', marker_color='#B03A2E'))
+    fig.add_trace(go.Scatter(x=boroughs['BoroughName'], y=boroughs['Distance_mean'], name='Distance',
+                             mode='lines+markers', line_color='orange'), secondary_y=True)
+    fig.update_layout(title='Temps de réponse moyen et distance parcourue moyenne par quartier de Londres')
+    fig.update_xaxes(title='BoroughName')
+    fig.update_yaxes(title='AttendanceTimeSeconds', secondary_y=False)
+    fig.update_yaxes(title='Distance (m)', secondary_y=True)
+    return fig
+
+
+def plot7(filters):
+    # Volume d'incidents par année et par type détaillé
+    years = cubes.rollup(cubes.query('incidents', **filters), ['CalYear', 'StopCodeDescription'])
+    fig = go.Figure([go.Bar(x=g['CalYear'], y=g['incidents'], name=code, marker_color=STOP_CODE_COLORS.get(code))
+                     for code, g in years.groupby('StopCodeDescription')])
+    fig.update_layout(barmode='stack', legend_title="Type d'incident",
+                      title="Répartition du volume d'incidents selon leur type et les années",
+                      xaxis_title='Année', yaxis_title="Volume d'incidents")
+    return fig
+
+
+def map_values(filters, by):
+    # Temps de réponse moyen par quartier (BoroughName) ou secteur (IncidentStationGround)
+    if filters is None or not cubes.available('grounds'):
+        return None
+    cells = cubes.query('grounds', **filters)
+    return cubes.rollup(cells, by).set_index(by)['AttendanceTimeSeconds_mean']
+
+
+CHARTS = {'plot1': plot1, 'plot2': plot2, 'plot3': plot3, 'plot5': plot5, 'plot6': plot6, 'plot7': plot7}
+
+# Cube lu par chaque graphique
+SOURCES = {'plot5': 'delays'}
+
+
+@profiling.profiled()
+def show(name, filters=None, height=450):
+    # Graphique recalculé depuis les cubes quand ils existent, export figé sinon
+    if filters is not None and cubes.available(SOURCES.get(name, 'incidents')):
+        figures.plot(CHARTS[name](filters), height)
+    else:
+        figures.show(name, height)
@@ -0,0 +1,130 @@
+"""Cubes d'agrégats pré-calculés à partir du jeu de données fusionné (Incidents + Mobilisations).
+
+Chaque cube regroupe les mobilisations selon quelques dimensions et stocke, par cellule :
+nombre de mobilisations, nombre d'incidents, somme et médiane des temps de réponse et de la
+distance. Les graphiques de la page DataVizualisation sont recalculés depuis ces cubes
+(quelques milliers de lignes) au lieu de parcourir les 2,2 millions de lignes fusionnées.
+
+Construction (fichier Parquet ou CSV du DataFrame fusionné et enrichi) :
+    python -m lfb.cubes df_final.parquet
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from lfb import assets
+
+CUBES_DIR = 'cubes'
+
+TIMES = ['AttendanceTimeSeconds', 'TurnoutTimeSeconds', 'TravelTimeSeconds']
+MEASURES = TIMES + ['Distance']
+
+# Dimensions de chaque cube ; les dimensions du premier sont toutes des attributs de
+# l'incident, ce qui rend le nombre d'incidents additif d'une cellule à l'autre
+CUBES = {
+    'incidents': ['CalYear', 'HourOfCall', 'BoroughName', 'IncidentGroup', 'StopCodeDescription'],
+    'delays': ['CalYear', 'BoroughName', 'IncidentGroup', 'DelayCode_Description'],
+    'grounds': ['CalYear', 'BoroughName', 'IncidentGroup', 'IncidentStationGround'],
+}
+
+
+def aggregate(df, dims):
+    # Une ligne par cellule : n, incidents, <mesure>_n, <mesure>_sum, <mesure>_median
+    grouped = df.groupby(dims, observed=True, sort=True)
+    cube = grouped.size().rename('n').to_frame()
+    cube['incidents'] = grouped['IncidentNumber'].nunique()
+    for measure in MEASURES:
+        if measure not in df:
+            continue
+        cube[measure + '_n'] = grouped[measure].count()
+        cube[measure + '_sum'] = grouped[measure].sum()
+        cube[measure + '_median'] = grouped[measure].median()
+    return cube.reset_index()
+
+
+def missing(columns):
+    # Tous les cubes ou aucun : un cube absent ferait retomber ses graphiques sur l'export figé
+    return sorted({c for dims in CUBES.values() for c in dims + ['IncidentNumber'] if c not in columns})
+
+
+def build(df):
+    absent = missing(df.columns)
+    if absent:
+        raise ValueError(f'Colonnes absentes pour les cubes : {", ".join(absent)}')
+    return {name: aggregate(df, dims) for name, dims in CUBES.items()}
+
+
+def path(name):
+    return os.path.join(CUBES_DIR, name + '.parquet')
+
+
+def write(cubes):
+    os.makedirs(assets.resolve(CUBES_DIR), exist_ok=True)
+    for name, cube in cubes.items():
+        cube.to_parquet(assets.resolve(path(name)), index=False)
+
+
+def read_source(source):
+    # Ne charge que les colonnes utiles aux cubes
+    wanted = sorted({c for dims in CUBES.values() for c in dims} | set(MEASURES) | {'IncidentNumber'})
+    if source.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        available = set(pq.read_schema(source).names)
+        return pd.read_parquet(source, columns=[c for c in wanted if c in available])
+    return pd.read_csv(source, usecols=lambda c: c in wanted, low_memory=False)
+
+
+def available(name='incidents'):
+    return os.path.exists(assets.resolve(path(name)))
+
+
+def load(name):
+    return assets.read_parquet(path(name))
+
+
+def query(name, years=None, boroughs=None, groups=None):
+    # Sélection des cellules d'un cube ; None = pas de filtre sur la dimension
+    cube = load(name)
+    mask = np.ones(len(cube), dtype=bool)
+    if years is not None:
+        mask &= cube['CalYear'].between(*years).to_numpy()
+    if boroughs:
+        mask &= cube['BoroughName'].isin(boroughs).to_numpy()
+    if groups:
+        mask &= cube['IncidentGroup'].isin(groups).to_numpy()
+    return cube[mask]
+
+
+def _weighted_median(cells, by, measure):
+    # Médiane des médianes de cellule, pondérée par l'effectif de chaque cellule
+    median, count = measure + '_median', measure + '_n'
+    ordered = cells[by + [median, count]].sort_values(by + [median])
+    grouped = ordered.groupby(by, observed=True, sort=False)[count]
+    reached = grouped.cumsum() >= grouped.transform('sum') / 2
+    return ordered[reached].groupby(by, observed=True, sort=True)[median].first()
+
+
+def rollup(cells, by):
+    # Ré-agrège des cellules : les sommes s'additionnent, la moyenne en découle ; la médiane
+    # est approchée par la médiane des médianes de cellule pondérée par leur effectif
+    by = [by] if isinstance(by, str) else list(by)
+    grouped = cells.groupby(by, observed=True, sort=True)
+    out = grouped[['n', 'incidents']].sum()
+    for measure in MEASURES:
+        if measure + '_sum' not in cells:
+            continue
+        sums = grouped[[measure + '_n', measure + '_sum']].sum()
+        out[measure + '_n'] = sums[measure + '_n']
+        out[measure + '_mean'] = sums[measure + '_sum'] / sums[measure + '_n']
+        out[measure + '_median'] = _weighted_median(cells, by, measure)
+    return out.reset_index()
+
+
+if __name__ == '__main__':
+    df = read_source(sys.argv[1])
+    cubes = build(df)
+    write(cubes)
+    for name, cube in cubes.items():
+        print(f'{name}: {len(df)} lignes -> {len(cube)} cellules ({path(name)})')
@@ -0,0 +1,177 @@
+"""Enrichissement des mobilisations : coordonnées des incidents et variable Distance.
+
+Tous les calculs sont faits colonne par colonne avec NumPy, par blocs de lignes, au lieu
+d'un df.apply(..., axis=1) ligne à ligne :
+
+- conversion Easting/Northing (British National Grid, OSGB36) en latitude/longitude WGS84 ;
+- coordonnées de la caserne via un tableau indexé par DeployedFromStation_Code ;
+- distance haversine (en mètres) entre la caserne et le lieu de l'incident.
+
+Enrichissement d'un fichier Parquet, bloc par bloc (mémoire constante) :
+    python -m lfb.enrichment df_merged.parquet casernes.csv df_enrichi.parquet
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Rayon de la Terre en mètres
+RADIUS = 6371000
+
+# Taille des blocs de lignes traités en une fois
+CHUNKSIZE = 500_000
+
+# Ellipsoïdes Airy 1830 (OSGB36) et GRS80/WGS84 : demi-grand axe, demi-petit axe
+_AIRY = (6377563.396, 6356256.909)
+_WGS84 = (6378137.000, 6356752.3141)
+
+# Projection British National Grid
+_F0 = 0.9996012717
+_LAT0 = np.radians(49.0)
+_LON0 = np.radians(-2.0)
+_N0, _E0 = -100000.0, 400000.0
+
+# Transformation de Helmert OSGB36 -> WGS84 (translations en m, rotations en secondes d'arc, échelle en ppm)
+_HELMERT = (446.448, -125.157, 542.060, 0.1502, 0.2470, 0.8421, -20.4894)
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    # Distance en mètres entre deux séries de points (degrés), calculée en une seule passe
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RADIUS * np.arcsin(np.sqrt(a))
+
+
+def _meridional_arc(lat, a, b):
+    n = (a - b) / (a + b)
+    dlat, slat = lat - _LAT0, lat + _LAT0
+    return b * _F0 * (
+        (1 + n + 5 / 4 * n ** 2 + 5 / 4 * n ** 3) * dlat
+        - (3 * n + 3 * n ** 2 + 21 / 8 * n ** 3) * np.sin(dlat) * np.cos(slat)
+        + (15 / 8 * n ** 2 + 15 / 8 * n ** 3) * np.sin(2 * dlat) * np.cos(2 * slat)
+        - 35 / 24 * n ** 3 * np.sin(3 * dlat) * np.cos(3 * slat))
+
+
+def osgb36_to_wgs84(easting, northing):
+    # Easting/Northing (m) -> (latitude, longitude) WGS84 en degrés ; NaN conservés
+    easting = np.asarray(easting, dtype=np.float64)
+    northing = np.asarray(northing, dtype=np.float64)
+    a, b = _AIRY
+    e2 = 1 - b ** 2 / a ** 2
+
+    # Latitude itérée jusqu'à une erreur inférieure au centième de millimètre
+    lat = np.full(easting.shape, _LAT0)
+    m = np.zeros(easting.shape)
+    for _ in range(10):
+        lat = (northing - _N0 - m) / (a * _F0) + lat
+        m = _meridional_arc(lat, a, b)
+        if np.nanmax(np.abs(northing - _N0 - m), initial=0) < 1e-5:
+            break
+
+    sin, cos, tan = np.sin(lat), np.cos(lat), np.tan(lat)
+    nu = a * _F0 / np.sqrt(1 - e2 * sin ** 2)
+    rho = a * _F0 * (1 - e2) / (1 - e2 * sin ** 2) ** 1.5
+    eta2 = nu / rho - 1
+    sec = 1 / cos
+    de = easting - _E0
+    lat = (lat
+           - tan / (2 * rho * nu) * de ** 2
+           + tan / (24 * rho * nu ** 3) * (5 + 3 * tan ** 2 + eta2 - 9 * tan ** 2 * eta2) * de ** 4
+           - tan / (720 * rho * nu ** 5) * (61 + 90 * tan ** 2 + 45 * tan ** 4) * de ** 6)
+    lon = (_LON0
+           + sec / nu * de
+           - sec / (6 * nu ** 3) * (nu / rho + 2 * tan ** 2) * de ** 3
+           + sec / (120 * nu ** 5) * (5 + 28 * tan ** 2 + 24 * tan ** 4) * de ** 5
+           - sec / (5040 * nu ** 7) * (61 + 662 * tan ** 2 + 1320 * tan ** 4 + 720 * tan ** 6) * de ** 7)
+
+    # Passage en coordonnées cartésiennes, Helmert, puis retour en géographiques sur WGS84
+    sin, cos = np.sin(lat), np.cos(lat)
+    nu = a / np.sqrt(1 - e2 * sin ** 2)
+    x, y, z = nu * cos * np.cos(lon), nu * cos * np.sin(lon), (1 - e2) * nu * sin
+    tx, ty, tz, rx, ry, rz, s = _HELMERT
+    rx, ry, rz = (np.radians(r / 3600) for r in (rx, ry, rz))
+    s = 1 + s * 1e-6
+    x, y, z = (tx + s * x - rz * y + ry * z,
+               ty + rz * x + s * y - rx * z,
+               tz - ry * x + rx * y + s * z)
+
+    a, b = _WGS84
+    e2 = 1 - b ** 2 / a ** 2
+    p = np.hypot(x, y)
+    lat = np.arctan2(z, p * (1 - e2))
+    for _ in range(10):
+        nu = a / np.sqrt(1 - e2 * np.sin(lat) ** 2)
+        lat = np.arctan2(z + e2 * nu * np.sin(lat), p)
+    return np.degrees(lat), np.degrees(np.arctan2(y, x))
+
+
+class StationLookup:
+    # Coordonnées des casernes rangées dans des tableaux indexés par code de caserne
+
+    def __init__(self, stations, code='DeployedFromStation_Code',
+                 latitude='Station_Latitude', longitude='Station_Longitude'):
+        stations = stations.drop_duplicates(code).set_index(code)
+        self.codes = pd.Index(stations.index)
+        self.latitude = stations[latitude].to_numpy(dtype=np.float64)
+        self.longitude = stations[longitude].to_numpy(dtype=np.float64)
+
+    def coordinates(self, codes):
+        # Codes inconnus -> NaN
+        idx = self.codes.get_indexer(codes)
+        missing = idx < 0
+        lat, lon = self.latitude[idx], self.longitude[idx]
+        lat[missing] = lon[missing] = np.nan
+        return lat, lon
+
+
+def incident_coordinates(df):
+    # Latitude/longitude de l'incident ; les Nans (+50%) sont complétés depuis Easting/Northing_rounded
+    # Les coordonnées arrondies à 50 m se répètent beaucoup : chaque case n'est convertie qu'une fois
+    key = df['Easting_rounded'].to_numpy(dtype=np.float64) * 1e7 + df['Northing_rounded'].to_numpy(dtype=np.float64)
+    inverse, unique = pd.factorize(key, use_na_sentinel=False)
+    lat, lon = osgb36_to_wgs84(unique // 1e7, unique % 1e7)
+    lat, lon = lat[inverse], lon[inverse]
+    if 'Latitude' in df:
+        known = df['Latitude'].notna().to_numpy() & df['Longitude'].notna().to_numpy()
+        lat[known] = df['Latitude'].to_numpy()[known]
+        lon[known] = df['Longitude'].to_numpy()[known]
+    return lat, lon
+
+
+def distances(df, stations, code='DeployedFromStation_Code'):
+    lat, lon = incident_coordinates(df)
+    station_lat, station_lon = stations.coordinates(df[code])
+    return haversine(lat, lon, station_lat, station_lon)
+
+
+def add_distance(df, stations, chunksize=CHUNKSIZE):
+    # Ajoute la colonne Distance (mètres) en traitant le DataFrame par blocs de lignes
+    out = np.empty(len(df), dtype=np.float64)
+    for start in range(0, len(df), chunksize):
+        out[start:start + chunksize] = distances(df.iloc[start:start + chunksize], stations)
+    df['Distance'] = out
+    return df
+
+
+def enrich_parquet(source, target, stations, chunksize=CHUNKSIZE):
+    # Lecture, enrichissement et écriture bloc par bloc : la mémoire ne dépend pas de la taille du fichier
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize):
+            chunk = batch.to_pandas()
+            chunk['Distance'] = distances(chunk, stations)
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(target, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+if __name__ == '__main__':
+    source, stations_csv, target = sys.argv[1:4]
+    enrich_parquet(source, target, StationLookup(pd.read_csv(stations_csv)))
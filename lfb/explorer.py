@@ -0,0 +1,236 @@
+"""Explorateur paginé des jeux de données, interrogés côté serveur (pyarrow.dataset).
+
+Seule la fenêtre affichée (PAGE_SIZE lignes) est envoyée au navigateur. Filtres, choix des
+colonnes et tri sont appliqués pendant le parcours de la table, lot par lot :
+
+- sans tri, le parcours s'arrête dès que la fenêtre est remplie ;
+- avec tri, seules les k premières lignes dans l'ordre demandé sont gardées d'un lot à l'autre
+  (sélection des k plus petites valeurs), k étant la fin de la fenêtre. Une fenêtre située dans
+  la seconde moitié est lue dans l'ordre inverse : k ne dépasse jamais la moitié des lignes.
+  Les ex aequo sont rangés dans l'ordre du fichier, et les lignes dont la clé de tri est
+  manquante viennent en dernier, dans l'ordre du fichier.
+
+Sources (SOURCES) : le jeu complet s'il a été produit (dataset Parquet de lfb.ingestion /
+lfb.incremental, DataFrame de modélisation enregistré par lfb.frame), l'extrait CSV du dépôt
+sinon. La source est lue depuis sa table du registre (lfb.registry), commune à toutes les sessions.
+"""
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import streamlit as st
+
+from lfb import assets, registry
+
+# Jeu complet (Parquet), puis extrait livré avec l'application (CSV)
+SOURCES = {
+    'consolidated': ['df_consolidated', 'df_consolidated.csv'],
+    'modelisation': ['df_modelisation.parquet', 'df_modelisation.csv'],
+}
+
+PAGE_SIZE = 50
+
+# Colonnes affichées par défaut
+DEFAULT_COLUMNS = 12
+
+# Au-delà de ce nombre de modalités, une colonne texte est filtrée par « contient »
+MAX_CHOICES = 200
+
+# Taille des lots lus (lignes)
+BATCH_SIZE = 65_536
+
+_KEY = '__key'
+_ROW = '__row'
+
+
+def source(name):
+    for path in SOURCES[name]:
+        if assets.exists(path):
+            return assets.resolve(path)
+    raise FileNotFoundError(SOURCES[name][-1])
+
+
+def _dataset(path, mtime):
+    # Dataset en mémoire sur la table partagée du registre (fichier Arrow projeté en mémoire) ;
+    # `mtime` fait partie des clés des caches de résultats ci-dessous
+    return ds.dataset(registry.table(path))
+
+
+def dataset(name):
+    return registry.stamp(source(name))
+
+
+def columns(data):
+    # Colonne d'index sans nom des exports CSV (DataFrame.to_csv) exclue
+    return [c for c in data.schema.names if c]
+
+
+def expression(filters):
+    # filters : [(colonne, 'in', [valeurs]) | (colonne, 'between', (min, max)) | (colonne, 'contains', texte)]
+    result = None
+    for column, op, value in filters:
+        field = ds.field(column)
+        if op == 'in':
+            condition = field.isin(list(value))
+        elif op == 'between':
+            condition = (field >= value[0]) & (field <= value[1])
+        elif op == 'contains':
+            condition = pc.match_substring(field.cast(pa.string()), value, ignore_case=True)
+        else:
+            raise ValueError(f'Opérateur de filtre inconnu : {op}')
+        result = condition if result is None else result & condition
+    return result
+
+
+def _and(left, right):
+    return right if left is None else left & right
+
+
+def _window(data, names, condition, offset, limit):
+    # Lignes offset..offset+limit dans l'ordre du fichier : arrêt dès que la fenêtre est remplie
+    parts, seen = [], 0
+    for batch in data.scanner(columns=list(names), filter=condition, batch_size=BATCH_SIZE).to_batches():
+        if seen + batch.num_rows > offset:
+            start = max(0, offset - seen)
+            parts.append(batch.slice(start, limit - sum(p.num_rows for p in parts)))
+            if sum(p.num_rows for p in parts) >= limit:
+                break
+        seen += batch.num_rows
+    return pa.Table.from_batches(parts, schema=data.scanner(columns=list(names)).projected_schema)
+
+
+def _top(data, names, condition, sort, descending, k, reverse=False):
+    # k premières lignes dans l'ordre de `sort` (clé non manquante), en gardant au plus k lignes.
+    # Ex aequo départagés par le rang de la ligne dans le parcours (croissant, décroissant en
+    # lecture inverse) : l'ordre est total, chaque ligne apparaît sur une seule page
+    field = ds.field(sort)
+    kind = data.schema.field(sort).type
+    # Les colonnes dictionnaire (catégories) ne se trient pas : la clé est décodée
+    key = field.cast(kind.value_type) if pa.types.is_dictionary(kind) else field
+    projection = {c: ds.field(c) for c in names}
+    projection[_KEY] = key
+    order = [(_KEY, 'descending' if descending else 'ascending'), (_ROW, 'descending' if reverse else 'ascending')]
+    best, seen = None, 0
+    for batch in data.scanner(columns=projection, filter=condition, batch_size=BATCH_SIZE).to_batches():
+        batch = pa.Table.from_batches([batch]).append_column(_ROW, pa.array(range(seen, seen + batch.num_rows),
+                                                                              pa.int64()))
+        seen += batch.num_rows
+        table = batch if best is None else pa.concat_tables([best, batch])
+        if table.num_rows > k:
+            keep = pc.select_k_unstable(table.select([_KEY, _ROW]), k=k, sort_keys=order)
+            table = table.take(keep)
+        best = table
+    if best is None:
+        return data.scanner(columns=projection).projected_schema.empty_table().drop_columns([_KEY])
+    indices = pc.sort_indices(best.select([_KEY, _ROW]), sort_keys=order)
+    return best.take(indices).drop_columns([_KEY, _ROW])
+
+
+def _count(data, condition):
+    return data.count_rows(filter=condition) if condition is not None else data.count_rows()
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _page(path, mtime, names, filters, sort, descending, offset, limit):
+    data = _dataset(path, mtime)
+    condition = expression(filters)
+    if sort is None:
+        return _window(data, names, condition, offset, limit).to_pandas()
+    valid = _and(condition, ds.field(sort).is_valid())
+    sorted_rows = _count(data, valid)
+    parts = []
+    if offset < sorted_rows:
+        stop = min(offset + limit, sorted_rows)
+        if stop <= sorted_rows - offset:
+            parts.append(_top(data, names, valid, sort, descending, stop).slice(offset))
+        else:
+            # Fenêtre plus proche de la fin : lecture dans l'ordre inverse
+            tail = _top(data, names, valid, sort, not descending, sorted_rows - offset, reverse=True)
+            parts.append(tail.take(pa.array(range(tail.num_rows - 1, tail.num_rows - 1 - (stop - offset), -1))))
+    if offset + limit > sorted_rows:
+        missing = _and(condition, ds.field(sort).is_null())
+        start = max(0, offset - sorted_rows)
+        parts.append(_window(data, names, missing, start, offset + limit - max(offset, sorted_rows)))
+    return pa.concat_tables(parts).to_pandas()
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _total(path, mtime, filters):
+    return _count(_dataset(path, mtime), expression(filters))
+
+
+def _frozen(filters):
+    # Clé de cache : listes de valeurs -> tuples
+    return tuple((c, op, tuple(v) if isinstance(v, list) else v) for c, op, v in filters)
+
+
+def total(name, filters=()):
+    return _total(*dataset(name), _frozen(filters))
+
+
+def page(name, names, filters=(), sort=None, descending=False, offset=0, limit=PAGE_SIZE):
+    # DataFrame des lignes offset..offset+limit, après filtres et tri
+    return _page(*dataset(name), tuple(names), _frozen(filters), sort, descending, offset, limit)
+
+
+@st.cache_data(max_entries=4 * assets.MAX_ENTRIES, show_spinner=False)
+def _domain(path, mtime, column):
+    # Modalités (texte) ou bornes (nombres) d'une colonne, pour les widgets de filtre
+    data = _dataset(path, mtime)
+    kind = data.schema.field(column).type
+    numeric = pa.types.is_integer(kind) or pa.types.is_floating(kind)
+    values, low, high = set(), None, None
+    for batch in data.scanner(columns=[column], batch_size=BATCH_SIZE).to_batches():
+        array = batch.column(0)
+        if numeric:
+            bounds = pc.min_max(array)
+            if bounds['min'].is_valid:
+                low = bounds['min'].as_py() if low is None else min(low, bounds['min'].as_py())
+                high = bounds['max'].as_py() if high is None else max(high, bounds['max'].as_py())
+        elif len(values) <= MAX_CHOICES:
+            if pa.types.is_dictionary(array.type):
+                array = array.dictionary_decode()
+            values.update(v for v in pc.unique(array).to_pylist() if v is not None)
+    if numeric:
+        return 'between', (low, high)
+    if len(values) > MAX_CHOICES:
+        return 'contains', None
+    return 'in', sorted(values, key=str)
+
+
+def show(name, key=None, page_size=PAGE_SIZE):
+    # Composant complet : colonnes, filtres, tri et pagination, puis la fenêtre
+    key = key or name
+    path, mtime = dataset(name)
+    available = columns(_dataset(path, mtime))
+    with st.expander(':gray[Colonnes, filtres et tri]'):
+        names = st.multiselect(':gray[Colonnes]', available, default=available[:DEFAULT_COLUMNS],
+                               key=f'{key}_columns') or available[:DEFAULT_COLUMNS]
+        filters = []
+        for column in st.multiselect(':gray[Filtrer sur]', available, key=f'{key}_filters'):
+            op, domain = _domain(path, mtime, column)
+            if op == 'in':
+                chosen = st.multiselect(column, domain, key=f'{key}_in_{column}')
+                if chosen:
+                    filters.append((column, op, chosen))
+            elif op == 'between' and domain[0] is not None and domain[0] < domain[1]:
+                chosen = st.slider(column, domain[0], domain[1], domain, key=f'{key}_between_{column}')
+                if tuple(chosen) != tuple(domain):
+                    filters.append((column, op, chosen))
+            elif op == 'contains':
+                text = st.text_input(f'{column} contient', key=f'{key}_contains_{column}')
+                if text:
+                    filters.append((column, op, text))
+        left, right = st.columns(2)
+        sort = left.selectbox(':gray[Trier par]', [None] + available, key=f'{key}_sort',
+                              format_func=lambda c: '(ordre du fichier)' if c is None else c)
+        descending = right.toggle(':gray[Ordre décroissant]', key=f'{key}_descending')
+
+    # Nombre de lignes d'abord : le numéro de page est borné par le nombre de pages
+    rows = total(name, filters)
+    pages = max(1, -(-rows // page_size))
+    number = st.number_input(f':gray[Page (sur {pages})]', min_value=1, max_value=pages, value=1, step=1,
+                             key=f'{key}_page')
+    offset = (number - 1) * page_size
+    window = page(name, names, filters, sort, descending, offset, page_size)
+    st.dataframe(window, hide_index=True)
+    st.caption(f':gray[Lignes {offset + 1 if rows else 0} à {offset + len(window)} sur {rows}]')
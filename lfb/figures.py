@@ -0,0 +1,116 @@
+"""Graphiques Plotly stockés au format JSON compact et affichés avec st.plotly_chart.
+
+Les exports HTML d'origine (plot*.html) embarquent chacun une copie complète de plotly.js
+(3,6 Mo) ; seul le JSON de la figure (quelques Ko) est conservé ici, plotly.js étant déjà
+fourni une seule fois par le frontend Streamlit.
+
+Conversion des exports existants :
+    python -m lfb.figures plot1.html plot2.html ...
+"""
+import json
+import os
+import sys
+
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+
+from lfb import assets
+
+# Dossier des figures exportées (relatif à la racine de l'application)
+FIGURES_DIR = 'figures'
+
+_decoder = json.JSONDecoder()
+
+
+def _next_value(html, start):
+    # Lit la prochaine valeur JSON à partir de `start` (en sautant virgules et espaces)
+    while html[start] in ' \t\r\n,':
+        start += 1
+    return _decoder.raw_decode(html, start)
+
+
+def extract(html):
+    # Récupère data / layout / frames de l'appel Plotly.newPlot(id, data, layout, config)
+    # généré par fig.write_html(), en ignorant le code de plotly.js embarqué
+    start = html.rfind('Plotly.newPlot(')
+    if start < 0:
+        raise ValueError("Aucun appel Plotly.newPlot trouvé dans l'export HTML")
+    _, pos = _next_value(html, start + len('Plotly.newPlot('))
+    data, pos = _next_value(html, pos)
+    layout, pos = _next_value(html, pos)
+    figure = {'data': data, 'layout': layout}
+
+    frames = html.find('Plotly.addFrames(', pos)
+    if frames >= 0:
+        # L'identifiant est ici entre apostrophes, ce n'est pas du JSON valide
+        pos = html.index(',', frames)
+        figure['frames'], pos = _next_value(html, pos)
+    return figure
+
+
+def path(name):
+    return os.path.join(FIGURES_DIR, name + '.json')
+
+
+def save(fig, name):
+    # Enregistre une figure Plotly (objet ou dict) au format JSON compact
+    if isinstance(fig, go.Figure):
+        fig = fig.to_plotly_json()
+    target = assets.resolve(path(name))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'w', encoding='utf-8') as f:
+        f.write(pio.to_json(fig, validate=False, pretty=False, remove_uids=True))
+    return target
+
+
+def export_html(source, name=None):
+    # Convertit un export HTML Plotly existant en figure JSON
+    name = name or os.path.splitext(os.path.basename(source))[0]
+    with open(assets.resolve(source), 'r', encoding='utf-8') as f:
+        return save(extract(f.read()), name)
+
+
+@st.cache_resource(max_entries=assets.MAX_ENTRIES, show_spinner=False)
+def _load(path, mtime):
+    # skip_invalid : les exports plotly plus anciens contiennent des propriétés disparues
+    return go.Figure(json.loads(assets.load(path)), skip_invalid=True)
+
+
+def load(name):
+    return _load(*assets.stamp(path(name)))
+
+
+def plot(fig, height=450):
+    # height=None : hauteur déjà fixée par la figure
+    if height is not None:
+        fig.update_layout(height=height)
+    st.plotly_chart(fig, theme=None)
+
+
+def show(name, height=450):
+    # Figure non exportée (signalée par `python -m lfb.bundle`) : mention à la place du graphique
+    if not assets.exists(path(name)):
+        st.caption(f':gray[Graphique indisponible ({name})]')
+        return
+    # La figure mise en cache est partagée : on travaille sur une copie pour la hauteur
+    plot(go.Figure(load(name)), height)
+
+
+def lazy(key, label=':gray[Afficher le graphique]', opened=False):
+    # Le graphique n'est construit qu'à la demande de l'utilisateur ; une fois ouvert,
+    # il le reste pour toute la session (y compris après un changement de page)
+    opened_charts = st.session_state.setdefault('opened_charts', set())
+    if opened:
+        opened_charts.add(key)
+    if key not in opened_charts:
+        if not st.button(label, key=f'open_{key}'):
+            return False
+        opened_charts.add(key)
+    return True
+
+
+if __name__ == '__main__':
+    for source in sys.argv[1:]:
+        target = export_html(source)
+        print(f'{source} ({os.path.getsize(source)} o) -> {target} ({os.path.getsize(target)} o)')
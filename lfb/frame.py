@@ -0,0 +1,104 @@
+"""DataFrame de modélisation compact : variables catégorielles et entiers réduits.
+
+Les colonnes texte (IncidentGroup, BoroughName, DelayCode_Description, ...) sont stockées en
+`category` et les temps en secondes en int16/int32. Le résultat est écrit en Parquet, avec à
+côté un manifeste JSON du schéma (types et modalités) vérifié à la relecture.
+
+    python -m lfb.frame df_modelisation.csv df_modelisation.parquet
+"""
+import json
+import sys
+
+import pandas as pd
+
+CATEGORICAL = [
+    'IncidentGroup', 'StopCodeDescription', 'SpecialServiceType', 'PropertyCategory',
+    'AddressQualifier', 'BoroughName', 'IncidentStationGround', 'DeployedFromStation_Name',
+    'DelayCode_Description', 'MonthOfCall', 'DayOfCall',
+]
+
+INTEGER = [
+    'CalYear', 'HourOfCall', 'NumPumpsAttending', 'ResourceMobilisationId', 'PumpOrder',
+    'TurnoutTimeSeconds', 'TravelTimeSeconds', 'AttendanceTimeSeconds', 'MobilisationTime',
+]
+
+FLOAT = ['NumStationsWithPumpsAttending', 'CallCount', 'Distance']
+
+# Ordre calendaire pour les modalités temporelles
+ORDERED = {
+    'MonthOfCall': ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August',
+                    'September', 'October', 'November', 'December'],
+    'DayOfCall': ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
+}
+
+
+def optimize(df):
+    # Conversion en place des types ; les colonnes absentes sont ignorées
+    for column in CATEGORICAL:
+        if column in df:
+            if column in ORDERED:
+                df[column] = pd.Categorical(df[column], categories=ORDERED[column], ordered=True)
+            else:
+                df[column] = df[column].astype('category')
+    for column in INTEGER:
+        if column in df:
+            if df[column].isna().any():
+                df[column] = df[column].astype('Int32')
+            else:
+                df[column] = pd.to_numeric(df[column], downcast='integer')
+    for column in FLOAT:
+        if column in df:
+            df[column] = pd.to_numeric(df[column], downcast='float')
+    if 'DateOfCall' in df:
+        df['DateOfCall'] = pd.to_datetime(df['DateOfCall'])
+    if 'IncidentNumber' in df:
+        df['IncidentNumber'] = df['IncidentNumber'].astype('string')
+    return df
+
+
+def read_csv(path, **kwargs):
+    # Lecture directe en `category` : les chaînes ne sont jamais toutes matérialisées en objets
+    header = pd.read_csv(path, nrows=0, **kwargs).columns
+    dtypes = {c: 'category' for c in CATEGORICAL if c in header}
+    dtypes.update({c: 'string' for c in ['IncidentNumber'] if c in header})
+    return optimize(pd.read_csv(path, dtype=dtypes, **kwargs))
+
+
+def schema(df):
+    manifest = {}
+    for column, dtype in df.dtypes.items():
+        entry = {'dtype': str(dtype)}
+        if isinstance(dtype, pd.CategoricalDtype):
+            entry['categories'] = [str(c) for c in dtype.categories]
+            entry['ordered'] = bool(dtype.ordered)
+        manifest[column] = entry
+    return manifest
+
+
+def manifest_path(path):
+    return path + '.schema.json'
+
+
+def save(df, path):
+    df.to_parquet(path, index=False)
+    with open(manifest_path(path), 'w', encoding='utf-8') as f:
+        json.dump({'rows': len(df), 'columns': schema(df)}, f, indent=1, ensure_ascii=False)
+
+
+def load(path, columns=None):
+    # Relecture Parquet (les catégories sont conservées) et contrôle du manifeste
+    df = pd.read_parquet(path, columns=columns)
+    with open(manifest_path(path), encoding='utf-8') as f:
+        expected = json.load(f)['columns']
+    actual = schema(df)
+    mismatched = [c for c in actual if c in expected and actual[c]['dtype'] != expected[c]['dtype']]
+    if mismatched:
+        raise ValueError(f'Schéma inattendu pour les colonnes : {", ".join(mismatched)}')
+    return df
+
+
+if __name__ == '__main__':
+    source, target = sys.argv[1:3]
+    df = read_csv(source)
+    save(df, target)
+    print(f'{len(df)} lignes, {df.memory_usage(deep=True).sum() / 2**20:.1f} Mo en mémoire -> {target}')
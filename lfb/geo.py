@@ -0,0 +1,323 @@
+"""Cartes choroplèthes servies depuis une géométrie simplifiée et partagée (topologie).
+
+Les cartes folium d'origine (map1.html, map2.html) embarquent plus de 100 couches GeoJSON
+en pleine résolution et chargent Leaflet, jQuery, Bootstrap et d3 depuis des CDN. Ici :
+
+- les contours sont quantifiés sur une grille entière puis découpés en arcs : une frontière
+  commune à deux secteurs n'est stockée (et simplifiée) qu'une seule fois, il n'apparaît
+  donc ni trou ni chevauchement après simplification ;
+- chaque sommet reçoit un poids Douglas-Peucker, ce qui permet de choisir le niveau de
+  détail au moment de l'affichage sans recalcul ;
+- les valeurs (temps de réponse moyen) sont jointes à l'affichage depuis un simple CSV ;
+- le rendu dessine chaque entité en polygone rempli (go.Scatter, fill='toself') sur des axes
+  cartésiens, l'échelle des latitudes corrigée par cos(latitude) : aucun accès réseau n'est
+  nécessaire. go.Choropleth, lui, fait télécharger par plotly.js le fond de carte
+  world_110m.json depuis cdn.plot.ly, même invisible, et n'affiche rien hors ligne.
+
+Conversion des exports folium existants :
+    python -m lfb.geo map1.html:Station_Name map2.html:name
+"""
+import json
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from lfb import assets, profiling
+
+GEO_DIR = 'figures'
+
+# Résolution de la grille de quantification (par axe, sur l'emprise de la carte)
+QUANTIZATION = 10000
+
+# Niveaux de détail proposés à l'affichage : tolérance en unités de grille
+DETAIL_LEVELS = {'Faible': 10.0, 'Moyen': 4.0, 'Élevé': 2.0}
+
+VALUE_COLUMN = 'Average_AttendanceTimeSeconds'
+
+
+def extract(html):
+    # Renvoie la FeatureCollection la plus complète parmi les appels geo_json_xxx_add({...})
+    decoder = json.JSONDecoder()
+    best = None
+    for match in re.finditer(r'geo_json_[0-9a-f]+_add\(', html):
+        collection, _ = decoder.raw_decode(html, match.end())
+        if best is None or len(collection['features']) > len(best['features']):
+            best = collection
+    if best is None:
+        raise ValueError("Aucune couche GeoJSON trouvée dans l'export folium")
+    return best
+
+
+def _polygons(geometry):
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['coordinates']
+    raise ValueError(f"Géométrie non supportée : {geometry['type']}")
+
+
+def _weights(points, closed):
+    # Poids Douglas-Peucker de chaque sommet : tolérance maximale pour laquelle il est conservé.
+    # Les extrémités et le premier point de découpe de chaque moitié sont toujours conservés,
+    # ce qui garantit qu'un anneau reste un polygone valide au niveau de détail le plus faible.
+    n = len(points)
+    weights = np.zeros(n, dtype=np.float32)
+    weights[0] = weights[-1] = np.inf
+    pts = points.astype(np.float64)
+    if closed:
+        far = int(np.argmax(np.hypot(*(pts - pts[0]).T)))
+        weights[far] = np.inf
+        stack = [(0, far, True), (far, n - 1, True)]
+    else:
+        stack = [(0, n - 1, True)]
+    while stack:
+        start, end, anchor = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = pts[start], pts[end]
+        inner = pts[start + 1:end]
+        ab = b - a
+        norm = np.hypot(*ab)
+        if norm == 0:
+            dist = np.hypot(*(inner - a).T)
+        else:
+            dist = np.abs(ab[0] * (inner[:, 1] - a[1]) - ab[1] * (inner[:, 0] - a[0])) / norm
+        k = int(np.argmax(dist))
+        parent = min(weights[start], weights[end])
+        weights[start + 1 + k] = np.inf if anchor else min(dist[k], parent)
+        stack.append((start, start + 1 + k, False))
+        stack.append((start + 1 + k, end, False))
+    return weights
+
+
+def build(collection, key):
+    # Construit le stockage topologique d'une FeatureCollection (clé = propriété identifiant)
+    coords = [np.asarray(ring, dtype=np.float64)
+              for feature in collection['features']
+              for polygon in _polygons(feature['geometry'])
+              for ring in polygon]
+    allpts = np.concatenate(coords)
+    origin = allpts.min(axis=0)
+    scale = (allpts.max(axis=0) - origin) / (QUANTIZATION - 1)
+
+    # Anneaux quantifiés, sans doublons consécutifs, fermés (premier point == dernier)
+    rings = []
+    for ring in coords:
+        q = np.round((ring - origin) / scale).astype(np.int32)
+        keep = np.ones(len(q), dtype=bool)
+        keep[1:] = np.any(q[1:] != q[:-1], axis=1)
+        q = q[keep]
+        if len(q) > 1 and (q[0] != q[-1]).any():
+            q = np.vstack([q, q[:1]])
+        rings.append([tuple(p) for p in q])
+
+    # Jonctions : sommets dont les voisins diffèrent d'un anneau à l'autre
+    neighbours = {}
+    for ring in rings:
+        m = len(ring) - 1
+        for i in range(m):
+            pair = frozenset((ring[i - 1 if i else m - 1], ring[i + 1]))
+            neighbours.setdefault(ring[i], set()).add(pair)
+    junctions = {p for p, pairs in neighbours.items() if len(pairs) > 1}
+
+    # Découpage des anneaux en arcs, chaque arc n'étant stocké qu'une fois
+    arcs, index, ring_arcs = [], {}, []
+    for ring in rings:
+        body = ring[:-1]
+        cuts = [i for i, p in enumerate(body) if p in junctions]
+        if not cuts:
+            # Anneau isolé : un seul arc fermé, démarré sur son plus petit sommet
+            start = body.index(min(body))
+            pieces = [body[start:] + body[:start] + [body[start]]]
+        else:
+            body = body[cuts[0]:] + body[:cuts[0]]
+            cuts = [c - cuts[0] for c in cuts] + [len(body)]
+            body = body + [body[0]]
+            pieces = [body[cuts[i]:cuts[i + 1] + 1] for i in range(len(cuts) - 1)]
+        refs = []
+        for piece in pieces:
+            piece_key = tuple(piece)
+            if piece_key in index:
+                refs.append(index[piece_key])
+            elif piece_key[::-1] in index:
+                refs.append(~index[piece_key[::-1]])
+            else:
+                index[piece_key] = len(arcs)
+                refs.append(len(arcs))
+                arcs.append(np.asarray(piece, dtype=np.int32))
+        ring_arcs.append(refs)
+
+    weights = [_weights(arc, closed=bool((arc[0] == arc[-1]).all())) for arc in arcs]
+
+    # Structure des entités : entité -> polygones -> anneaux
+    ids, polygon_offsets, ring_offsets = [], [0], [0]
+    ring_iter = iter(ring_arcs)
+    arc_refs = []
+    for feature in collection['features']:
+        ids.append(str(feature['properties'][key]))
+        for polygon in _polygons(feature['geometry']):
+            for _ in polygon:
+                arc_refs.extend(next(ring_iter))
+                ring_offsets.append(len(arc_refs))
+            polygon_offsets.append(len(ring_offsets) - 1)
+    feature_offsets = [0]
+    count = 0
+    for feature in collection['features']:
+        count += len(_polygons(feature['geometry']))
+        feature_offsets.append(count)
+
+    return {
+        'origin': origin, 'scale': scale,
+        'points': np.concatenate(arcs), 'weights': np.concatenate(weights),
+        'arc_offsets': np.cumsum([0] + [len(a) for a in arcs]),
+        'arc_refs': np.asarray(arc_refs, dtype=np.int32),
+        'ring_offsets': np.asarray(ring_offsets), 'polygon_offsets': np.asarray(polygon_offsets),
+        'feature_offsets': np.asarray(feature_offsets), 'ids': np.asarray(ids),
+    }
+
+
+def path(name):
+    return os.path.join(GEO_DIR, name + '.topo.npz')
+
+
+def values_path(name):
+    return os.path.join(GEO_DIR, name + '_values.csv')
+
+
+def export_html(source, key, name=None):
+    # Convertit une carte folium : géométrie -> <name>.topo.npz, valeurs -> <name>_values.csv
+    name = name or os.path.splitext(os.path.basename(source))[0]
+    with open(assets.resolve(source), 'r', encoding='utf-8') as f:
+        collection = extract(f.read())
+    target = assets.resolve(path(name))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    np.savez_compressed(target, **build(collection, key))
+    values = pd.DataFrame([{key: f['properties'][key], VALUE_COLUMN: f['properties'][VALUE_COLUMN]}
+                           for f in collection['features']])
+    values.to_csv(assets.resolve(values_path(name)), index=False)
+    return target
+
+
+@st.cache_resource(max_entries=assets.MAX_ENTRIES, show_spinner=False)
+def _load(path, mtime):
+    with np.load(assets.open_file(path)) as store:
+        return {k: store[k] for k in store.files}
+
+
+def load(name):
+    return _load(*assets.stamp(path(name)))
+
+
+def _signed_area(ring):
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1]))
+
+
+@st.cache_resource(max_entries=assets.MAX_ENTRIES, show_spinner=False)
+def _geojson(path, mtime, tolerance):
+    # Reconstruit une FeatureCollection au niveau de détail demandé
+    topo = _load(path, mtime)
+    points, weights, offsets = topo['points'], topo['weights'], topo['arc_offsets']
+    arcs = []
+    for i in range(len(offsets) - 1):
+        arc = points[offsets[i]:offsets[i + 1]]
+        arcs.append(arc[weights[offsets[i]:offsets[i + 1]] >= tolerance])
+
+    def ring(refs):
+        parts = [arcs[r] if r >= 0 else arcs[~r][::-1] for r in refs]
+        q = np.concatenate([parts[0]] + [p[1:] for p in parts[1:]])
+        return q * topo['scale'] + topo['origin']
+
+    features = []
+    rings, polygons = topo['ring_offsets'], topo['polygon_offsets']
+    for f, feature_id in enumerate(topo['ids']):
+        coordinates = []
+        for p in range(topo['feature_offsets'][f], topo['feature_offsets'][f + 1]):
+            polygon = []
+            for r in range(polygons[p], polygons[p + 1]):
+                coords = ring(topo['arc_refs'][rings[r]:rings[r + 1]])
+                # Orientation RFC 7946 (GeoJSON) : extérieur anti-horaire, trous horaires ; le rendu
+                # (fill='toself') n'en dépend pas
+                exterior = r == polygons[p]
+                if (_signed_area(coords) > 0) != exterior:
+                    coords = coords[::-1]
+                polygon.append(np.round(coords, 5).tolist())
+            coordinates.append(polygon)
+        features.append({'type': 'Feature', 'id': str(feature_id), 'properties': {},
+                         'geometry': {'type': 'MultiPolygon', 'coordinates': coordinates}})
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def geojson(name, tolerance=DETAIL_LEVELS['Moyen']):
+    return _geojson(*assets.stamp(path(name)), tolerance)
+
+
+def _rings(feature):
+    # Anneaux d'une entité en une seule trace : x, y séparés par None
+    x, y = [], []
+    for polygon in feature['geometry']['coordinates']:
+        for ring in polygon:
+            x.extend([p[0] for p in ring] + [None])
+            y.extend([p[1] for p in ring] + [None])
+    return x, y
+
+
+def _area(feature):
+    return sum(abs(_signed_area(np.asarray(polygon[0]))) for polygon in feature['geometry']['coordinates'])
+
+
+def figure(collection, values, label, hover, colorscale='YlOrRd'):
+    # Un polygone rempli par entité, couleur selon la valeur ; une trace invisible porte l'échelle
+    from plotly.colors import sample_colorscale
+
+    low, high = float(np.nanmin(values.values)), float(np.nanmax(values.values))
+    fig = go.Figure()
+    # Les plus grandes entités d'abord : une enclave est dessinée par-dessus l'entité qui l'entoure
+    for feature in sorted(collection['features'], key=_area, reverse=True):
+        value = values.get(feature['id'], np.nan)
+        if np.isnan(value):
+            color, text = 'lightgrey', f"<b>{feature['id']}</b><br>n.d."
+        else:
+            color = sample_colorscale(colorscale, [(value - low) / (high - low) if high > low else 0.5])[0]
+            text = f"<b>{feature['id']}</b><br>" + re.sub(r'%\{z(?::([^}]*))?\}',
+                                                         lambda m: format(value, m.group(1) or ''), hover)
+        x, y = _rings(feature)
+        fig.add_trace(go.Scatter(x=x, y=y, fill='toself', fillcolor=color, mode='lines',
+                                 line=dict(color='white', width=0.5), hoveron='fills', text=text,
+                                 hoverinfo='text', showlegend=False))
+    fig.add_trace(go.Scatter(x=[None], y=[None], mode='markers', showlegend=False, hoverinfo='skip',
+                             marker=dict(colorscale=colorscale, cmin=low, cmax=high, color=[low], showscale=True,
+                                         colorbar=dict(title=label))))
+    # Un degré de latitude mesure 1 / cos(latitude) degré de longitude
+    latitude = np.nanmean([p[1] for f in collection['features'] for poly in f['geometry']['coordinates']
+                           for p in poly[0]])
+    fig.update_xaxes(visible=False)
+    fig.update_yaxes(visible=False, scaleanchor='x', scaleratio=1 / np.cos(np.radians(latitude)))
+    fig.update_layout(plot_bgcolor='rgba(0,0,0,0)')
+    return fig
+
+
+@profiling.profiled()
+def show(name, values=None, tolerance=DETAIL_LEVELS['Moyen'], height=600,
+         label='Temps de réponse moyen (s)', hover='%{z:.0f} s'):
+    # `values` : Series indexée par identifiant d'entité ; par défaut le CSV exporté.
+    # `hover` : texte de l'infobulle, %{z} (format d3 simple, ex. %{z:.0f}) remplacé par la valeur
+    if values is None:
+        table = assets.read_csv(values_path(name))
+        values = table.set_index(table.columns[0])[VALUE_COLUMN]
+    values = values.rename(index=str)
+    fig = figure(geojson(name, tolerance), values, label, hover)
+    fig.update_layout(height=height, margin=dict(l=0, r=0, t=0, b=0))
+    st.plotly_chart(fig, theme=None)
+
+
+if __name__ == '__main__':
+    for arg in sys.argv[1:]:
+        source, key = arg.split(':')
+        target = export_html(source, key)
+        print(f'{source} ({os.path.getsize(source)} o) -> {target} ({os.path.getsize(target)} o)')
@@ -0,0 +1,202 @@
+"""Images des pages servies en AVIF/WebP, à la largeur adaptée à l'écran.
+
+Les PNG/JPEG d'origine (jusqu'à 260 Ko et 1300 px de large) sont affichés dans une colonne
+d'environ 700 px. `python -m lfb.images` pré-génère dans static/images/, pour chaque image :
+
+- des variantes AVIF et WebP aux largeurs WIDTHS (sans dépasser la largeur d'origine) ;
+- une version dans le format d'origine (PNG/JPEG), à FALLBACK_WIDTH px au plus, pour les
+  navigateurs qui ne lisent ni l'AVIF ni le WebP.
+
+Les noms de fichiers contiennent l'empreinte de l'original : une image modifiée produit de
+nouveaux noms (pas de variante périmée dans le cache du navigateur) et, tant que le manifeste
+n'a pas été régénéré, c'est l'original qui est affiché.
+
+Avec server.enableStaticServing (cf. .streamlit/config.toml), `show()` insère une balise
+<picture> : le navigateur choisit le premier format qu'il sait lire et la largeur adaptée à la
+place disponible et à la densité de l'écran. Sinon, ou pour une image sans variantes, l'image
+d'origine est envoyée par st.image depuis le cache du processus (assets.read_bytes).
+
+    python -m lfb.images *.png *.jpeg
+"""
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import sys
+
+import streamlit as st
+
+from lfb import assets
+
+STATIC_DIR = 'static'
+IMAGES_DIR = os.path.join(STATIC_DIR, 'images')
+MANIFEST = os.path.join(IMAGES_DIR, 'manifest.json')
+
+# Adresse des fichiers de static/ (relative : fonctionne aussi derrière server.baseUrlPath)
+URL = 'app/static/images'
+
+# Largeurs générées : colonne de la mise en page centrée (704 px) en densité 1 et 2
+WIDTHS = [480, 960, 1440]
+
+# Formats par ordre de préférence (le navigateur prend la première source qu'il sait lire) ;
+# AVIF sans sous-échantillonnage de la couleur : textes et traits fins des graphiques restent nets
+FORMATS = {'avif': dict(quality=45, subsampling='4:4:4'), 'webp': dict(quality=80, method=6)}
+
+# Largeur de la version PNG/JPEG de secours
+FALLBACK_WIDTH = 960
+
+# Largeur d'affichage : toute la colonne, 704 px au plus
+SIZES = '(max-width: 736px) calc(100vw - 2rem), 704px'
+
+# Le serveur statique déduit le Content-Type de l'extension
+mimetypes.add_type('image/avif', '.avif')
+mimetypes.add_type('image/webp', '.webp')
+
+
+def digest(data):
+    return hashlib.sha1(data).hexdigest()[:10]
+
+
+def _resize(image, width):
+    from PIL import Image
+
+    if width == image.width:
+        return image
+    return image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+
+
+def build(source, widths=WIDTHS, formats=FORMATS):
+    # Variantes d'une image -> entrée du manifeste
+    from PIL import Image, features
+
+    with open(source, 'rb') as f:
+        data = f.read()
+    key = digest(data)
+    stem, ext = os.path.splitext(os.path.basename(source))
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    original = image.format
+    image = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+    # Les PNG de matplotlib ont un canal alpha entièrement opaque : inutile de l'encoder
+    if image.mode == 'RGBA' and image.getchannel('A').getextrema() == (255, 255):
+        image = image.convert('RGB')
+
+    target = assets.resolve(IMAGES_DIR)
+    os.makedirs(target, exist_ok=True)
+    variants = {}
+    for width in sorted({min(w, image.width) for w in widths}):
+        resized = _resize(image, width)
+        for fmt, options in formats.items():
+            if not features.check(fmt):
+                continue
+            name = f'{stem}-{key}-{width}.{fmt}'
+            resized.save(os.path.join(target, name), fmt.upper(), **options)
+            variants.setdefault(fmt, []).append([width, name])
+    width = min(FALLBACK_WIDTH, image.width)
+    fallback = f'{stem}-{key}-{width}{ext.lower()}'
+    resized = _resize(image, width)
+    if original == 'PNG':
+        # Palette de 256 couleurs : suffisant pour des graphiques et captures d'écran
+        resized.quantize(256, method=Image.Quantize.FASTOCTREE).save(os.path.join(target, fallback), optimize=True)
+    else:
+        resized.save(os.path.join(target, fallback), 'JPEG', quality=85, optimize=True, progressive=True)
+    return {'hash': key, 'width': image.width, 'height': image.height, 'fallback': fallback,
+            'variants': variants}
+
+
+def build_all(sources, widths=WIDTHS, formats=FORMATS):
+    # Met à jour le manifeste et supprime les fichiers qui n'y figurent plus
+    items = dict(manifest())
+    for source in sources:
+        items[os.path.basename(source)] = build(source, widths, formats)
+    target = assets.resolve(IMAGES_DIR)
+    with open(assets.resolve(MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(items, f, indent=1, sort_keys=True)
+    used = {os.path.basename(MANIFEST)}
+    for item in items.values():
+        used.add(item['fallback'])
+        used.update(name for files in item['variants'].values() for _, name in files)
+    for name in os.listdir(target):
+        if name not in used:
+            os.remove(os.path.join(target, name))
+    return items
+
+
+def enabled():
+    return bool(st.get_option('server.enableStaticServing'))
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _manifest(path, mtime):
+    return json.loads(assets.load(path))
+
+
+def manifest():
+    if not assets.exists(MANIFEST):
+        return {}
+    return _manifest(*assets.stamp(MANIFEST))
+
+
+@st.cache_resource(max_entries=4 * assets.MAX_ENTRIES, show_spinner=False)
+def _digest(path, mtime):
+    return digest(assets.load(path))
+
+
+def entry(name):
+    # Variantes à jour de l'image, ou None (service statique désactivé, image absente ou modifiée)
+    if not enabled():
+        return None
+    item = manifest().get(name)
+    if item is None:
+        return None
+    if _digest(*assets.stamp(name)) != item['hash']:
+        return None
+    return item
+
+
+def _srcset(files):
+    return ', '.join(f'{URL}/{name} {width}w' for width, name in files)
+
+
+def picture(name, item, width=None, lazy=True):
+    # Balise <picture> : une source par format, l'original en dernier recours
+    sizes = f'{width}px' if width else SIZES
+    sources = ''.join(f'<source type="image/{fmt}" srcset="{_srcset(item["variants"][fmt])}" sizes="{sizes}">'
+                      for fmt in FORMATS if fmt in item['variants'])
+    shown = width or item['width']
+    height = round(item['height'] * shown / item['width'])
+    loading = ' loading="lazy"' if lazy else ''
+    return (f'<picture>{sources}<img src="{URL}/{item["fallback"]}" alt="{name}" width="{shown}" '
+            f'height="{height}"{loading} decoding="async" style="max-width:100%;height:auto"></picture>')
+
+
+def show(name, width=None, lazy=True):
+    # Remplace st.image(assets.read_bytes(name)) ; `lazy=False` pour une image en haut de page
+    item = entry(name)
+    if item is None:
+        if width is None:
+            st.image(assets.read_bytes(name))
+        else:
+            st.image(assets.read_bytes(name), width=width)
+        return
+    st.markdown(picture(name, item, width, lazy), unsafe_allow_html=True)
+
+
+def src(name, mime='image/png'):
+    # Adresse de l'image pour une balise <img> écrite à la main : fichier statique si possible
+    item = entry(name)
+    if item is None:
+        return assets.data_uri(name, mime)
+    return f'{URL}/{item["fallback"]}'
+
+
+if __name__ == '__main__':
+    sources = sys.argv[1:]
+    items = build_all(sources)
+    for source in sources:
+        item = items[os.path.basename(source)]
+        sizes = {fmt: sum(os.path.getsize(assets.resolve(os.path.join(IMAGES_DIR, n))) for _, n in files)
+                 for fmt, files in item['variants'].items()}
+        print(f"{source} ({os.path.getsize(source)} o, {item['width']} px) -> "
+              + ', '.join(f'{fmt} {len(item["variants"][fmt])} largeurs ({size} o)' for fmt, size in sizes.items()))
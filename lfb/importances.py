@@ -0,0 +1,128 @@
+"""Importance des variables du modèle, regroupée par variable d'origine.
+
+Les colonnes one-hot (BoroughName_Camden, BoroughName_Barnet, ...) sont rattachées une fois
+pour toutes à leur variable par un tableau d'entiers ; les importances par variable sont
+alors une simple somme pondérée (np.bincount).
+
+L'importance par permutation est calculée variable par variable (toutes les colonnes one-hot
+d'une variable sont permutées ensemble), sur un sous-échantillon stratifié du jeu de test,
+les variables étant réparties sur tous les cœurs.
+
+    python -m lfb.importances df_modelisation.parquet [--sample 20000 --repeats 5]
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from lfb import assets, frame, training
+
+IMPORTANCES = os.path.join(training.MODELS_DIR, 'importances.csv')
+
+SAMPLE = 20_000
+REPEATS = 5
+TOP = 10
+
+
+def groups(model):
+    # Variable d'origine de chaque colonne en sortie de l'encodeur : (tableau d'indices, noms)
+    encoder = model[0]
+    variables, sizes = [], []
+    for name, transformer, columns in encoder.transformers_:
+        if name == 'remainder':
+            if transformer == 'drop':
+                continue
+            columns = [encoder.feature_names_in_[c] if isinstance(c, (int, np.integer)) else c for c in columns]
+            variables += columns
+            sizes += [1] * len(columns)
+        else:
+            variables += list(columns)
+            sizes += [len(c) for c in transformer.categories_]
+    return np.repeat(np.arange(len(variables)), sizes), variables
+
+
+def grouped(importances, group, variables):
+    totals = np.bincount(group, weights=importances, minlength=len(variables))
+    return pd.Series(totals, index=variables).sort_values(ascending=False)
+
+
+def impurity(model):
+    # Importances (diminution d'impureté) du Random Forest, sommées par variable
+    group, variables = groups(model)
+    return grouped(model[-1].feature_importances_, group, variables)
+
+
+def _permutation_drop(model, X, y, column, baseline, repeats, random_state):
+    rng = np.random.default_rng(random_state)
+    drops = []
+    for _ in range(repeats):
+        shuffled = X.copy(deep=False)
+        shuffled[column] = X[column].take(rng.permutation(len(X))).set_axis(X.index)
+        drops.append(baseline - model.score(shuffled, y))
+    return np.mean(drops), np.std(drops)
+
+
+def permutation(model, X, y, sample=SAMPLE, repeats=REPEATS, n_jobs=-1, random_state=42):
+    # Baisse moyenne du score quand une variable (toutes ses colonnes encodées) est permutée
+    from joblib import Parallel, delayed
+    from sklearn.model_selection import train_test_split
+
+    if len(X) > sample:
+        X, _, y, _ = train_test_split(X, y, train_size=sample, stratify=y, random_state=random_state)
+    baseline = model.score(X, y)
+    drops = Parallel(n_jobs=n_jobs, backend='loky')(
+        delayed(_permutation_drop)(model, X, y, column, baseline, repeats, random_state + i)
+        for i, column in enumerate(X.columns))
+    table = pd.DataFrame(drops, index=X.columns, columns=['permutation', 'permutation_std'])
+    return table.sort_values('permutation', ascending=False)
+
+
+def compute(model, X_test, y_test, **kwargs):
+    table = permutation(model, X_test, y_test, **kwargs)
+    if hasattr(model, 'steps') and hasattr(model[-1], 'feature_importances_'):
+        table['impurity'] = impurity(model)
+    return table.rename_axis('variable').reset_index()
+
+
+def save(table):
+    os.makedirs(assets.resolve(training.MODELS_DIR), exist_ok=True)
+    table.to_csv(assets.resolve(IMPORTANCES), index=False)
+
+
+def available():
+    return os.path.exists(assets.resolve(IMPORTANCES))
+
+
+def load():
+    return assets.read_csv(IMPORTANCES)
+
+
+def figure(table, measure='impurity', top=None):
+    # Barres horizontales, la variable la plus importante en haut
+    table = table.dropna(subset=[measure]).sort_values(measure, ascending=False)
+    if top:
+        table = table.head(top)
+    table = table.iloc[::-1]
+    error = dict(type='data', array=table['permutation_std']) if measure == 'permutation' else None
+    fig = go.Figure(go.Bar(x=table[measure], y=table['variable'], orientation='h',
+                           marker_color='#d52b1e', error_x=error))
+    title = 'Importance par permutation (baisse du score)' if measure == 'permutation' else 'Feature importance par variable'
+    fig.update_layout(title=title + (f' : top {top}' if top else ''), height=max(300, 25 * len(table)))
+    return fig
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Importance des variables du modèle RF 3 classes')
+    parser.add_argument('source', help='DataFrame de modélisation (Parquet via lfb.frame)')
+    parser.add_argument('--version', type=int, default=None)
+    parser.add_argument('--sample', type=int, default=SAMPLE)
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    args = parser.parse_args()
+    from lfb import predict
+    X, y = training.prepare(frame.load(args.source), predict.CLASSES)
+    _, X_test, _, y_test = training.split(X, y)
+    table = compute(predict.load(args.version), X_test, y_test, sample=args.sample, repeats=args.repeats)
+    save(table)
+    print(table.to_string(index=False))
@@ -0,0 +1,243 @@
+"""Mise à jour incrémentale du jeu de données consolidé à chaque publication mensuelle LFB.
+
+Le jeu consolidé est un dataset Parquet partitionné par CalYear (nettoyé et enrichi). Un
+fichier `_watermark.json` à sa racine mémorise le plus grand ResourceMobilisationId et la
+dernière DateOfCall déjà intégrés. À chaque publication, seules les lignes au-delà de ce
+repère passent par les étapes du pipeline :
+
+1. mobilisations nouvelles (ResourceMobilisationId > repère), puis incidents correspondants ;
+2. fusion, nettoyage ('No delay', 'Not a Special Service', BoroughName, MonthOfCall, DayOfCall) ;
+3. enrichissement (Distance) ;
+4. ajout de fichiers dans les partitions CalYear concernées ;
+5. cubes d'agrégats : seules les cellules des années touchées sont recalculées (les
+   médianes ne sont pas additives), à partir de ces seules partitions ;
+6. accumulateurs des tests statistiques (lfb.stats) et histogrammes des temps de réponse
+   (lfb.thresholds) : les nouvelles lignes y sont ajoutées.
+
+Les colonnes attendues par les étapes 5 et 6 sont vérifiées avant l'ajout : un delta
+incomplet arrête la mise à jour sans rien écrire.
+
+Le repère n'est écrit qu'à la fin : une mise à jour interrompue est relancée telle quelle et
+relit le même delta. Elle ne l'intègre pas deux fois : les fichiers ajoutés portent le repère de
+départ (part-<repère>-*.parquet), effacés puis réécrits à la reprise, les cubes sont recalculés
+depuis les partitions, et chaque accumulateur garde dans son fichier le repère du dernier delta
+absorbé (un delta déjà compté est ignoré).
+
+    python -m lfb.incremental init df_consolidated/
+    python -m lfb.incremental refresh incidents.csv mobilisations.csv casernes.csv df_consolidated/
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from lfb import cubes, enrichment, ingestion, stats, thresholds
+
+WATERMARK = '_watermark.json'
+
+# Valeurs manquantes remplacées (cf. page Enrichissements & Data Cleaning)
+FILLS = {'DelayCode_Description': 'No delay', 'SpecialServiceType': 'Not a Special Service'}
+
+
+def watermark_path(dataset):
+    return os.path.join(dataset, WATERMARK)
+
+
+def read_watermark(dataset):
+    path = watermark_path(dataset)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_watermark(dataset, mark):
+    path = watermark_path(dataset)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(mark, f, indent=1)
+    os.replace(path + '.tmp', path)
+
+
+def _dataset(path):
+    return ds.dataset(path, format='parquet', partitioning='hive')
+
+
+def init(dataset):
+    # Repère calculé sur un dataset existant (construit par lfb.ingestion puis enrichi)
+    table = _dataset(dataset).to_table(columns=['ResourceMobilisationId', 'DateOfCall'])
+    last = pd.to_datetime(pd.Series(table['DateOfCall'].to_numpy(zero_copy_only=False)), dayfirst=True).max()
+    mark = {'ResourceMobilisationId': int(pc.max(table['ResourceMobilisationId']).as_py()),
+            'DateOfCall': last.date().isoformat(), 'rows': table.num_rows,
+            'updated': datetime.now(timezone.utc).isoformat(timespec='seconds')}
+    write_watermark(dataset, mark)
+    return mark
+
+
+def new_rows(incidents_path, mobilisations_path, mark, chunksize=ingestion.CHUNKSIZE):
+    # Lecture en flux : seules les mobilisations au-delà du repère, et leurs incidents, sont gardés
+    mobilisations = []
+    for table in ingestion.read_chunks(mobilisations_path, chunksize):
+        keep = pc.greater(table['ResourceMobilisationId'], mark['ResourceMobilisationId'])
+        if pc.any(keep).as_py():
+            mobilisations.append(table.filter(keep))
+    if not mobilisations:
+        return pd.DataFrame()
+    mobilisations = pa.concat_tables(mobilisations, promote_options='permissive')
+    wanted = pc.unique(mobilisations['IncidentNumber'])
+
+    incidents = []
+    for table in ingestion.read_chunks(incidents_path, chunksize):
+        keep = pc.is_in(table['IncidentNumber'], value_set=wanted)
+        if pc.any(keep).as_py():
+            incidents.append(table.filter(keep))
+    if not incidents:
+        return pd.DataFrame()
+    incidents = pa.concat_tables(incidents, promote_options='permissive')
+    return ingestion.join_bucket(incidents.to_pandas(), mobilisations.to_pandas())
+
+
+def proper_case(name):
+    # Graphie de la colonne ProperCase des publications LFB : 'BARKING AND DAGENHAM' -> 'Barking And dagenham'
+    return ' '.join(word.capitalize() if i < 2 else word.lower() for i, word in enumerate(name.split(' ')))
+
+
+def clean(df):
+    for column, value in FILLS.items():
+        if column in df:
+            df[column] = df[column].fillna(value)
+    # Quartier sous son nom du jeu nettoyé (ProperCase, à défaut IncGeo_BoroughName en capitales)
+    if 'BoroughName' not in df:
+        if 'ProperCase' in df:
+            df['BoroughName'] = df['ProperCase']
+        elif 'IncGeo_BoroughName' in df:
+            df['BoroughName'] = df['IncGeo_BoroughName'].map(proper_case, na_action='ignore')
+    date = pd.to_datetime(df['DateOfCall'], dayfirst=True)
+    df['MonthOfCall'] = date.dt.month_name()
+    df['DayOfCall'] = date.dt.day_name()
+    return df
+
+
+def missing(df):
+    # Colonnes absentes du delta, par étape aval (cubes toujours, accumulateurs s'ils existent)
+    stages = {'cubes': cubes.missing(df.columns)}
+    if stats.available():
+        stages['stats'] = stats.missing(df.columns)
+    if thresholds.available():
+        stages['seuils'] = thresholds.missing(df.columns)
+    return {stage: columns for stage, columns in stages.items() if columns}
+
+
+def append(df, dataset, start):
+    # Ajout dans les partitions CalYear, converti au schéma des fichiers déjà présents. Fichiers
+    # nommés d'après le repère de départ `start` : ceux d'une tentative interrompue sont remplacés
+    prefix = f'part-{start}-'
+    if os.path.isdir(dataset):
+        for root, _, files in os.walk(dataset):
+            for name in files:
+                if name.startswith(prefix):
+                    os.remove(os.path.join(root, name))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if os.path.isdir(dataset) and any(not f.startswith(('_', '.')) for f in os.listdir(dataset)):
+        schema = _dataset(dataset).schema
+        table = pa.table({field.name: (table[field.name] if field.name in table.column_names
+                                       else pa.nulls(table.num_rows)).cast(field.type) for field in schema})
+    pq.write_to_dataset(table, dataset, partition_cols=['CalYear'],
+                        basename_template=prefix + '{i}.parquet')
+
+
+def update_cubes(dataset, years):
+    # Cellules des années touchées recalculées depuis leurs seules partitions, les autres conservées
+    if not years:
+        return {}
+    wanted = sorted({c for dims in cubes.CUBES.values() for c in dims} | set(cubes.MEASURES) | {'IncidentNumber'})
+    source = _dataset(dataset)
+    columns = [c for c in wanted if c in source.schema.names]
+    df = source.to_table(columns=columns, filter=pc.field('CalYear').isin(years)).to_pandas()
+    updated = {}
+    for name, cells in cubes.build(df).items():
+        if cubes.available(name):
+            previous = cubes.load(name)
+            cells = pd.concat([previous[~previous['CalYear'].isin(years)], cells], ignore_index=True)
+            cells = cells.sort_values(cubes.CUBES[name], ignore_index=True)
+        updated[name] = cells
+    cubes.write(updated)
+    return updated
+
+
+def refresh(incidents_path, mobilisations_path, stations, dataset, chunksize=ingestion.CHUNKSIZE):
+    # Intègre une nouvelle publication ; renvoie le nouveau repère et la durée de chaque étape
+    mark = read_watermark(dataset)
+    if mark is None:
+        raise FileNotFoundError(f'Aucun repère dans {dataset} : lancer d\'abord `python -m lfb.incremental init`')
+    timings = {}
+    start = time.perf_counter()
+    delta = new_rows(incidents_path, mobilisations_path, mark, chunksize)
+    timings['lecture'] = time.perf_counter() - start
+    if delta.empty:
+        return mark, timings
+
+    start = time.perf_counter()
+    delta = enrichment.add_distance(clean(delta), stations)
+    timings['nettoyage_enrichissement'] = time.perf_counter() - start
+    absent = missing(delta)
+    if absent:
+        raise ValueError('Colonnes absentes du delta, rien n\'a été écrit : '
+                         + ' ; '.join(f'{stage} : {", ".join(columns)}' for stage, columns in absent.items()))
+
+    start = time.perf_counter()
+    append(delta, dataset, mark['ResourceMobilisationId'])
+    timings['ajout'] = time.perf_counter() - start
+    # Repère atteint par ce delta, enregistré avec chaque accumulateur
+    reached = int(delta['ResourceMobilisationId'].max())
+
+    start = time.perf_counter()
+    years = sorted(int(y) for y in np.unique(delta['CalYear']))
+    update_cubes(dataset, years)
+    timings['cubes'] = time.perf_counter() - start
+
+    if stats.available():
+        start = time.perf_counter()
+        stats.update(delta, reached)
+        timings['stats'] = time.perf_counter() - start
+
+    if thresholds.available():
+        start = time.perf_counter()
+        thresholds.update(delta, reached)
+        timings['seuils'] = time.perf_counter() - start
+
+    last = pd.to_datetime(delta['DateOfCall'], dayfirst=True).max().date().isoformat()
+    mark = {'ResourceMobilisationId': max(mark['ResourceMobilisationId'], reached),
+            'DateOfCall': max(mark['DateOfCall'], last), 'rows': mark['rows'] + len(delta),
+            'updated': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'delta_rows': len(delta),
+            'years': years}
+    write_watermark(dataset, mark)
+    return mark, timings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mise à jour incrémentale du jeu de données consolidé')
+    commands = parser.add_subparsers(dest='command', required=True)
+    first = commands.add_parser('init')
+    first.add_argument('dataset')
+    update = commands.add_parser('refresh')
+    update.add_argument('incidents')
+    update.add_argument('mobilisations')
+    update.add_argument('stations', help='CSV des casernes (DeployedFromStation_Code, Station_Latitude, Station_Longitude)')
+    update.add_argument('dataset')
+    update.add_argument('--chunksize', type=int, default=ingestion.CHUNKSIZE)
+    args = parser.parse_args()
+    if args.command == 'init':
+        print(init(args.dataset))
+    else:
+        mark, timings = refresh(args.incidents, args.mobilisations,
+                                enrichment.StationLookup(pd.read_csv(args.stations)), args.dataset, args.chunksize)
+        print(mark)
+        print({stage: round(seconds, 2) for stage, seconds in timings.items()})
@@ -0,0 +1,139 @@
+"""Fusion en flux des fichiers LFB Incident Records et Mobilisation Records.
+
+Le pd.merge naïf charge les deux fichiers complets en mémoire, puis le résultat
+(2 220 718 x 58). Ici la jointure est faite par paquets :
+
+1. les deux fichiers sont lus par blocs et répartis dans P paquets selon un hachage de
+   IncidentNumber (fichiers Parquet temporaires) ;
+2. pour chaque paquet, les incidents sont indexés (table de hachage) puis joints aux
+   mobilisations du même paquet ;
+3. le résultat est écrit en Parquet partitionné par CalYear.
+
+Le pic mémoire correspond à un paquet (environ 1/P des données), quel que soit le volume.
+
+    python -m lfb.ingestion incidents.csv mobilisations.csv df_consolidated/ [--buckets 32]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Colonnes communes aux deux jeux de données, utilisées pour la fusion
+ON = ['IncidentNumber', 'CalYear', 'HourOfCall']
+
+CHUNKSIZE = 50_000
+BLOCK_SIZE = 1 << 20
+BUCKETS = 32
+
+# Nombre de lignes lues pour déterminer les types des colonnes
+SAMPLE_ROWS = 50_000
+
+
+def infer_schema(path, sample_rows=SAMPLE_ROWS):
+    # Types figés à partir d'un échantillon : tous les blocs partagent ainsi le même schéma
+    sample = pd.read_csv(path, nrows=sample_rows, low_memory=False)
+    types = {}
+    for column, dtype in sample.dtypes.items():
+        if pd.api.types.is_integer_dtype(dtype):
+            types[column] = pa.int64()
+        elif pd.api.types.is_float_dtype(dtype):
+            types[column] = pa.float64()
+        else:
+            types[column] = pa.string()
+    types['IncidentNumber'] = pa.string()
+    return types
+
+
+def read_chunks(path, chunksize=CHUNKSIZE):
+    # Blocs (tables Arrow) lus en flux depuis un CSV ou un Parquet
+    if path.endswith('.parquet'):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            table = pa.Table.from_batches([batch])
+            column = table.schema.get_field_index('IncidentNumber')
+            yield table.set_column(column, 'IncidentNumber', table['IncidentNumber'].cast(pa.string()))
+    else:
+        from pyarrow import csv
+        # Petits blocs : le lecteur Arrow lit plusieurs blocs en avance, la mémoire en dépend
+        reader = csv.open_csv(path, read_options=csv.ReadOptions(block_size=BLOCK_SIZE),
+                              convert_options=csv.ConvertOptions(column_types=infer_schema(path)))
+        batches, rows = [], 0
+        for batch in reader:
+            batches.append(batch)
+            rows += batch.num_rows
+            if rows >= chunksize:
+                yield pa.Table.from_batches(batches)
+                batches, rows = [], 0
+        if batches:
+            yield pa.Table.from_batches(batches)
+
+
+def bucket_of(keys, buckets):
+    keys = pd.Series(keys.to_numpy(zero_copy_only=False)) if isinstance(keys, pa.ChunkedArray) else keys
+    return (pd.util.hash_pandas_object(keys, index=False).to_numpy() % buckets).astype(np.int64)
+
+
+def partition(path, directory, buckets, chunksize=CHUNKSIZE):
+    # Répartit un fichier source dans `buckets` fichiers Parquet selon le hachage de IncidentNumber
+    os.makedirs(directory, exist_ok=True)
+    writers = {}
+    try:
+        for table in read_chunks(path, chunksize):
+            ids = bucket_of(table['IncidentNumber'], buckets)
+            order = np.argsort(ids, kind='stable')
+            bounds = np.searchsorted(ids[order], np.arange(buckets + 1))
+            for bucket in range(buckets):
+                if bounds[bucket] == bounds[bucket + 1]:
+                    continue
+                part = table.take(order[bounds[bucket]:bounds[bucket + 1]])
+                if bucket not in writers:
+                    writers[bucket] = pq.ParquetWriter(os.path.join(directory, f'{bucket}.parquet'), part.schema)
+                writers[bucket].write_table(part)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+
+def join_bucket(incidents, mobilisations, on=ON):
+    # Index de hachage sur les incidents du paquet, puis sondage par les mobilisations
+    index = incidents.set_index(on)
+    return mobilisations.join(index, on=on, how='inner')
+
+
+def merge(incidents_path, mobilisations_path, target, buckets=BUCKETS, chunksize=CHUNKSIZE, on=ON):
+    # Fusion complète, écrite dans `target` (dataset Parquet partitionné par CalYear)
+    spill = tempfile.mkdtemp(prefix='lfb-merge-')
+    try:
+        partition(incidents_path, os.path.join(spill, 'incidents'), buckets, chunksize)
+        partition(mobilisations_path, os.path.join(spill, 'mobilisations'), buckets, chunksize)
+        rows = 0
+        for bucket in range(buckets):
+            inc = os.path.join(spill, 'incidents', f'{bucket}.parquet')
+            mob = os.path.join(spill, 'mobilisations', f'{bucket}.parquet')
+            if not (os.path.exists(inc) and os.path.exists(mob)):
+                continue
+            joined = join_bucket(pd.read_parquet(inc), pd.read_parquet(mob), on)
+            if joined.empty:
+                continue
+            pq.write_to_dataset(pa.Table.from_pandas(joined, preserve_index=False), target,
+                                partition_cols=['CalYear'], basename_template=f'part-{bucket}-{{i}}.parquet')
+            rows += len(joined)
+        return rows
+    finally:
+        shutil.rmtree(spill, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fusion en flux Incidents x Mobilisations')
+    parser.add_argument('incidents')
+    parser.add_argument('mobilisations')
+    parser.add_argument('target')
+    parser.add_argument('--buckets', type=int, default=BUCKETS)
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE)
+    args = parser.parse_args()
+    rows = merge(args.incidents, args.mobilisations, args.target, args.buckets, args.chunksize)
+    print(f'{rows} lignes écrites dans {args.target}')
@@ -0,0 +1,227 @@
+"""Entraînement de plusieurs variables cibles en parallèle sur une matrice de variables partagée.
+
+L'étude n'a modélisé que AttendanceTimeSeconds ; MobilisationTime (temps passé sur l'incident),
+déjà présente dans le jeu de modélisation, avait été écartée faute de temps. Ici chaque cible
+(TARGETS) est un travail d'un pool de processus :
+
+1. les variables explicatives (celles de lfb.training) sont encodées une seule fois en une
+   matrice float32 (catégories -> codes entiers), lignes mélangées, écrite en .npy ;
+2. chaque processus ouvre cette matrice en `mmap_mode='r'` : les pages du fichier sont
+   partagées par tous les processus, aucune copie par travail. Les lignes d'apprentissage puis
+   de test sont contiguës : X[:n_train] et X[n_train:] sont des vues du fichier, que le Random
+   Forest (float32) utilise sans conversion ;
+3. les cœurs sont répartis entre les travaux (processus x threads des arbres) : une cible de
+   plus coûte un travail de plus dans le pool, pas une exécution en série supplémentaire.
+
+Chaque cible produit un rapport JSON (métriques, temps, pic mémoire du processus) et
+l'exécution un récapitulatif (durée totale, temps de calcul cumulé des travaux), affichés sur
+la page Modélisation.
+
+    python -m lfb.multitarget df_modelisation.parquet [--targets attendance_3 mobilisation] [--workers 3]
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from lfb import assets, frame, training
+
+MULTITARGET_DIR = os.path.join(training.MODELS_DIR, 'multitarget')
+RUN = os.path.join(MULTITARGET_DIR, 'run.json')
+
+# Cibles : classes du temps de réponse (bornes de training.CLASSES) ou régression
+TARGETS = {
+    'attendance_3': {'column': 'AttendanceTimeSeconds', 'classes': 3},
+    'attendance_4': {'column': 'AttendanceTimeSeconds', 'classes': 4},
+    'mobilisation': {'column': 'MobilisationTime'},
+}
+
+# Temps passé sur l'incident retenu (s) : au-delà, interventions exceptionnelles écartées
+MOBILISATION_MAX = 3 * 3600
+
+PARAMS = {'n_estimators': 100, 'max_depth': 30}
+
+SEED = 42
+
+
+def prepare(df, targets=TARGETS):
+    # Lignes communes à toutes les cibles, variables explicatives et valeurs de chaque cible
+    df = df[df['CalYear'] >= training.FIRST_YEAR]
+    columns = {spec['column'] for spec in targets.values()}
+    keep = np.ones(len(df), dtype=bool)
+    if training.TARGET in columns:
+        keep &= df[training.TARGET].between(0, training.CLASSES[4][-1]).to_numpy()
+    if 'MobilisationTime' in columns:
+        keep &= df['MobilisationTime'].between(1, MOBILISATION_MAX).to_numpy()
+    df = df[keep]
+    X = df.drop(columns=[c for c in training.DROPPED + [training.TARGET] if c in df])
+    y = {}
+    for name, spec in targets.items():
+        values = df[spec['column']]
+        if 'classes' in spec:
+            bounds = training.CLASSES[spec['classes']]
+            values = pd.cut(values, bounds, labels=range(1, spec['classes'] + 1), include_lowest=True).astype(np.int8)
+        y[name] = values.to_numpy()
+    return X, y
+
+
+def encode(X, y, directory, test_size=0.2, random_state=SEED):
+    # Écrit features.npy (float32, lignes mélangées), une cible par fichier et layout.json
+    order = np.random.default_rng(random_state).permutation(len(X))
+    categorical = [c for c in X.columns if not pd.api.types.is_numeric_dtype(X[c])]
+    matrix = np.lib.format.open_memmap(os.path.join(directory, 'features.npy'), mode='w+', dtype=np.float32,
+                                       shape=(len(X), X.shape[1]))
+    # Colonne par colonne : jamais de copie complète de X en float64
+    for j, column in enumerate(X.columns):
+        if column in categorical:
+            values = X[column].astype('category').cat.codes.to_numpy()
+        else:
+            values = X[column].to_numpy(dtype=np.float32, na_value=np.nan)
+        matrix[:, j] = values[order]
+    matrix.flush()
+    del matrix
+    for name, values in y.items():
+        np.save(os.path.join(directory, f'{name}.npy'), values[order])
+    layout = {'rows': len(X), 'n_train': len(X) - int(round(len(X) * test_size)), 'features': list(X.columns),
+              'categorical': categorical}
+    with open(os.path.join(directory, 'layout.json'), 'w', encoding='utf-8') as f:
+        json.dump(layout, f)
+    return layout
+
+
+def fit(name, directory, params, n_jobs):
+    # Un travail du pool : entraînement et évaluation d'une cible sur la matrice projetée en mémoire
+    from sklearn import metrics
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+    cpu = time.process_time()
+    with open(os.path.join(directory, 'layout.json'), encoding='utf-8') as f:
+        layout = json.load(f)
+    X = np.load(os.path.join(directory, 'features.npy'), mmap_mode='r')
+    y = np.load(os.path.join(directory, f'{name}.npy'))
+    n = layout['n_train']
+    spec = TARGETS[name]
+    estimator = RandomForestClassifier if 'classes' in spec else RandomForestRegressor
+    model = estimator(random_state=SEED, n_jobs=n_jobs, **params)
+    with training.measure() as fitted:
+        model.fit(X[:n], y[:n])
+    with training.measure() as predicted:
+        y_pred = model.predict(X[n:])
+    y_test = y[n:]
+    report = {'target': name, 'column': spec['column'], 'rows': layout['rows'], 'train_rows': n,
+              'params': params, 'n_jobs': n_jobs, 'pid': os.getpid(), 'fit': fitted, 'predict': predicted,
+              'cpu_seconds': round(time.process_time() - cpu, 3)}
+    if 'classes' in spec:
+        report.update(kind='classification', classes=spec['classes'],
+                      accuracy=round(float(metrics.accuracy_score(y_test, y_pred)), 4),
+                      f1_macro=round(float(metrics.f1_score(y_test, y_pred, average='macro')), 4))
+    else:
+        report.update(kind='regression', r2=round(float(metrics.r2_score(y_test, y_pred)), 4),
+                      mae=round(float(metrics.mean_absolute_error(y_test, y_pred)), 1),
+                      rmse=round(float(np.sqrt(metrics.mean_squared_error(y_test, y_pred))), 1))
+    return report
+
+
+def cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def run(df, targets=None, workers=None, params=None, log=print):
+    # Encode, entraîne les cibles dans un pool de processus, enregistre les rapports
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    names = list(targets or TARGETS)
+    params = {**PARAMS, **(params or {})}
+    workers = workers or min(len(names), cores())
+    n_jobs = max(1, cores() // workers)
+    directory = tempfile.mkdtemp(prefix='lfb-multitarget-')
+    try:
+        start = time.perf_counter()
+        X, y = prepare(df, {name: TARGETS[name] for name in names})
+        layout = encode(X, y, directory)
+        del X, y
+        encoding = round(time.perf_counter() - start, 3)
+        log(f"matrice {layout['rows']} x {len(layout['features'])} encodée en {encoding} s ; "
+            f'{len(names)} cibles, {workers} processus x {n_jobs} threads')
+        reports = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            jobs = [pool.submit(fit, name, directory, params, n_jobs) for name in names]
+            for job in as_completed(jobs):
+                report = job.result()
+                save_report(report)
+                reports.append(report)
+                log(f"{report['target']} : {report['fit']['seconds']} s")
+        wall = round(time.perf_counter() - start, 3)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    summary_run = {'targets': names, 'workers': workers, 'n_jobs': n_jobs, 'cores': cores(), 'rows': layout['rows'],
+                   'features': len(layout['features']), 'encoding_seconds': encoding, 'wall_seconds': wall,
+                   'cpu_seconds': round(encoding + sum(r['cpu_seconds'] for r in reports), 3)}
+    target = assets.resolve(RUN)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'w', encoding='utf-8') as f:
+        json.dump(summary_run, f, indent=1)
+    return reports, summary_run
+
+
+def report_path(name):
+    return os.path.join(MULTITARGET_DIR, f'report_{name}.json')
+
+
+def save_report(report):
+    target = assets.resolve(report_path(report['target']))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    return target
+
+
+def available():
+    return os.path.exists(assets.resolve(RUN))
+
+
+def load():
+    # Récapitulatif de la dernière exécution et rapports des cibles disponibles
+    run_summary = json.loads(assets.read_text(RUN))
+    reports = [json.loads(assets.read_text(report_path(name))) for name in TARGETS
+               if os.path.exists(assets.resolve(report_path(name)))]
+    return run_summary, reports
+
+
+def summary(reports):
+    # Tableau récapitulatif : une ligne par cible
+    rows = []
+    for r in reports:
+        classification = r['kind'] == 'classification'
+        rows.append({
+            'Cible': r['column'] + (f" ({r['classes']} classes)" if classification else ''),
+            'Modèle': 'Random Forest ' + ('classification' if classification else 'régression'),
+            'Lignes (apprentissage)': r['train_rows'],
+            'Score': f"accuracy {r['accuracy']:.3f}" if classification else f"R² {r['r2']:.3f}",
+            'Erreur': f"F1 macro {r['f1_macro']:.3f}" if classification else f"MAE {r['mae']:.0f} s",
+            "Temps d'entraînement (s)": r['fit']['seconds'],
+            'Pic mémoire (Mo)': r['fit']['peak_rss_mb'],
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Entraînement parallèle de plusieurs variables cibles')
+    parser.add_argument('source', help='DataFrame de modélisation (Parquet via lfb.frame, ou CSV)')
+    parser.add_argument('--targets', nargs='+', choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument('--workers', type=int, help='processus du pool (défaut : une cible par cœur)')
+    parser.add_argument('--n-estimators', type=int, default=PARAMS['n_estimators'])
+    parser.add_argument('--max-depth', type=int, default=PARAMS['max_depth'])
+    args = parser.parse_args()
+    df = frame.load(args.source) if args.source.endswith('.parquet') else frame.read_csv(args.source)
+    _, run_summary = run(df, args.targets, args.workers,
+                         {'n_estimators': args.n_estimators, 'max_depth': args.max_depth})
+    print(run_summary)
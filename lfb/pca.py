@@ -0,0 +1,160 @@
+"""Réduction de dimensions (ACP) sur le jeu de modélisation encodé, par blocs de lignes.
+
+La matrice encodée complète (1295782 x 363, standardisée donc dense) n'est jamais construite :
+
+1. un premier passage calcule moyennes et écarts-types (StandardScaler.partial_fit) ;
+2. un second passage ajuste une IncrementalPCA bloc par bloc.
+
+Chaque bloc est encodé avec des modalités fixées à l'avance (celles des colonnes `category`),
+si bien que tous les blocs ont les mêmes colonnes. Les composantes et la variance expliquée sont
+enregistrées dans `models/pca.npz`, d'où sont tracés les graphiques de la page Modélisation.
+
+    python -m lfb.pca df_modelisation.parquet [--components 60 --chunksize 20000]
+"""
+import argparse
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+from lfb import assets, frame, training
+
+PCA_PATH = os.path.join(training.MODELS_DIR, 'pca.npz')
+
+N_COMPONENTS = 60
+CHUNKSIZE = 20_000
+
+# Variables nommées sur le cercle des corrélations (les plus corrélées aux deux axes)
+LABELLED = 15
+
+
+def encoder(X):
+    # One-hot aux modalités figées + variables numériques
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import OneHotEncoder
+
+    categorical, numeric = training.split_columns(X)
+    onehot = OneHotEncoder(categories=[list(X[c].cat.categories) for c in categorical],
+                           handle_unknown='ignore', sparse_output=False, dtype=np.float64)
+    return ColumnTransformer([('onehot', onehot, categorical)], remainder='passthrough',
+                             verbose_feature_names_out=False).fit(X.iloc[:1])
+
+
+def _chunks(X, encode, chunksize):
+    for start in range(0, len(X), chunksize):
+        yield encode.transform(X.iloc[start:start + chunksize]).astype(np.float64)
+
+
+def fit(X, n_components=N_COMPONENTS, chunksize=CHUNKSIZE):
+    from sklearn.decomposition import IncrementalPCA
+    from sklearn.preprocessing import StandardScaler
+
+    encode = encoder(X)
+    scaler = StandardScaler()
+    for chunk in _chunks(X, encode, chunksize):
+        scaler.partial_fit(chunk)
+    scale = np.where(scaler.scale_ > 0, scaler.scale_, 1.0)
+
+    # Le dernier bloc est fusionné avec le précédent s'il est plus petit que le nombre de composantes
+    n_components = min(n_components, len(scale))
+    pca = IncrementalPCA(n_components=n_components)
+    pending = None
+    for chunk in _chunks(X, encode, chunksize):
+        chunk = (chunk - scaler.mean_) / scale
+        if pending is not None:
+            chunk, pending = np.vstack([pending, chunk]), None
+        if len(chunk) < n_components:
+            pending = chunk
+            continue
+        pca.partial_fit(chunk)
+    return {
+        'features': np.array(encode.get_feature_names_out(), dtype=str),
+        'components': pca.components_.astype(np.float32),
+        'explained_variance': pca.explained_variance_,
+        'explained_variance_ratio': pca.explained_variance_ratio_,
+        'rows': np.array(len(X)),
+    }
+
+
+def save(result):
+    os.makedirs(assets.resolve(training.MODELS_DIR), exist_ok=True)
+    np.savez(assets.resolve(PCA_PATH), **result)
+
+
+def available():
+    return os.path.exists(assets.resolve(PCA_PATH))
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load(path, mtime):
+    with np.load(path) as store:
+        return {k: store[k] for k in store.files}
+
+
+def load():
+    full = assets.resolve(PCA_PATH)
+    return _load(full, os.stat(full).st_mtime_ns)
+
+
+def variance_figure(result):
+    # Éboulis des valeurs propres
+    ranks = np.arange(1, len(result['explained_variance']) + 1)
+    fig = go.Figure(go.Scatter(x=ranks, y=result['explained_variance'], mode='lines+markers', line_color='#d52b1e'))
+    fig.update_layout(title='Variance expliquée par facteur')
+    fig.update_xaxes(title='Nombre de facteurs')
+    fig.update_yaxes(title='Valeur propre')
+    return fig
+
+
+def ratio_figure(result):
+    # Part cumulée de la variance expliquée
+    ratio = np.cumsum(result['explained_variance_ratio'])
+    ranks = np.arange(1, len(ratio) + 1)
+    fig = go.Figure(go.Scatter(x=ranks, y=ratio * 100, mode='lines', line_color='#d52b1e', fill='tozeroy'))
+    fig.update_layout(title='Part cumulée de la variance expliquée (%)')
+    fig.update_xaxes(title='Nombre de facteurs')
+    fig.update_yaxes(title='%', range=[0, 100])
+    return fig
+
+
+def circle_figure(result, x=0, y=1, labelled=LABELLED):
+    # Cercle des corrélations : corrélation de chaque variable (standardisée) aux deux axes
+    loadings = result['components'][[x, y]].T * np.sqrt(result['explained_variance'][[x, y]])
+    features = result['features']
+    norm = np.hypot(loadings[:, 0], loadings[:, 1])
+    top = set(np.argsort(norm)[::-1][:labelled])
+    theta = np.linspace(0, 2 * np.pi, 200)
+    fig = go.Figure(go.Scatter(x=np.cos(theta), y=np.sin(theta), mode='lines', line_color='#7f7f7f',
+                               hoverinfo='skip', showlegend=False))
+    xs, ys = [], []
+    for cx, cy in loadings:
+        xs += [0, cx, None]
+        ys += [0, cy, None]
+    fig.add_trace(go.Scatter(x=xs, y=ys, mode='lines', line=dict(color='#d52b1e', width=1),
+                             hoverinfo='skip', showlegend=False))
+    fig.add_trace(go.Scatter(x=loadings[:, 0], y=loadings[:, 1], mode='markers',
+                             text=features, hovertemplate='%{text}<br>(%{x:.2f}, %{y:.2f})<extra></extra>',
+                             marker=dict(color='#d52b1e', size=4), showlegend=False))
+    labels = sorted(top)
+    fig.add_trace(go.Scatter(x=loadings[labels, 0], y=loadings[labels, 1], mode='text', text=features[labels],
+                             textposition='top center', hoverinfo='skip', showlegend=False))
+    ratio = result['explained_variance_ratio']
+    fig.update_layout(title='Cercle des corrélations')
+    fig.update_xaxes(title=f'Axe {x + 1} ({ratio[x]:.1%})', range=[-1.1, 1.1], zeroline=True)
+    fig.update_yaxes(title=f'Axe {y + 1} ({ratio[y]:.1%})', range=[-1.1, 1.1], zeroline=True,
+                     scaleanchor='x', scaleratio=1)
+    return fig
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='ACP incrémentale du jeu de modélisation encodé')
+    parser.add_argument('source', help='DataFrame de modélisation (Parquet via lfb.frame)')
+    parser.add_argument('--components', type=int, default=N_COMPONENTS)
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE)
+    args = parser.parse_args()
+    X, _ = training.prepare(frame.load(args.source))
+    result = fit(X, args.components, args.chunksize)
+    save(result)
+    print(f"{len(X)} lignes, {len(result['features'])} colonnes encodées, "
+          f"{result['explained_variance_ratio'].sum():.1%} de variance sur {len(result['components'])} axes -> {PCA_PATH}")
@@ -0,0 +1,196 @@
+"""Modèle Random Forest (3 classes) persisté et prédiction du temps de réponse.
+
+Le modèle est enregistré dans `models/rf3-v<N>.joblib` (non compressé : chargement sans
+décompression), avec à côté `models/rf3-v<N>.json` : schéma des variables, bornes des classes,
+métriques. Il est chargé une fois par processus et partagé par les sessions (st.cache_resource) ;
+chaque processus en garde sa propre copie, scikit-learn recopiant les tableaux des arbres au
+chargement (un `mmap_mode` n'y changerait rien).
+
+    python -m lfb.predict build df_modelisation.parquet [--n-estimators 100 --max-depth 30 | --tuned]
+    python -m lfb.predict score df_a_predire.parquet predictions.parquet
+"""
+import argparse
+import glob
+import json
+import os
+import re
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from lfb import assets, frame, profiling, training
+
+NAME = 'rf3'
+CLASSES = 3
+
+# Intitulés des classes 1..3, bornes de training.CLASSES[3]
+LABELS = ['Temps court (0 à 4:04)', 'Temps moyen (4:04 à 10:24)', 'Temps long (10:24 à 20min)']
+
+BATCH_SIZE = 100_000
+
+
+def artifact_path(version):
+    return os.path.join(training.MODELS_DIR, f'{NAME}-v{version}.joblib')
+
+
+def metadata_path(version):
+    return os.path.join(training.MODELS_DIR, f'{NAME}-v{version}.json')
+
+
+def versions():
+    pattern = assets.resolve(os.path.join(training.MODELS_DIR, f'{NAME}-v*.joblib'))
+    found = (re.search(r'-v(\d+)\.joblib$', p) for p in glob.glob(pattern))
+    return sorted(int(m.group(1)) for m in found if m)
+
+
+def latest():
+    found = versions()
+    return found[-1] if found else None
+
+
+def available():
+    return latest() is not None
+
+
+def encoder_categories(model):
+    # Modalités vues à l'entraînement par le one-hot du pipeline, par colonne (sans la valeur manquante)
+    encoder = model[0].named_transformers_['onehot']
+    return {column: [v for v in values.tolist() if not pd.isna(v)]
+            for column, values in zip(encoder.feature_names_in_, encoder.categories_)}
+
+
+def features_schema(features, categories=None):
+    # Comme frame.schema, mais les modalités gardent leur type (CalYear, HourOfCall sont des entiers) ;
+    # `categories` (encoder_categories) remplace les modalités du dtype
+    categories = categories or {}
+    schema = {}
+    for column, dtype in features.dtypes.items():
+        schema[column] = {'dtype': str(dtype)}
+        if isinstance(dtype, pd.CategoricalDtype):
+            values = categories.get(column, dtype.categories.tolist())
+            if not len(values):
+                raise ValueError(f'Aucune modalité pour la variable catégorielle {column}')
+            schema[column]['categories'] = values
+    return schema
+
+
+def export(model, features, df, report=None):
+    # Nouvelle version : modèle + métadonnées (schéma des variables, valeurs par défaut du formulaire).
+    # `features` ne sert qu'aux colonnes et types : les modalités viennent du modèle entraîné
+    import joblib
+    import sklearn
+
+    schema = features_schema(features, encoder_categories(model))
+    version = (latest() or 0) + 1
+    os.makedirs(assets.resolve(training.MODELS_DIR), exist_ok=True)
+    model[-1].set_params(n_jobs=1)  # prédictions unitaires : pas de pool de processus
+    joblib.dump(model, assets.resolve(artifact_path(version)))
+    numeric = [c for c in features.columns if not isinstance(features[c].dtype, pd.CategoricalDtype)]
+    metadata = {
+        'version': version, 'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'sklearn': sklearn.__version__, 'bounds': training.CLASSES[CLASSES], 'labels': LABELS,
+        'features': schema,
+        'defaults': {c: float(df[c].median()) for c in numeric},
+        'metrics': {k: report[k] for k in ('accuracy', 'fit', 'rows')} if report else None,
+    }
+    with open(assets.resolve(metadata_path(version)), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=1, ensure_ascii=False)
+    return version
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load(full, mtime):
+    import joblib
+    return joblib.load(full)
+
+
+def load(version=None):
+    # Modèle chargé une fois par processus (et par version du fichier)
+    version = version or latest()
+    full = assets.resolve(artifact_path(version))
+    return _load(full, os.stat(full).st_mtime_ns)
+
+
+def metadata(version=None):
+    return json.loads(assets.read_text(metadata_path(version or latest())))
+
+
+def conform(df, meta):
+    # Colonnes et types identiques à l'entraînement ; modalités inconnues -> NaN (ignorées par le one-hot)
+    X = {}
+    for column, spec in meta['features'].items():
+        if 'categories' in spec:
+            values = df[column].astype(object)
+            X[column] = pd.Categorical(values.where(values.isin(spec['categories'])), categories=spec['categories'])
+        else:
+            X[column] = pd.to_numeric(df[column]).astype(spec['dtype'])
+    return pd.DataFrame(X, index=df.index)
+
+
+def score(df, version=None, batch_size=BATCH_SIZE):
+    # Prédiction par lots : classe prédite (1..3) et probabilité de chaque classe
+    model, meta = load(version), metadata(version)
+    out = []
+    for start in range(0, len(df), batch_size):
+        X = conform(df.iloc[start:start + batch_size], meta)
+        proba = model.predict_proba(X)
+        part = pd.DataFrame(proba.astype(np.float32), index=X.index,
+                            columns=[f'proba_{c}' for c in model.classes_])
+        part.insert(0, 'classe', model.classes_[proba.argmax(axis=1)])
+        out.append(part)
+    return pd.concat(out) if out else pd.DataFrame(columns=['classe'])
+
+
+@profiling.profiled()
+def form(version=None):
+    # Formulaire de prédiction d'une mobilisation (page Modélisation)
+    meta = metadata(version)
+    with st.form('prediction'):
+        values = {}
+        columns = st.columns(3)
+        for i, (column, spec) in enumerate(meta['features'].items()):
+            with columns[i % 3]:
+                if 'categories' in spec:
+                    values[column] = st.selectbox(column, spec['categories'])
+                else:
+                    values[column] = st.number_input(column, value=meta['defaults'][column])
+        submitted = st.form_submit_button('Prédire')
+    if submitted:
+        start = datetime.now()
+        result = score(pd.DataFrame([values]), version).iloc[0]
+        elapsed = (datetime.now() - start).total_seconds() * 1000
+        st.write(f"Classe prédite : **:red[{meta['labels'][int(result['classe']) - 1]}]** "
+                 f":gray[({elapsed:.0f} ms, modèle v{meta['version']})]")
+        st.bar_chart(pd.Series(result.drop('classe').to_numpy(), index=meta['labels'], name='Probabilité'))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Modèle RF 3 classes : construction et prédiction par lots')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build')
+    build.add_argument('source', help='DataFrame de modélisation (Parquet via lfb.frame)')
+    build.add_argument('--n-estimators', type=int, default=100)
+    build.add_argument('--max-depth', type=int, default=None)
+    build.add_argument('--tuned', action='store_true', help='paramètres de lfb.tuning (models/best_params.json)')
+    batch = commands.add_parser('score')
+    batch.add_argument('source')
+    batch.add_argument('target')
+    batch.add_argument('--version', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        df = frame.load(args.source)
+        params = {'n_estimators': args.n_estimators, 'max_depth': args.max_depth}
+        if args.tuned:
+            from lfb import tuning
+            params = tuning.best_params()
+        model, report = training.train(df, CLASSES, 'sparse', **params)
+        features = training.prepare(df.iloc[:0], CLASSES)[0]
+        print(f"accuracy={report['accuracy']} -> v{export(model, features, df, report)}")
+    else:
+        df = frame.load(args.source) if args.source.endswith('.parquet') else frame.read_csv(args.source)
+        predictions = score(df, args.version)
+        predictions.to_parquet(args.target)
+        print(f'{len(predictions)} prédictions -> {args.target}')
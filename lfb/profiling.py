@@ -0,0 +1,310 @@
+"""Profilage des sections de l'application : temps, octets lus, octets envoyés, mémoire.
+
+Désactivé par défaut : `section()` renvoie alors un contexte vide partagé et `step()` /
+`count_read()` ne font qu'un test, le coût est négligeable. Le profilage s'active :
+
+- pour un administrateur : `?admin=<jeton>` dans l'URL, le jeton étant celui de la variable
+  d'environnement LFB_ADMIN_TOKEN ; un panneau « Profilage » apparaît alors dans la barre latérale ;
+- pour toutes les sessions avec LFB_PROFILE=1 (sans panneau), pour alimenter les exports.
+
+Pour chaque section on mesure le temps écoulé, les octets lus sur disque (chargements qui ne
+sont pas servis par le cache), les octets envoyés au navigateur (messages protobuf et fichiers
+média) et la variation de mémoire résidente. Les mesures peuvent être exportées :
+
+- LFB_PROFILE_LOG=chemin.jsonl : une ligne JSON par section et par exécution ;
+- LFB_PROFILE_PROM=chemin.prom : cumuls du processus au format texte Prometheus
+  (à déposer dans le dossier du textfile collector de node_exporter).
+
+Usage dans le script de l'application :
+
+    profiling.start()
+    profiling.step('Introduction/Le Sujet')    # ferme la section précédente, ouvre la suivante
+    with profiling.section('Carte'):            # ou bloc délimité, éventuellement imbriqué
+        ...
+    profiling.finish()                          # exports + panneau administrateur
+
+Streamlit n'expose pas les messages envoyés au navigateur : les octets envoyés sont comptés en
+enveloppant deux éléments internes, ScriptRunContext._enqueue (par session) et
+MediaFileManager.add (pour tout le processus, jamais retiré ; sans effet hors d'une exécution
+profilée). Ils ne sont installés que pour les versions de Streamlit testées (STREAMLIT_VERSIONS)
+et si leurs signatures sont celles attendues ; sinon les
+colonnes d'octets envoyés restent à 0, le reste du profilage fonctionne.
+"""
+import contextlib
+import functools
+import hmac
+import inspect
+import json
+import os
+import resource
+import threading
+import time
+
+import streamlit as st
+
+ADMIN_TOKEN = 'LFB_ADMIN_TOKEN'
+PROFILE = 'LFB_PROFILE'
+LOG = 'LFB_PROFILE_LOG'
+PROM = 'LFB_PROFILE_PROM'
+
+# Nombre d'exécutions gardées dans la session pour le panneau
+HISTORY = 20
+
+# Versions de Streamlit (majeure.mineure) dont les éléments internes enveloppés par _install ont été vérifiés
+STREAMLIT_VERSIONS = ['1.66']
+
+# Mesures de l'exécution en cours, propres au thread du script (une session = un thread)
+_local = threading.local()
+
+# Cumuls du processus pour l'export Prometheus : section -> compteurs
+_totals = {}
+_totals_lock = threading.Lock()
+
+_NULL = contextlib.nullcontext()
+
+
+def _rss():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _admin():
+    # Le jeton n'est lu qu'une fois : la navigation entre pages efface les paramètres de l'URL
+    if st.session_state.get('profile_admin'):
+        return True
+    token = os.environ.get(ADMIN_TOKEN)
+    given = st.query_params.get('admin')
+    admin = bool(token) and given is not None and hmac.compare_digest(given, token)
+    if admin:
+        st.session_state['profile_admin'] = True
+    return admin
+
+
+class _Recorder:
+    # Sections ouvertes (pile) et sections terminées de l'exécution en cours
+
+    def __init__(self, admin):
+        self.admin = admin
+        self.stack = []
+        self.records = []
+        self.step = None
+
+    def open(self, name):
+        # L'enregistrement est réservé dès l'ouverture : le tableau suit l'ordre de la page
+        frame = {'section': name, 'depth': len(self.stack), 'read_bytes': 0, 'payload_bytes': 0,
+                 'media_bytes': 0}
+        self.records.append(frame)
+        self.stack.append((frame, _rss(), time.perf_counter()))
+        return frame
+
+    def close(self, frame):
+        # Une section est fermée avec les sections ouvertes à l'intérieur (step non terminé)
+        while self.stack:
+            top, rss, start = self.stack.pop()
+            top['seconds'] = time.perf_counter() - start
+            top['rss_delta_bytes'] = _rss() - rss
+            if top is self.step:
+                self.step = None
+            if top is frame:
+                break
+
+    def add(self, key, nbytes):
+        # Chaque octet compte pour toutes les sections ouvertes (une section inclut ses sous-sections)
+        for frame, _, _ in self.stack:
+            frame[key] += nbytes
+
+
+def _recorder():
+    return getattr(_local, 'recorder', None)
+
+
+@functools.cache
+def _supported():
+    # Version testée et signatures attendues des éléments internes enveloppés
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.scriptrunner import ScriptRunContext
+
+    version = '.'.join(st.__version__.split('.')[:2])
+    if version not in STREAMLIT_VERSIONS:
+        return False
+    try:
+        parameters = list(inspect.signature(MediaFileManager.add).parameters)
+    except (AttributeError, TypeError, ValueError):
+        return False
+    return parameters[:2] == ['self', 'path_or_data'] and '_enqueue' in ScriptRunContext.__dataclass_fields__
+
+
+def _install(ctx):
+    # Compte les octets des messages envoyés au navigateur par ce script ; installé une fois par
+    # session, le compteur ne fait rien en dehors d'une exécution profilée
+    if ctx is None or getattr(ctx, '_lfb_profiled', False) or not _supported():
+        return
+    enqueue = ctx._enqueue
+
+    def counted(msg):
+        recorder = _recorder()
+        if recorder is not None:
+            recorder.add('payload_bytes', msg.ByteSize())
+        enqueue(msg)
+
+    ctx._enqueue = counted
+    ctx._lfb_profiled = True
+
+    # Les images (st.image) sont envoyées à part, via le gestionnaire de fichiers média
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    if not getattr(MediaFileManager.add, '_lfb_profiled', False):
+        add = MediaFileManager.add
+
+        @functools.wraps(add)
+        def counted_add(self, path_or_data, *args, **kwargs):
+            recorder = _recorder()
+            if recorder is not None and isinstance(path_or_data, (bytes, bytearray)):
+                recorder.add('media_bytes', len(path_or_data))
+            return add(self, path_or_data, *args, **kwargs)
+
+        counted_add._lfb_profiled = True
+        MediaFileManager.add = counted_add
+
+
+def start():
+    # Début d'exécution du script : décide si cette exécution est profilée
+    admin = _admin()
+    if not (admin or os.environ.get(PROFILE) == '1'):
+        _local.recorder = None
+        return
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    try:
+        _install(get_script_run_ctx())
+    except AttributeError:
+        # Structure interne de Streamlit différente : pas de mesure des octets envoyés
+        pass
+    _local.recorder = _Recorder(admin)
+
+
+def enabled():
+    return _recorder() is not None
+
+
+def section(name):
+    recorder = _recorder()
+    if recorder is None:
+        return _NULL
+    return _section(recorder, name)
+
+
+@contextlib.contextmanager
+def _section(recorder, name):
+    frame = recorder.open(name)
+    try:
+        yield
+    finally:
+        recorder.close(frame)
+
+
+def step(name):
+    # Section sans bloc : se termine à l'étape suivante (ou à la fin du script)
+    recorder = _recorder()
+    if recorder is None:
+        return
+    if recorder.step is not None:
+        recorder.close(recorder.step)
+    recorder.step = recorder.open(name)
+
+
+def profiled(name=None):
+    # Décorateur : chaque appel de la fonction est une section
+    def decorate(function):
+        label = name or f'{function.__module__}.{function.__name__}'
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder()
+            if recorder is None:
+                return function(*args, **kwargs)
+            with _section(recorder, label):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count_read(nbytes):
+    # Appelé par les chargements réellement effectués (hors cache)
+    recorder = _recorder()
+    if recorder is not None:
+        recorder.add('read_bytes', nbytes)
+
+
+def _export(records):
+    stamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+    log = os.environ.get(LOG)
+    if log:
+        with open(log, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps({'time': stamp, **record}) + '\n')
+    prom = os.environ.get(PROM)
+    if prom:
+        with _totals_lock:
+            for record in records:
+                total = _totals.setdefault(record['section'], dict.fromkeys(
+                    ['runs', 'seconds', 'read_bytes', 'payload_bytes', 'media_bytes'], 0))
+                total['runs'] += 1
+                for key in ['seconds', 'read_bytes', 'payload_bytes', 'media_bytes']:
+                    total[key] += record[key]
+            lines = []
+            for metric, key, help_text in [
+                    ('lfb_section_runs_total', 'runs', 'Exécutions de la section'),
+                    ('lfb_section_seconds_total', 'seconds', 'Temps cumulé de la section'),
+                    ('lfb_section_read_bytes_total', 'read_bytes', 'Octets lus sur disque'),
+                    ('lfb_section_payload_bytes_total', 'payload_bytes', 'Octets des messages envoyés'),
+                    ('lfb_section_media_bytes_total', 'media_bytes', 'Octets des fichiers média envoyés')]:
+                lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} counter']
+                for name, total in sorted(_totals.items()):
+                    label = name.replace('\\', '\\\\').replace('"', '\\"')
+                    lines.append(f'{metric}{{section="{label}"}} {total[key]}')
+            # Écriture atomique : le collecteur ne lit jamais un fichier à moitié écrit
+            with open(prom + '.tmp', 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+            os.replace(prom + '.tmp', prom)
+
+
+def finish():
+    # Fin d'exécution : ferme les sections, exporte, affiche le panneau administrateur
+    recorder = _recorder()
+    if recorder is None:
+        return
+    if recorder.stack:
+        recorder.close(recorder.stack[0][0])
+    _local.recorder = None
+    records = recorder.records
+    _export(records)
+    if recorder.admin:
+        history = st.session_state.setdefault('profile_runs', [])
+        history.append(records)
+        del history[:-HISTORY]
+        panel(history)
+
+
+def panel(history):
+    import pandas as pd
+
+    last = pd.DataFrame(history[-1])
+    if last.empty:
+        return
+    with st.sidebar.expander('Profilage'):
+        st.caption(f'Dernière exécution : {last.loc[last["depth"] == 0, "seconds"].sum():.3f} s, '
+                   f'{len(history)} exécution(s) dans la session')
+        table = last.assign(
+            Section=last['depth'].map(lambda depth: '· ' * depth) + last['section'],
+            ms=(last['seconds'] * 1000).round(1),
+            Lu_Ko=(last['read_bytes'] / 1024).round(1),
+            Envoye_Ko=((last['payload_bytes'] + last['media_bytes']) / 1024).round(1),
+            RSS_Mo=(last['rss_delta_bytes'] / 2 ** 20).round(1),
+        )
+        st.dataframe(table[['Section', 'ms', 'Lu_Ko', 'Envoye_Ko', 'RSS_Mo']], hide_index=True)
+        runs = pd.concat([pd.DataFrame(records) for records in history if records])
+        median = runs.groupby('section', sort=False)['seconds'].median().mul(1000).round(1)
+        st.caption('Médiane sur la session (ms)')
+        st.dataframe(median.rename('ms'))
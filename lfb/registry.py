@@ -0,0 +1,111 @@
+"""Registre des tables du processus : une table Arrow immuable par fichier, partagée par les sessions.
+
+assets.read_csv renvoie à chaque appel une copie du DataFrame (st.cache_data) : avec N sessions
+sur une page, N copies. Ici chaque source (CSV, fichier Parquet ou dataset Parquet partitionné)
+est convertie une fois en fichier Arrow IPC non compressé dans CACHE_DIR, puis projetée en
+mémoire (mmap) : les colonnes de la table pointent directement dans le fichier, sans copie.
+
+- toutes les sessions et réexécutions reçoivent le même objet (st.cache_resource) ;
+- les pages du fichier sont chargées à la demande par le système et partagées entre processus
+  (plusieurs serveurs Streamlit sur la même machine) : la mémoire par utilisateur
+  supplémentaire reste à peu près constante ;
+- le nom du fichier converti contient le chemin et la date de modification de la source : un
+  fichier modifié est reconverti, l'ancienne conversion supprimée.
+
+La table est en lecture seule : une page qui a besoin d'un DataFrame modifiable le dérive
+(`to_pandas()`), st.dataframe accepte directement la table Arrow.
+
+Format « stream » et non « file » : les lots d'un dataset Parquet peuvent avoir chacun leur
+dictionnaire de catégories, ce que le format « file » refuse. La lecture depuis le mmap est
+sans copie dans les deux cas.
+"""
+import hashlib
+import os
+
+import streamlit as st
+
+from lfb import assets, profiling
+
+# Dossier des conversions (variable d'environnement LFB_ARROW_CACHE pour le déplacer)
+CACHE_DIR = os.environ.get('LFB_ARROW_CACHE', os.path.join(assets.ROOT, '.cache', 'arrow'))
+
+# Taille des lots écrits pour une source Parquet (lignes)
+BATCH_SIZE = 65_536
+
+
+def stamp(path):
+    # (chemin absolu, version) ; pour un dataset partitionné, date du fichier le plus récent
+    full = assets.resolve(path)
+    if not os.path.isdir(full):
+        return assets.stamp(full)
+    return full, max((os.stat(os.path.join(root, f)).st_mtime_ns for root, _, files in os.walk(full) for f in files),
+                     default=os.stat(full).st_mtime_ns)
+
+
+def _size(path):
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def target(path, mtime):
+    name = os.path.basename(path.rstrip(os.sep))
+    key = hashlib.sha1(f'{path}:{mtime}'.encode()).hexdigest()[:10]
+    return os.path.join(CACHE_DIR, f'{name}-{key}.arrow')
+
+
+def _batches(path):
+    # Schéma et lots de la source, lus par blocs pour une source Parquet
+    import pyarrow.csv as csv
+    import pyarrow.dataset as ds
+
+    if path.endswith('.csv'):
+        # Depuis le paquet (lfb.bundle) ou le disque
+        table = csv.read_csv(assets.open_file(path))
+        return table.schema, table.to_batches()
+    profiling.count_read(_size(path))
+    data = ds.dataset(path, format='parquet', partitioning='hive' if os.path.isdir(path) else None)
+    return data.schema, data.to_batches(batch_size=BATCH_SIZE)
+
+
+def convert(path, mtime):
+    # Écrit la conversion de `path` (si absente) et supprime celles de ses versions précédentes
+    import pyarrow.ipc as ipc
+
+    out = target(path, mtime)
+    if os.path.exists(out):
+        return out
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    schema, batches = _batches(path)
+    # Fichier temporaire propre au processus, renommé à la fin : un lecteur ne voit jamais de fichier partiel
+    tmp = f'{out}.{os.getpid()}.tmp'
+    with ipc.new_stream(tmp, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+    os.replace(tmp, out)
+    prefix = os.path.basename(out).rsplit('-', 1)[0] + '-'
+    for name in os.listdir(CACHE_DIR):
+        if name.startswith(prefix) and name.endswith('.arrow') and name != os.path.basename(out):
+            # Les tables encore projetées sur l'ancien fichier restent valides (Linux/macOS)
+            try:
+                os.remove(os.path.join(CACHE_DIR, name))
+            except OSError:
+                pass
+    return out
+
+
+@st.cache_resource(max_entries=assets.MAX_ENTRIES, show_spinner=False)
+def _table(path, mtime):
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    out = target(path, mtime)
+    if not os.path.exists(out):
+        convert(path, mtime)
+    # Le mmap reste ouvert tant que la table (ses tampons) est référencée
+    return ipc.open_stream(pa.memory_map(out)).read_all()
+
+
+def table(path):
+    # Table Arrow partagée (lecture seule) : CSV, fichier Parquet ou dossier Parquet partitionné
+    return _table(*stamp(path))
@@ -0,0 +1,174 @@
+"""Index spatial des casernes : casernes les plus proches de chaque incident.
+
+Un BallTree (métrique haversine) est construit sur les coordonnées des casernes. Pour chaque
+mobilisation on obtient, par blocs de lignes, les k casernes les plus proches du lieu de
+l'incident, puis :
+
+- le rang de la caserne effectivement mobilisée parmi ces k casernes (0 = la plus proche) ;
+- l'écart de distance entre la caserne mobilisée et la plus proche ;
+- par secteur (IncidentStationGround), la part des mobilisations parties de la caserne la
+  plus proche, l'écart médian et le 90e centile (histogramme par classes de GAP_BIN mètres),
+  et le temps de réponse moyen selon le cas.
+
+Ces indicateurs alimentent la vue « Attribution des casernes » de la page DataVizualisation.
+
+    python -m lfb.spatial df_final.parquet casernes.csv
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from lfb import assets, enrichment
+
+SPATIAL_DIR = 'spatial'
+GROUNDS = os.path.join(SPATIAL_DIR, 'grounds.parquet')
+
+K = 3
+CHUNKSIZE = 500_000
+
+# Histogramme des écarts de distance (m) : classes de GAP_BIN m jusqu'à MAX_GAP, puis une classe de dépassement
+GAP_BIN = 10
+MAX_GAP = 50_000
+GAP_BINS = MAX_GAP // GAP_BIN + 2
+
+
+class StationIndex(enrichment.StationLookup):
+    # Coordonnées des casernes (cf. StationLookup) + arbre de recherche des plus proches voisins
+
+    def __init__(self, stations, **columns):
+        from sklearn.neighbors import BallTree
+
+        super().__init__(stations, **columns)
+        known = ~(np.isnan(self.latitude) | np.isnan(self.longitude))
+        self.positions = np.flatnonzero(known)
+        self.tree = BallTree(np.radians(np.column_stack([self.latitude[known], self.longitude[known]])),
+                             metric='haversine')
+
+    def nearest(self, lat, lon, k=K):
+        # (distances en mètres, positions des casernes) des k plus proches, lignes sans coordonnées -> NaN / -1
+        lat, lon = np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+        distance = np.full((len(lat), k), np.nan)
+        position = np.full((len(lat), k), -1, dtype=np.int64)
+        known = ~(np.isnan(lat) | np.isnan(lon))
+        if known.any():
+            d, i = self.tree.query(np.radians(np.column_stack([lat[known], lon[known]])), k=k)
+            distance[known] = d * enrichment.RADIUS
+            position[known] = self.positions[i]
+        return distance, position
+
+
+def analyse(df, index, k=K, code='DeployedFromStation_Code'):
+    # Une ligne par mobilisation : caserne la plus proche, rang et écart de la caserne mobilisée
+    lat, lon = enrichment.incident_coordinates(df)
+    distance, position = index.nearest(lat, lon, k)
+    deployed = index.codes.get_indexer(df[code])
+    match = (position == deployed[:, None]) & (deployed[:, None] >= 0)
+    rank = np.where(match.any(axis=1), match.argmax(axis=1), -1)
+    station_lat, station_lon = index.coordinates(df[code])
+    deployed_distance = enrichment.haversine(lat, lon, station_lat, station_lon)
+    nearest_code = np.asarray(index.codes, dtype=object)[position[:, 0]]
+    nearest_code[position[:, 0] < 0] = None
+    return pd.DataFrame({
+        'Nearest_Station_Code': nearest_code,
+        'Nearest_Distance': distance[:, 0],
+        'Deployed_Rank': rank.astype(np.int8),
+        'Distance_Gap': deployed_distance - distance[:, 0],
+    }, index=df.index)
+
+
+def _gap_bins(gap):
+    # Classe de chaque écart : 0 pour un écart nul, ]GAP_BIN*(b-1), GAP_BIN*b] ensuite, la dernière au-delà de MAX_GAP
+    return np.minimum(np.ceil(np.maximum(gap, 0) / GAP_BIN), GAP_BINS - 1).astype(np.int64)
+
+
+def _quantile(hist, q):
+    # Quantile (m) d'un histogramme d'écarts, interpolé dans sa classe (erreur de l'ordre de GAP_BIN)
+    cumulative = np.cumsum(hist)
+    if not cumulative[-1]:
+        return np.nan
+    rank = q * cumulative[-1]
+    b = int(np.searchsorted(cumulative, rank))
+    if b == 0:
+        return 0.0
+    fraction = (rank - (cumulative[b] - hist[b])) / hist[b]
+    return float(min(GAP_BIN * (b - 1 + fraction), MAX_GAP))
+
+
+def grounds(df, index, k=K, chunksize=CHUNKSIZE):
+    # Indicateurs par secteur, calculés par blocs : seuls des agrégats sont conservés (effectifs,
+    # sommes des temps, histogramme des écarts pour la médiane et le 90e centile)
+    parts, hists = [], {}
+    for start in range(0, len(df), chunksize):
+        chunk = df.iloc[start:start + chunksize]
+        result = analyse(chunk, index, k)
+        result = result[result['Nearest_Distance'].notna() & (result['Distance_Gap'].notna())]
+        ground = chunk.loc[result.index, 'IncidentStationGround'].astype(str).to_numpy()
+        nearest = (result['Deployed_Rank'] == 0).to_numpy()
+        time = chunk.loc[result.index, 'AttendanceTimeSeconds'].to_numpy(dtype=np.float64)
+        timed = ~np.isnan(time)
+        part = pd.DataFrame({
+            'IncidentStationGround': ground,
+            'Mobilisations': 1,
+            'nearest': nearest.astype(np.int64),
+            'outside_k': (result['Deployed_Rank'] < 0).to_numpy().astype(np.int64),
+            'time_nearest': np.where(nearest & timed, time, 0.0),
+            'n_nearest': (nearest & timed).astype(np.int64),
+            'time_other': np.where(~nearest & timed, time, 0.0),
+            'n_other': (~nearest & timed).astype(np.int64),
+        })
+        parts.append(part.groupby('IncidentStationGround').sum())
+        codes, names = pd.factorize(ground)
+        counts = np.bincount(codes * GAP_BINS + _gap_bins(result['Distance_Gap'].to_numpy()),
+                             minlength=len(names) * GAP_BINS).reshape(len(names), GAP_BINS)
+        for name, hist in zip(names, counts):
+            hists[name] = hists[name] + hist if name in hists else hist
+    sums = pd.concat(parts).groupby(level=0).sum().sort_index()
+    table = pd.DataFrame({
+        'Mobilisations': sums['Mobilisations'],
+        'Part_Caserne_Plus_Proche': sums['nearest'] / sums['Mobilisations'],
+        f'Part_Hors_{k}_Plus_Proches': sums['outside_k'] / sums['Mobilisations'],
+        'Ecart_Median_m': [_quantile(hists[name], 0.5) for name in sums.index],
+        'Ecart_P90_m': [_quantile(hists[name], 0.9) for name in sums.index],
+        'Temps_Si_Plus_Proche_s': sums['time_nearest'] / sums['n_nearest'].where(sums['n_nearest'] > 0),
+        'Temps_Sinon_s': sums['time_other'] / sums['n_other'].where(sums['n_other'] > 0),
+    }, index=sums.index.rename('IncidentStationGround'))
+    return table.reset_index()
+
+
+def save(table):
+    os.makedirs(assets.resolve(SPATIAL_DIR), exist_ok=True)
+    table.to_parquet(assets.resolve(GROUNDS), index=False)
+
+
+def available():
+    return os.path.exists(assets.resolve(GROUNDS))
+
+
+def load():
+    return assets.read_parquet(GROUNDS)
+
+
+def summary(table):
+    # Indicateurs globaux, pondérés par le nombre de mobilisations de chaque secteur
+    weights = table['Mobilisations']
+    return {
+        'mobilisations': int(weights.sum()),
+        'nearest': float(np.average(table['Part_Caserne_Plus_Proche'], weights=weights)),
+    }
+
+
+if __name__ == '__main__':
+    source, stations_csv = sys.argv[1:3]
+    columns = ['IncidentStationGround', 'DeployedFromStation_Code', 'AttendanceTimeSeconds',
+               'Latitude', 'Longitude', 'Easting_rounded', 'Northing_rounded']
+    if source.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        available_columns = set(pq.read_schema(source).names)
+        df = pd.read_parquet(source, columns=[c for c in columns if c in available_columns])
+    else:
+        df = pd.read_csv(source, usecols=lambda c: c in columns, low_memory=False)
+    table = grounds(df, StationIndex(pd.read_csv(stations_csv)))
+    save(table)
+    print(f'{len(df)} mobilisations, {len(table)} secteurs -> {GROUNDS}')
@@ -0,0 +1,202 @@
+"""Tests ANOVA et khi-deux recalculés à partir de statistiques suffisantes.
+
+Le jeu consolidé est lu une seule fois, par blocs ; pour chaque variable catégorielle et
+chaque cellule (CalYear, BoroughName, modalité) on accumule :
+
+- n, somme et somme des carrés de AttendanceTimeSeconds (ANOVA à un facteur) ;
+- l'effectif de chaque classe de temps de réponse (table de contingence du khi-deux).
+
+Ces accumulateurs s'additionnent d'un bloc à l'autre (et d'une publication à l'autre, cf.
+lfb.incremental) : les tests sur un sous-ensemble (années, quartiers) se recalculent en
+quelques millisecondes, sans relire les 2,2 millions de lignes.
+
+    python -m lfb.stats df_consolidated/
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from lfb import assets, training
+
+STATS_DIR = 'stats'
+ACCUMULATORS = os.path.join(STATS_DIR, 'accumulators.parquet')
+
+TARGET = training.TARGET
+
+# Variables testées (celles de anova.csv / khi2.csv)
+VARIABLES = [
+    'MonthOfCall', 'CalYear', 'BoroughName', 'IncidentGroup', 'AddressQualifier', 'PropertyCategory',
+    'DayOfCall', 'IncidentStationGround', 'StopCodeDescription', 'DeployedFromStation_Name',
+    'DelayCode_Description', 'SpecialServiceType', 'HourOfCall',
+]
+
+# Dimensions conservées dans les accumulateurs pour filtrer
+FILTERS = ['CalYear', 'BoroughName']
+
+# Classes de la table de contingence : celles du modèle 3 classes
+BOUNDS = training.CLASSES[3]
+CLASS_COLUMNS = [f'classe_{c}' for c in range(1, len(BOUNDS))]
+
+SUMS = ['n', 'sum', 'sumsq'] + CLASS_COLUMNS
+
+
+def missing(columns):
+    # Colonnes indispensables absentes : filtres et cible (les variables absentes sont sautées)
+    return [c for c in FILTERS + [TARGET] if c not in columns]
+
+
+def check(columns):
+    absent = missing(columns)
+    if absent:
+        raise ValueError(f'Colonnes absentes pour les tests statistiques : {", ".join(absent)} '
+                         '(jeu nettoyé attendu, cf. lfb.incremental.clean)')
+
+
+def accumulate(df):
+    # Accumulateurs d'un bloc de lignes, au format long (variable, CalYear, BoroughName, modalité)
+    check(df.columns)
+    df = df[df[TARGET].between(BOUNDS[0], BOUNDS[-1])]
+    y = df[TARGET].to_numpy(dtype=np.float64)
+    classes = np.searchsorted(BOUNDS[1:-1], y, side='left')
+    base = pd.DataFrame({'CalYear': df['CalYear'].to_numpy(dtype=np.int64), 'BoroughName': df['BoroughName'].astype(str).to_numpy(),
+                         'sum': y, 'sumsq': y * y})
+    base['n'] = 1
+    for c, column in enumerate(CLASS_COLUMNS):
+        base[column] = (classes == c).astype(np.int64)
+    parts = []
+    for variable in VARIABLES:
+        if variable not in df:
+            continue
+        base['level'] = df[variable].astype(str).to_numpy()
+        part = base.groupby(FILTERS + ['level'], sort=False)[SUMS].sum().reset_index()
+        part.insert(0, 'variable', variable)
+        parts.append(part)
+    return combine(parts)
+
+
+def combine(parts):
+    # Les accumulateurs s'additionnent cellule par cellule
+    parts = [p for p in parts if p is not None and len(p)]
+    if not parts:
+        return pd.DataFrame(columns=['variable'] + FILTERS + ['level'] + SUMS)
+    return pd.concat(parts, ignore_index=True).groupby(['variable'] + FILTERS + ['level'], sort=True)[SUMS].sum().reset_index()
+
+
+def build(source, chunksize=500_000):
+    # Lecture par blocs du dataset Parquet (fichier ou dossier partitionné)
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(source, format='parquet', partitioning='hive')
+    check(dataset.schema.names)
+    columns = sorted(set(VARIABLES + FILTERS + [TARGET]) & set(dataset.schema.names))
+    # Les lots Arrow suivent les groupes de lignes des fichiers (souvent petits) : ils sont
+    # regroupés en blocs de `chunksize` lignes avant agrégation
+    acc, batches, rows = None, [], 0
+    for batch in dataset.to_batches(columns=columns, batch_size=chunksize):
+        batches.append(batch)
+        rows += batch.num_rows
+        if rows >= chunksize:
+            acc = combine([acc, accumulate(pa.Table.from_batches(batches).to_pandas())])
+            batches, rows = [], 0
+    if batches:
+        acc = combine([acc, accumulate(pa.Table.from_batches(batches).to_pandas())])
+    return acc
+
+
+def save(acc):
+    # Fichier temporaire puis renommage : accumulateurs et repère (acc.attrs) écrits ensemble
+    os.makedirs(assets.resolve(STATS_DIR), exist_ok=True)
+    target = assets.resolve(ACCUMULATORS)
+    acc.to_parquet(target + '.tmp', index=False)
+    os.replace(target + '.tmp', target)
+
+
+def update(delta, mark=None):
+    # Ajout des lignes d'une nouvelle publication aux accumulateurs existants. `mark` : plus grand
+    # ResourceMobilisationId du delta (lfb.incremental), enregistré avec les accumulateurs ; un
+    # delta déjà compté (reprise après une mise à jour interrompue) est ignoré, renvoie None
+    previous = load() if available() else None
+    if mark is not None and previous is not None and previous.attrs.get('watermark', -1) >= mark:
+        return None
+    acc = accumulate(delta)
+    if previous is not None:
+        acc = combine([previous, acc])
+    acc.attrs['watermark'] = mark
+    save(acc)
+    return acc
+
+
+def available():
+    return os.path.exists(assets.resolve(ACCUMULATORS))
+
+
+def load():
+    return assets.read_parquet(ACCUMULATORS)
+
+
+def select(acc, years=None, boroughs=None):
+    # Sous-ensemble (années, quartiers), ré-agrégé par variable et modalité
+    mask = np.ones(len(acc), dtype=bool)
+    if years is not None:
+        mask &= acc['CalYear'].between(*years).to_numpy()
+    if boroughs:
+        mask &= acc['BoroughName'].isin(boroughs).to_numpy()
+    return acc[mask].groupby(['variable', 'level'], sort=False)[SUMS].sum().reset_index()
+
+
+def anova(cells):
+    # ANOVA à un facteur par variable : sommes des carrés inter / intra-groupes
+    from scipy import stats
+
+    cells = cells[cells['n'] > 0]
+    rows = []
+    for variable, groups in cells.groupby('variable', sort=False):
+        n, total, k = groups['n'].sum(), groups['sum'].sum(), len(groups)
+        between = (groups['sum'] ** 2 / groups['n']).sum() - total ** 2 / n
+        within = groups['sumsq'].sum() - (groups['sum'] ** 2 / groups['n']).sum()
+        if k < 2 or n <= k:
+            continue
+        f = (between / (k - 1)) / (within / (n - k))
+        rows.append({'Variable': variable, 'df': k - 1, 'sum_sq': between, 'mean_sq': between / (k - 1),
+                     'F': f, 'PR(>F)': stats.f.sf(f, k - 1, n - k), 'df_resid': n - k})
+    return pd.DataFrame(rows)
+
+
+def chi2(cells):
+    # Khi-deux d'indépendance entre chaque variable et la classe de temps de réponse
+    from scipy import stats
+
+    rows = []
+    for variable, groups in cells.groupby('variable', sort=False):
+        table = groups[CLASS_COLUMNS].to_numpy()
+        table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+        if min(table.shape) < 2:
+            continue
+        statistic, p, _, _ = stats.chi2_contingency(table)
+        rows.append({'Variable': variable, 'Khi2': statistic, 'P-value': p})
+    return pd.DataFrame(rows)
+
+
+@st.cache_data(max_entries=assets.MAX_ENTRIES, show_spinner=False)
+def _tests(mtime, years, boroughs):
+    cells = select(load(), years, boroughs)
+    order = {v: i for i, v in enumerate(VARIABLES)}
+    anova_table, chi2_table = anova(cells), chi2(cells)
+    return (anova_table.sort_values('Variable', key=lambda v: v.map(order), ignore_index=True),
+            chi2_table.sort_values('Variable', key=lambda v: v.map(order), ignore_index=True))
+
+
+def tests(years=None, boroughs=None):
+    # (ANOVA, khi-deux) sur le sous-ensemble demandé ; mis en cache par filtre
+    mtime = os.stat(assets.resolve(ACCUMULATORS)).st_mtime_ns
+    return _tests(mtime, tuple(years) if years else None, tuple(sorted(boroughs)) if boroughs else None)
+
+
+if __name__ == '__main__':
+    acc = build(sys.argv[1])
+    save(acc)
+    print(f'{len(acc)} cellules -> {ACCUMULATORS}')
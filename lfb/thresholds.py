@@ -0,0 +1,287 @@
+"""Percentiles et respect des seuils de temps de réponse (6, 8, 10 minutes), pré-calculés.
+
+Les temps (AttendanceTimeSeconds, TurnoutTimeSeconds, TravelTimeSeconds) sont des secondes
+entières, plafonnées à 1200 s dans les analyses de la LFB. Chaque cellule d'un croquis
+(année, quartier, heure ou secteur de caserne) garde l'histogramme de chaque temps en classes
+de BIN secondes :
+
+- deux histogrammes s'additionnent : les croquis se construisent par blocs ou par partition et
+  se fusionnent sans relire les lignes (cf. lfb.incremental) ;
+- les seuils (6, 8 et 10 min) et les bornes des classes du modèle sont des bornes de classe :
+  la part des temps sous un seuil est exacte ;
+- un percentile est interpolé dans sa classe : erreur inférieure à BIN secondes.
+
+Les percentiles d'une sélection (années, quartiers) par année, heure, quartier ou secteur se
+calculent en quelques millisecondes sur les histogrammes fusionnés.
+
+    python -m lfb.thresholds df_consolidated/
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from lfb import assets, cubes, figures, profiling
+
+THRESHOLDS_DIR = 'thresholds'
+
+MEASURES = cubes.TIMES
+
+# Dimensions de chaque croquis ; le quartier est dans les deux pour le filtre de la page
+SKETCHES = {
+    'hours': ['CalYear', 'BoroughName', 'HourOfCall'],
+    'grounds': ['CalYear', 'BoroughName', 'IncidentStationGround'],
+}
+
+# Largeur des classes (s) et plafond : classes ]BIN*(b-1), BIN*b], la classe 0 pour 0 s,
+# la dernière pour les temps au-delà du plafond
+BIN = 4
+MAX_SECONDS = 1200
+BINS = MAX_SECONDS // BIN + 2
+
+# Seuils de respect (s)
+TARGETS = [360, 480, 600]
+
+PERCENTILES = [0.5, 0.9, 0.95]
+
+# Ventilations proposées sur la page : libellé -> (croquis, dimension)
+BREAKDOWNS = {
+    'Année': ('hours', 'CalYear'),
+    'Heure': ('hours', 'HourOfCall'),
+    'Quartier': ('hours', 'BoroughName'),
+    'Secteur caserne': ('grounds', 'IncidentStationGround'),
+}
+
+
+def to_bins(seconds):
+    # Classe de chaque temps (secondes), -1 pour une valeur manquante ou négative
+    seconds = np.asarray(seconds, dtype=np.float64)
+    bins = np.minimum(np.ceil(seconds / BIN), BINS - 1)
+    return np.where(np.isnan(seconds) | (seconds < 0), -1, bins).astype(np.int64)
+
+
+def missing(columns):
+    # Dimensions des croquis absentes : tous les croquis sont construits, ou aucun
+    return sorted({c for dims in SKETCHES.values() for c in dims if c not in columns})
+
+
+def check(columns):
+    absent = missing(columns)
+    if absent:
+        raise ValueError(f'Colonnes absentes pour les croquis des temps de réponse : {", ".join(absent)}')
+
+
+def accumulate(df, dims):
+    # Histogrammes d'un bloc de lignes, au format long : dims, bin, un effectif par mesure
+    parts = []
+    for measure in MEASURES:
+        if measure not in df:
+            continue
+        keys = {dim: df[dim].to_numpy(dtype=np.int64) if dim in ('CalYear', 'HourOfCall') else df[dim].astype(str).to_numpy()
+                for dim in dims}
+        frame = pd.DataFrame({**keys, 'bin': to_bins(df[measure])})
+        frame = frame[frame['bin'] >= 0]
+        parts.append(frame.groupby(dims + ['bin'], sort=False).size().rename(measure))
+    if not parts:
+        return None
+    return pd.concat(parts, axis=1).fillna(0).astype(np.int64).reset_index()
+
+
+def combine(parts, dims):
+    # Les histogrammes s'additionnent classe par classe
+    parts = [p for p in parts if p is not None and len(p)]
+    if not parts:
+        return pd.DataFrame(columns=dims + ['bin'] + MEASURES)
+    return pd.concat(parts, ignore_index=True).groupby(dims + ['bin'], sort=True)[MEASURES].sum().reset_index()
+
+
+def build(source, chunksize=500_000):
+    # Lecture par blocs du dataset Parquet (fichier ou dossier partitionné), un croquis par entrée de SKETCHES
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(source, format='parquet', partitioning='hive')
+    check(dataset.schema.names)
+    columns = sorted({c for dims in SKETCHES.values() for c in dims} | set(MEASURES))
+    columns = [c for c in columns if c in dataset.schema.names]
+    acc = {name: None for name in SKETCHES}
+    batches, rows = [], 0
+
+    def flush():
+        df = pa.Table.from_batches(batches).to_pandas()
+        for name in acc:
+            acc[name] = combine([acc[name], accumulate(df, SKETCHES[name])], SKETCHES[name])
+
+    for batch in dataset.to_batches(columns=columns, batch_size=chunksize):
+        batches.append(batch)
+        rows += batch.num_rows
+        if rows >= chunksize:
+            flush()
+            batches, rows = [], 0
+    if batches:
+        flush()
+    return {name: sketch for name, sketch in acc.items() if sketch is not None}
+
+
+def path(name):
+    return os.path.join(THRESHOLDS_DIR, name + '.parquet')
+
+
+def save(sketches):
+    # Un fichier par croquis, écrit puis renommé : histogrammes et repère (attrs) écrits ensemble
+    os.makedirs(assets.resolve(THRESHOLDS_DIR), exist_ok=True)
+    for name, sketch in sketches.items():
+        target = assets.resolve(path(name))
+        sketch.to_parquet(target + '.tmp', index=False)
+        os.replace(target + '.tmp', target)
+
+
+def update(delta, mark=None):
+    # Ajout des lignes d'une nouvelle publication aux croquis existants ; `mark` : plus grand
+    # ResourceMobilisationId du delta, les croquis qui l'ont déjà absorbé sont laissés tels quels
+    check(delta.columns)
+    sketches = {}
+    for name, dims in SKETCHES.items():
+        if not available(name):
+            continue
+        previous = load(name)
+        if mark is not None and previous.attrs.get('watermark', -1) >= mark:
+            continue
+        sketches[name] = combine([previous, accumulate(delta, dims)], dims)
+        sketches[name].attrs['watermark'] = mark
+    save(sketches)
+    return sketches
+
+
+def available(name='hours'):
+    return os.path.exists(assets.resolve(path(name)))
+
+
+def load(name):
+    return assets.read_parquet(path(name))
+
+
+@st.cache_resource(max_entries=2 * len(SKETCHES), show_spinner=False)
+def _dense(name, mtime):
+    # Croquis en mémoire : cellules (dims) et histogrammes (cellule, mesure, classe), partagés par les sessions
+    long = load(name)
+    dims = SKETCHES[name]
+    grouped = long.groupby(dims, sort=True)
+    codes, cells = grouped.ngroup().to_numpy(), grouped.size().index.to_frame(index=False)
+    counts = np.zeros((len(cells), len(MEASURES), BINS), dtype=np.uint32)
+    # Un couple (cellule, classe) par ligne (cf. combine)
+    for m, measure in enumerate(MEASURES):
+        counts[codes, m, long['bin'].to_numpy()] = long[measure].to_numpy()
+    return cells, counts
+
+
+def select(name, by, years=None, boroughs=None):
+    # Histogrammes fusionnés par modalité de `by`, sur les années et quartiers demandés
+    cells, counts = _dense(name, os.stat(assets.resolve(path(name))).st_mtime_ns)
+    mask = np.ones(len(cells), dtype=bool)
+    if years is not None:
+        mask &= cells['CalYear'].between(*years).to_numpy()
+    if boroughs:
+        mask &= cells['BoroughName'].isin(boroughs).to_numpy()
+    codes, groups = pd.factorize(cells.loc[mask, by], sort=True)
+    if not len(groups):
+        return pd.Index(groups, name=by), np.zeros((0, len(MEASURES), BINS), dtype=np.int64)
+    # Cellules regroupées par modalité puis sommées bloc par bloc
+    order = np.argsort(codes, kind='stable')
+    starts = np.searchsorted(codes[order], np.arange(len(groups)))
+    merged = np.add.reduceat(counts[mask][order].astype(np.int64), starts, axis=0)
+    return pd.Index(groups, name=by), merged
+
+
+def quantiles(counts, qs=PERCENTILES):
+    # Percentiles (s) de chaque histogramme (dernier axe = classes), interpolés dans la classe
+    cumulative = np.cumsum(counts, axis=-1)
+    total = cumulative[..., -1:]
+    out = np.full(counts.shape[:-1] + (len(qs),), np.nan)
+    for i, q in enumerate(qs):
+        rank = q * total
+        b = np.minimum((cumulative < rank).sum(axis=-1, keepdims=True), BINS - 1)
+        before = np.take_along_axis(cumulative, b, axis=-1) - np.take_along_axis(counts, b, axis=-1)
+        inside = np.take_along_axis(counts, b, axis=-1)
+        fraction = np.divide(rank - before, inside, out=np.zeros(rank.shape), where=inside > 0)
+        # Classe b : ]BIN*(b-1), BIN*b] ; la dernière classe (au-delà du plafond) est ramenée au plafond
+        value = np.where(b == 0, 0, np.minimum(BIN * (b - 1 + fraction), MAX_SECONDS))
+        out[..., i] = np.where(total > 0, value, np.nan)[..., 0]
+    return out
+
+
+def compliance(counts, targets=TARGETS):
+    # Part des temps inférieurs ou égaux à chaque seuil (exacte : les seuils sont des bornes de classe)
+    cumulative = np.cumsum(counts, axis=-1)
+    total = cumulative[..., -1]
+    shares = np.stack([cumulative[..., target // BIN] for target in targets], axis=-1)
+    return np.divide(shares, total[..., None], out=np.full(shares.shape, np.nan), where=total[..., None] > 0)
+
+
+@st.cache_data(max_entries=assets.MAX_ENTRIES, show_spinner=False)
+def _summary(mtime, name, by, years, boroughs):
+    groups, merged = select(name, by, years, boroughs)
+    table = pd.DataFrame({by: groups, 'Mobilisations': merged[:, 0].sum(axis=-1)})
+    values = quantiles(merged)
+    for m, measure in enumerate(MEASURES):
+        for i, q in enumerate(PERCENTILES):
+            table[f'{measure} p{round(q * 100)}'] = values[:, m, i].round(0)
+    shares = compliance(merged[:, 0])
+    for i, target in enumerate(TARGETS):
+        table[f'≤ {target // 60} min (%)'] = (shares[:, i] * 100).round(1)
+    return table
+
+
+def summary(by='CalYear', years=None, boroughs=None):
+    # Une ligne par modalité de `by` : effectif, percentiles des trois temps, respect des seuils
+    name = next(sketch for sketch, dim in BREAKDOWNS.values() if dim == by)
+    mtime = os.stat(assets.resolve(path(name))).st_mtime_ns
+    return _summary(mtime, name, by, tuple(years) if years else None, tuple(sorted(boroughs)) if boroughs else None)
+
+
+def figure(table, by):
+    import plotly.graph_objects as go
+
+    colors = ['#B0BD83', '#F7DC6F', '#d52b1e']
+    fig = go.Figure([go.Bar(x=table[by].astype(str), y=table[f'≤ {target // 60} min (%)'], name=f'≤ {target // 60} min',
+                            marker_color=color)
+                     for target, color in zip(TARGETS, colors)])
+    fig.update_layout(barmode='group', title='Part des mobilisations arrivées sur les lieux sous le seuil',
+                      xaxis_title=by, yaxis_title='%', yaxis_range=[0, 100])
+    if by == 'IncidentStationGround':
+        fig.update_xaxes(categoryorder='total ascending')
+    return fig
+
+
+@profiling.profiled()
+def show(filters=None):
+    # Section de la page DataVizualisation ; `filters` : {years, boroughs, groups} (types d'incident non pris en compte)
+    filters = filters or {}
+    label = st.radio(':gray[Ventiler par]', list(BREAKDOWNS), horizontal=True, key='thresholds_by')
+    by = BREAKDOWNS[label][1]
+    table = summary(by, filters.get('years'), filters.get('boroughs'))
+    total = table['Mobilisations'].sum()
+    if not total:
+        st.info('Aucune mobilisation pour cette sélection.')
+        return
+    _, merged = select(BREAKDOWNS[label][0], by, filters.get('years'), filters.get('boroughs'))
+    overall = quantiles(merged.sum(axis=0)[0])
+    shares = compliance(merged.sum(axis=0)[0])
+    columns = st.columns(len(PERCENTILES) + len(TARGETS))
+    for column, q, value in zip(columns, PERCENTILES, overall):
+        column.metric(f'p{round(q * 100)}', f'{int(value // 60)} min {int(value % 60):02d} s')
+    for column, target, share in zip(columns[len(PERCENTILES):], TARGETS, shares):
+        column.metric(f'≤ {target // 60} min', f'{share:.1%}')
+    if filters.get('groups'):
+        st.caption("Le filtre sur les types d'incident ne s'applique pas à cette analyse.")
+    figures.plot(figure(table, by), 450)
+    st.dataframe(table, hide_index=True)
+
+
+if __name__ == '__main__':
+    sketches = build(sys.argv[1])
+    save(sketches)
+    for name, sketch in sketches.items():
+        print(f'{name}: {len(sketch)} lignes (cellule, classe) -> {path(name)}')
@@ -0,0 +1,183 @@
+"""Entraînement des modèles de classification du temps de réponse (AttendanceTimeSeconds).
+
+Deux encodages, sans jamais construire la matrice one-hot dense (1295782 x 363) en float64 :
+
+- `sparse` : one-hot creux (scipy CSR) + Random Forest, comme dans l'étude ;
+- `native` : HistGradientBoosting avec le support natif des variables catégorielles.
+
+Le one-hot creux évite la matrice dense mais l'algorithme de découpe des arbres sur données
+creuses est lent ; l'encodage natif est nettement plus rapide et utilisé par défaut.
+
+Chaque entraînement produit un rapport JSON (métriques, temps d'entraînement, pic mémoire)
+affiché sur la page Modélisation.
+
+    python -m lfb.training df_modelisation.parquet --classes 3 --encoding native
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from lfb import assets, frame
+
+MODELS_DIR = 'models'
+
+TARGET = 'AttendanceTimeSeconds'
+
+# Bornes des classes en secondes (2:48, 4:04, 5:48, 10:24, 20 min)
+CLASSES = {
+    3: [0, 244, 624, 1200],
+    4: [0, 168, 348, 624, 1200],
+}
+
+# Colonnes retirées avant modélisation : identifiants, DateOfCall (redondante), Turnout/Travel
+# (fuite de données : elles forment la cible), CallCount et MobilisationTime (heatmap)
+DROPPED = ['IncidentNumber', 'ResourceMobilisationId', 'DateOfCall', 'TurnoutTimeSeconds',
+           'TravelTimeSeconds', 'CallCount', 'MobilisationTime']
+
+# Indicateurs temporels traités comme des catégories, non comme des quantités
+TEMPORAL = ['CalYear', 'HourOfCall']
+
+FIRST_YEAR = 2015
+
+
+def prepare(df, classes=3):
+    # Renvoie X (catégories + numériques) et y (classes 1..k)
+    df = df[(df['CalYear'] >= FIRST_YEAR) & df[TARGET].between(0, CLASSES[classes][-1])]
+    y = pd.cut(df[TARGET], CLASSES[classes], labels=range(1, classes + 1), include_lowest=True).astype(np.int8)
+    X = df.drop(columns=[c for c in DROPPED + [TARGET] if c in df])
+    for column in TEMPORAL:
+        if column in X:
+            X[column] = X[column].astype('category')
+    return X, y
+
+
+def split_columns(X):
+    categorical = [c for c in X.columns if isinstance(X[c].dtype, pd.CategoricalDtype)]
+    numeric = [c for c in X.columns if c not in categorical]
+    return categorical, numeric
+
+
+def make_model(X, encoding='sparse', random_state=42, **params):
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import OneHotEncoder
+
+    categorical, numeric = split_columns(X)
+    if encoding == 'sparse':
+        from sklearn.ensemble import RandomForestClassifier
+        encoder = ColumnTransformer([('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=True,
+                                                              dtype=np.float32), categorical)],
+                                    remainder='passthrough', sparse_threshold=1.0)
+        params = {'n_estimators': 100, 'n_jobs': -1, **params}
+        return make_pipeline(encoder, RandomForestClassifier(random_state=random_state, **params))
+    if encoding == 'native':
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        return HistGradientBoostingClassifier(categorical_features='from_dtype', random_state=random_state, **params)
+    raise ValueError(f'Encodage inconnu : {encoding}')
+
+
+def _rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+@contextmanager
+def measure(interval=0.05):
+    # Durée et pic de mémoire résidente (échantillonné) du bloc ; rempli à la sortie
+    stats = {}
+    peak = [_rss()]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(interval):
+            peak[0] = max(peak[0], _rss())
+
+    thread = threading.Thread(target=sample, daemon=True)
+    start = time.perf_counter()
+    thread.start()
+    try:
+        yield stats
+    finally:
+        done.set()
+        thread.join()
+        stats['seconds'] = round(time.perf_counter() - start, 3)
+        stats['peak_rss_mb'] = round(max(peak[0], _rss()) / 2**20, 1)
+
+
+def split(X, y, test_size=0.2, random_state=42):
+    # Découpage stratifié train/test, identique pour l'entraînement et l'analyse du modèle
+    from sklearn.model_selection import train_test_split
+    return train_test_split(X, y, test_size=test_size, stratify=y, random_state=random_state)
+
+
+def train(df, classes=3, encoding='sparse', test_size=0.2, random_state=42, **params):
+    from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+
+    X, y = prepare(df, classes)
+    X_train, X_test, y_train, y_test = split(X, y, test_size, random_state)
+    model = make_model(X_train, encoding, random_state=random_state, **params)
+    with measure() as fit:
+        model.fit(X_train, y_train)
+    with measure() as predict:
+        y_pred = model.predict(X_test)
+
+    report = {
+        'classes': classes, 'encoding': encoding, 'rows': len(X), 'features': list(X.columns),
+        'fit': fit, 'predict': predict,
+        'accuracy': round(float(accuracy_score(y_test, y_pred)), 4),
+        'report': classification_report(y_test, y_pred, output_dict=True, zero_division=0),
+        'confusion_matrix': confusion_matrix(y_test, y_pred).tolist(),
+    }
+    return model, report
+
+
+def report_path(classes, encoding):
+    return os.path.join(MODELS_DIR, f'report_{classes}classes_{encoding}.json')
+
+
+def save_report(report):
+    target = assets.resolve(report_path(report['classes'], report['encoding']))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    return target
+
+
+def load_reports(classes):
+    # Rapports disponibles pour un nombre de classes, tous encodages confondus
+    reports = []
+    for encoding in ('sparse', 'native'):
+        path = report_path(classes, encoding)
+        if os.path.exists(assets.resolve(path)):
+            reports.append(json.loads(assets.read_text(path)))
+    return reports
+
+
+def summary(reports):
+    # Tableau récapitulatif : une ligne par modèle entraîné
+    rows = []
+    for r in reports:
+        row = {'Encodage': r['encoding'], 'Lignes': r['rows'], 'Accuracy': r['accuracy'],
+               'F1 (macro)': round(r['report']['macro avg']['f1-score'], 4),
+               "Temps d'entraînement (s)": r['fit']['seconds'], 'Pic mémoire (Mo)': r['fit']['peak_rss_mb']}
+        for label in map(str, range(1, r['classes'] + 1)):
+            row[f'F1 classe {label}'] = round(r['report'][label]['f1-score'], 2)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Entraînement du classifieur AttendanceTimeSeconds')
+    parser.add_argument('source', help='DataFrame de modélisation (Parquet via lfb.frame, ou CSV)')
+    parser.add_argument('--classes', type=int, choices=sorted(CLASSES), default=3)
+    parser.add_argument('--encoding', choices=['sparse', 'native'], default='native')
+    args = parser.parse_args()
+    df = frame.load(args.source) if args.source.endswith('.parquet') else frame.read_csv(args.source)
+    _, report = train(df, args.classes, args.encoding)
+    print(f"accuracy={report['accuracy']} fit={report['fit']} -> {save_report(report)}")
@@ -0,0 +1,181 @@
+"""Recherche d'hyperparamètres du Random Forest par divisions successives (successive halving).
+
+Au lieu d'un GridSearchCV exhaustif sur les 1,2 million de lignes, toutes les combinaisons
+sont évaluées sur un petit sous-échantillon, puis seul le meilleur tiers passe au tour
+suivant, sur trois fois plus de lignes, et ainsi de suite :
+
+- les plis de validation croisée sont répartis sur tous les cœurs (joblib, processus loky) ;
+- chaque pli évalué est enregistré sur disque (`models/tuning/<hash>.json`, clé = hachage des
+  paramètres, du nombre de lignes, du pli et des données) : une recherche interrompue reprend
+  là où elle s'était arrêtée ;
+- le tableau des résultats et la meilleure configuration sont affichés sur la page Modélisation.
+
+    python -m lfb.tuning df_modelisation.parquet [--min-rows 20000 --factor 3 --cv 3]
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from lfb import assets, frame, training
+
+TUNING_DIR = os.path.join(training.MODELS_DIR, 'tuning')
+RESULTS = os.path.join(training.MODELS_DIR, 'tuning_results.csv')
+BEST = os.path.join(training.MODELS_DIR, 'best_params.json')
+
+# Grille de l'étape 2 (Random Forest, 3 classes)
+GRID = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [None, 20, 30],
+    'min_samples_split': [2, 5, 10],
+    'max_features': ['sqrt', 0.3],
+}
+
+MIN_ROWS = 20_000
+FACTOR = 3
+CV = 3
+SEED = 42
+
+# En dessous de cette taille, la matrice one-hot est densifiée (float32) : les arbres
+# se construisent bien plus vite sur une matrice dense que sur une matrice creuse
+DENSE_LIMIT = 512 * 2**20
+
+
+def key(params, rows, fold, cv, fingerprint):
+    payload = json.dumps({'params': params, 'rows': rows, 'fold': fold, 'cv': cv, 'data': fingerprint},
+                         sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _cached(k):
+    full = assets.resolve(os.path.join(TUNING_DIR, k + '.json'))
+    if os.path.exists(full):
+        with open(full, encoding='utf-8') as f:
+            return json.load(f)
+    return None
+
+
+def _evaluate(params, X, y, train, test, k, random_state=SEED):
+    # Un pli : entraînement, score, puis écriture atomique du résultat dans le cache
+    from sklearn.ensemble import RandomForestClassifier
+
+    start = time.perf_counter()
+    model = RandomForestClassifier(random_state=random_state, n_jobs=1, **params).fit(X[train], y[train])
+    result = {'score': float(model.score(X[test], y[test])), 'fit_time': round(time.perf_counter() - start, 3)}
+    full = assets.resolve(os.path.join(TUNING_DIR, k + '.json'))
+    with open(full + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+    os.replace(full + '.tmp', full)
+    return result
+
+
+def encode(X):
+    # One-hot creux des catégories + variables numériques (mêmes colonnes que training.make_model)
+    from scipy import sparse
+    from sklearn.preprocessing import OneHotEncoder
+
+    categorical, numeric = training.split_columns(X)
+    onehot = OneHotEncoder(handle_unknown='ignore', dtype=np.float32).fit_transform(X[categorical])
+    return sparse.hstack([onehot, sparse.csr_matrix(X[numeric].to_numpy(dtype=np.float32))], format='csr')
+
+
+def _stratified_order(y, random_state=SEED):
+    # Permutation dont chaque préfixe respecte les proportions des classes : les
+    # sous-échantillons successifs sont emboîtés et stratifiés
+    rng = np.random.default_rng(random_state)
+    rank = np.empty(len(y))
+    for label in np.unique(y):
+        members = np.flatnonzero(y == label)
+        rank[rng.permutation(members)] = (np.arange(len(members)) + rng.random()) / len(members)
+    return np.argsort(rank, kind='stable')
+
+
+def search(X, y, fingerprint, grid=GRID, min_rows=MIN_ROWS, factor=FACTOR, cv=CV, n_jobs=-1, log=print):
+    # Renvoie le tableau des résultats (une ligne par candidat et par tour) et la meilleure configuration
+    from joblib import Parallel, delayed
+    from sklearn.model_selection import ParameterGrid, StratifiedKFold
+
+    os.makedirs(assets.resolve(TUNING_DIR), exist_ok=True)
+    y = np.asarray(y)
+    order = _stratified_order(y)
+    candidates = list(ParameterGrid(grid))
+    rows, rung, table = min_rows, 0, []
+    while True:
+        rows = min(rows, len(y))
+        subset = np.sort(order[:rows])
+        Xs, ys = X[subset], y[subset]
+        if hasattr(Xs, 'toarray') and Xs.shape[0] * Xs.shape[1] * 4 <= DENSE_LIMIT:
+            Xs = Xs.toarray()
+        folds = list(StratifiedKFold(cv, shuffle=True, random_state=SEED).split(np.zeros(rows), ys))
+
+        tasks, results = [], {}
+        for c, params in enumerate(candidates):
+            for fold, (train, test) in enumerate(folds):
+                k = key(params, rows, fold, cv, fingerprint)
+                results[c, fold] = _cached(k)
+                if results[c, fold] is None:
+                    tasks.append(((c, fold), params, train, test, k))
+        log(f'tour {rung} : {len(candidates)} candidats x {cv} plis sur {rows} lignes '
+            f'({len(tasks)} à calculer, {len(candidates) * cv - len(tasks)} en cache)')
+        computed = Parallel(n_jobs=n_jobs, backend='loky')(
+            delayed(_evaluate)(params, Xs, ys, train, test, k) for _, params, train, test, k in tasks)
+        for (index, *_), result in zip(tasks, computed):
+            results[index] = result
+
+        scores = []
+        for c, params in enumerate(candidates):
+            folds_results = [results[c, fold] for fold in range(cv)]
+            score = np.mean([r['score'] for r in folds_results])
+            scores.append(score)
+            table.append({'tour': rung, 'lignes': rows, **params, 'score_moyen': round(score, 4),
+                          'score_ecart_type': round(float(np.std([r['score'] for r in folds_results])), 4),
+                          'temps_total_s': round(sum(r['fit_time'] for r in folds_results), 1)})
+        if len(candidates) == 1:
+            return pd.DataFrame(table), candidates[0]
+        keep = max(1, len(candidates) // factor)
+        candidates = [candidates[i] for i in np.argsort(scores, kind='stable')[::-1][:keep]]
+        rows, rung = rows * factor, rung + 1
+
+
+def save(table, params):
+    table.to_csv(assets.resolve(RESULTS), index=False)
+    with open(assets.resolve(BEST), 'w', encoding='utf-8') as f:
+        json.dump(params, f, indent=1)
+
+
+def available():
+    return os.path.exists(assets.resolve(RESULTS))
+
+
+def results():
+    return assets.read_csv(RESULTS)
+
+
+def best_params():
+    return json.loads(assets.read_text(BEST))
+
+
+def fingerprint(path, classes):
+    stat = os.stat(path)
+    return {'source': os.path.abspath(path), 'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'classes': classes}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Recherche des hyperparamètres du Random Forest (successive halving)')
+    parser.add_argument('source', help='DataFrame de modélisation (Parquet via lfb.frame)')
+    parser.add_argument('--classes', type=int, choices=sorted(training.CLASSES), default=3)
+    parser.add_argument('--min-rows', type=int, default=MIN_ROWS)
+    parser.add_argument('--factor', type=int, default=FACTOR)
+    parser.add_argument('--cv', type=int, default=CV)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    args = parser.parse_args()
+    X, y = training.prepare(frame.load(args.source), args.classes)
+    start = time.perf_counter()
+    table, params = search(encode(X), y.to_numpy(), fingerprint(args.source, args.classes),
+                           min_rows=args.min_rows, factor=args.factor, cv=args.cv, n_jobs=args.n_jobs)
+    save(table, params)
+    print(f'{time.perf_counter() - start:.0f} s, meilleure configuration : {params} -> {RESULTS}')